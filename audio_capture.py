@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Streaming audio capture engine.
+
+Audio is captured with a callback-driven sounddevice InputStream. The callback
+copies every fixed-size block into a preallocated ring buffer and a drain
+thread hands the blocks to one or more sinks (usually a file writer) while the
+recording is still running. Memory use therefore stays constant no matter how
+long a take is, and a take can be stopped at any time.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from av_sync import StreamClockMapper
+from media_backends import get_sounddevice
+
+
+class BlockRingBuffer:
+    """Preallocated ring of fixed-size audio blocks.
+
+    There is exactly one producer (the audio callback) and one consumer
+    (the drain thread). The producer never blocks: if the consumer falls
+    behind and the ring is full, the block is dropped and counted as an
+    overrun.
+    """
+
+    def __init__(self, capacity, blocksize, channels, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.blocksize = int(blocksize)
+        self.channels = int(channels)
+        self.blocks = np.zeros((self.capacity, self.blocksize, self.channels), dtype=dtype)
+        self.lengths = np.zeros(self.capacity, dtype=np.int64)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.overruns = 0
+        # Monotonic counters; only the producer advances _written and only
+        # the consumer advances _read, so no lock is needed between them.
+        self._written = 0
+        self._read = 0
+        self._data_ready = threading.Event()
+        self._woken = False
+
+    def __len__(self):
+        return self._written - self._read
+
+    def push(self, data, timestamp=0.0):
+        """Copy a block into the next free slot (producer side)"""
+        if self._written - self._read >= self.capacity:
+            self.overruns += 1
+            return False
+        slot = self._written % self.capacity
+        frames = len(data)
+        self.blocks[slot, :frames] = data
+        self.lengths[slot] = frames
+        self.timestamps[slot] = timestamp
+        self._written += 1
+        self._data_ready.set()
+        return True
+
+    def peek(self, timeout=None):
+        """Return a view of the oldest unread block, or None on timeout.
+
+        The view stays valid until release() is called.
+        """
+        if self._written == self._read:
+            self._data_ready.clear()
+            # A wake() before the clear must not be lost either
+            if self._woken:
+                self._woken = False
+                return None
+            # Re-check after clearing so a push between the two is not missed
+            if self._written == self._read and not self._data_ready.wait(timeout):
+                return None
+            if self._written == self._read:
+                return None
+        slot = self._read % self.capacity
+        return self.blocks[slot, :self.lengths[slot]]
+
+    def peek_timestamp(self):
+        """Capture timestamp of the block returned by peek()"""
+        return self.timestamps[self._read % self.capacity]
+
+    def release(self):
+        """Mark the block returned by peek() as consumed (consumer side)"""
+        if self._read < self._written:
+            self._read += 1
+
+    def wake(self):
+        """Wake a consumer blocked in peek(), or make its next peek()
+        return at once"""
+        self._woken = True
+        self._data_ready.set()
+
+
+class RawFileSink:
+    """Sink that appends raw sample blocks to a binary file"""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file = open(filepath, 'wb')
+        self.frames_written = 0
+
+    def __call__(self, block):
+        self.file.write(block.tobytes())
+        self.frames_written += len(block)
+
+    def close(self):
+        if self.file and not self.file.closed:
+            self.file.close()
+
+
+class AudioCaptureEngine:
+    """Capture audio from an input device in fixed-size blocks.
+
+    Blocks are drained to the registered sinks on a background thread while
+    the stream is running. A sink is any callable taking a (frames, channels)
+    numpy array; it must not keep a reference to the array after returning.
+    Sinks added with timestamps=True are called as sink(block, timestamp).
+
+    Each block is stamped with the time.perf_counter() time of its first
+    sample, derived from the callback's inputBufferAdcTime. If a sync_index
+    is given, the stamps are recorded there as the blocks are drained.
+
+    latency is passed to sounddevice as-is: 'low', 'high' or a number of
+    seconds (None uses the device default).
+
+    If a meter (level_meter.LevelMeter) is given, every block is metered
+    in the callback itself so level displays see it without the drain
+    thread's delay.
+
+    If metrics (metrics.MetricsRegistry) are given, the stream open time,
+    the time spent in each callback, input overflows, ring overruns and the
+    ring depth seen by the drain thread are recorded.
+    """
+
+    def __init__(self, sample_rate=44100, channels=1, blocksize=1024,
+                 dtype='float32', device=None, buffer_seconds=2.0, sync_index=None,
+                 latency=None, meter=None, metrics=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.dtype = dtype
+        self.device = device
+        self.latency = latency
+        self.meter = meter
+        self.metrics = metrics
+
+        # Size the ring so the drain thread may stall for buffer_seconds
+        # before any block is dropped
+        capacity = max(4, int(np.ceil(buffer_seconds * sample_rate / blocksize)))
+        self.ring = BlockRingBuffer(capacity, blocksize, channels, dtype=np.dtype(dtype))
+
+        self.sinks = []
+        self.timed_sinks = []
+        self.sync_index = sync_index
+        self.clock_mapper = StreamClockMapper()
+        self.frames_captured = 0
+        self.frames_drained = 0
+        self.status_errors = 0
+        self.max_frames = None
+
+        self._sd = None
+        self._stream = None
+        self._drain_thread = None
+        self._stream_finished = threading.Event()
+        self._drained = threading.Event()
+        self._drain_error = None
+
+    def add_sink(self, sink, timestamps=False):
+        """Register a callable that receives every captured block"""
+        if timestamps:
+            self.timed_sinks.append(sink)
+        else:
+            self.sinks.append(sink)
+
+    @property
+    def is_running(self):
+        return self._stream is not None and not self._drained.is_set()
+
+    def start(self, max_frames=None):
+        """Open the input stream and start draining blocks to the sinks.
+
+        If max_frames is given the stream stops by itself once that many
+        frames have been captured; otherwise it runs until stop() is called.
+        """
+        if self._stream is not None:
+            raise RuntimeError("Capture is already running")
+
+        self.max_frames = max_frames
+        self.frames_captured = 0
+        self.frames_drained = 0
+        self.status_errors = 0
+        self._stream_finished.clear()
+        self._drained.clear()
+        self._drain_error = None
+
+        self._drain_thread = threading.Thread(target=self._drain_loop, daemon=True)
+        self._drain_thread.start()
+
+        sd = self._sd = get_sounddevice()
+        open_start = time.perf_counter()
+        self._stream = sd.InputStream(samplerate=self.sample_rate,
+                                      channels=self.channels,
+                                      dtype=self.dtype,
+                                      blocksize=self.blocksize,
+                                      device=self.device,
+                                      latency=self.latency,
+                                      callback=self._callback,
+                                      finished_callback=self._on_stream_finished)
+        try:
+            self._stream.start()
+        except Exception:
+            self._stream = None
+            self._on_stream_finished()
+            self._drain_thread.join()
+            raise
+        if self.metrics is not None:
+            self.metrics.observe("audio_open_seconds", time.perf_counter() - open_start)
+
+    def _callback(self, indata, frames, time_info, status):
+        """PortAudio callback - runs on the audio thread, must not block"""
+        metrics = self.metrics
+        if metrics is not None:
+            callback_start = time.perf_counter()
+        if status:
+            self.status_errors += 1
+            if metrics is not None and getattr(status, "input_overflow", True):
+                metrics.counter("audio_input_overflows").inc()
+
+        if self.max_frames is not None:
+            remaining = self.max_frames - self.frames_captured
+            if remaining <= 0:
+                raise self._sd.CallbackStop
+            if frames > remaining:
+                frames = remaining
+
+        timestamp = self.clock_mapper.adc_time(time_info, frames, self.sample_rate)
+        if self.meter is not None:
+            self.meter.update(indata[:frames])
+        pushed = self.ring.push(indata[:frames], timestamp)
+        self.frames_captured += frames
+        if metrics is not None:
+            if not pushed:
+                metrics.counter("audio_ring_overruns").inc()
+            metrics.observe("audio_callback_seconds", time.perf_counter() - callback_start)
+
+        if self.max_frames is not None and self.frames_captured >= self.max_frames:
+            raise self._sd.CallbackStop
+
+    def _on_stream_finished(self):
+        self._stream_finished.set()
+        self.ring.wake()
+
+    def _drain_loop(self):
+        """Hand captured blocks to the sinks until the stream has finished"""
+        try:
+            while True:
+                block = self.ring.peek(timeout=0.1)
+                if block is None:
+                    if self._stream_finished.is_set() and len(self.ring) == 0:
+                        break
+                    continue
+                try:
+                    if self.metrics is not None:
+                        self.metrics.observe("audio_ring_depth", len(self.ring))
+                    timestamp = self.ring.peek_timestamp()
+                    if self.sync_index is not None:
+                        self.sync_index.add_audio_block(self.frames_drained, len(block),
+                                                        timestamp)
+                    for sink in self.sinks:
+                        sink(block)
+                    for sink in self.timed_sinks:
+                        sink(block, timestamp)
+                    self.frames_drained += len(block)
+                finally:
+                    self.ring.release()
+        except Exception as e:
+            self._drain_error = e
+            print(f"Error while draining audio blocks: {e}")
+        finally:
+            self._drained.set()
+
+    def wait(self, timeout=None):
+        """Wait until the stream has finished and every block was drained.
+
+        Returns False if the timeout expired first.
+        """
+        if not self._stream_finished.wait(timeout):
+            return False
+        if self._drain_thread is not None:
+            self._drain_thread.join()
+        self._close_stream()
+        if self._drain_error is not None:
+            raise self._drain_error
+        return True
+
+    def stop(self):
+        """Stop capturing early and flush the remaining blocks to the sinks"""
+        if self._drain_thread is None:
+            return True
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+            finally:
+                self._on_stream_finished()
+        return self.wait()
+
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            finally:
+                self._stream = None
+
+    @property
+    def overruns(self):
+        """Number of blocks dropped because the sinks could not keep up"""
+        return self.ring.overruns
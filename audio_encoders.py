@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Pluggable compressed audio encoders.
+
+Takes can be stored as FLAC (lossless, about half the size of 16-bit WAV) or
+Opus (lossy, a few percent of it) instead of uncompressed WAV. Encoders are
+sinks of the audio capture engine, just like WavStreamWriter, and write to a
+``.part`` file that is renamed when the take is closed.
+
+Compressing is much more expensive than appending PCM, so compressed sinks
+are wrapped in a BackgroundEncoder: the capture engine's drain thread only
+copies each block into a queue and a worker thread does the encoding. The
+encoders use soundfile (libsndfile), which is an optional dependency; if it
+is missing, open_audio_sink() raises EncoderError and callers fall back to
+WAV.
+"""
+
+import os
+import queue
+import threading
+
+import numpy as np
+
+from media_backends import get_soundfile
+from wav_writer import PART_SUFFIX, WavStreamWriter
+
+# codec: (file extension, libsndfile container, encoded in the background)
+CODECS = {
+    "wav": (".wav", None, False),
+    "flac": (".flac", "FLAC", True),
+    "opus": (".opus", "OGG", True),
+}
+
+# Sample rates the Opus encoder accepts
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+# FLAC stores integers only; float32 takes are kept at 24 bits
+_FLAC_SUBTYPES = {"int16": "PCM_16", "int24": "PCM_24", "float32": "PCM_24"}
+
+# Seconds of audio the background queue may hold before the drain thread
+# has to wait for the encoder
+DEFAULT_BACKLOG_SECONDS = 30.0
+
+
+class EncoderError(RuntimeError):
+    """Raised when a codec is unavailable or rejects the stream settings"""
+
+
+def audio_extension(codec):
+    """File extension used for takes encoded with codec"""
+    if codec not in CODECS:
+        raise EncoderError(f"Unknown audio codec {codec!r} (choose from {', '.join(CODECS)})")
+    return CODECS[codec][0]
+
+
+def codec_available(codec):
+    """Whether codec can be used in this environment"""
+    if codec == "wav":
+        return True
+    if codec not in CODECS:
+        return False
+    try:
+        sf = get_soundfile()
+    except (ImportError, OSError):
+        return False
+    container = CODECS[codec][1]
+    subtype = "OPUS" if codec == "opus" else "PCM_16"
+    return sf.check_format(container, subtype)
+
+
+class SoundFileEncoder:
+    """Encode audio blocks to FLAC or Opus with libsndfile.
+
+    Like WavStreamWriter, the encoder is a callable sink. Blocks are
+    expected as float samples in [-1.0, 1.0] (or int16/int32, which
+    libsndfile scales itself); floats are clipped before encoding so hot
+    samples saturate instead of wrapping around.
+    """
+
+    def __init__(self, filepath, sample_rate, channels=1, codec="flac",
+                 sample_format="int16", compression_level=None):
+        if codec not in ("flac", "opus"):
+            raise EncoderError(f"SoundFileEncoder cannot encode {codec!r}")
+        if codec == "opus" and sample_rate not in OPUS_SAMPLE_RATES:
+            raise EncoderError(f"Opus cannot encode {sample_rate} Hz audio "
+                               f"(supported: {', '.join(map(str, OPUS_SAMPLE_RATES))} Hz)")
+        try:
+            sf = get_soundfile()
+        except (ImportError, OSError) as e:
+            raise EncoderError(f"soundfile is required for {codec} output: {e}")
+
+        container = CODECS[codec][1]
+        subtype = "OPUS" if codec == "opus" else _FLAC_SUBTYPES[sample_format]
+        if not sf.check_format(container, subtype):
+            raise EncoderError(f"libsndfile {sf.__libsndfile_version__} cannot write {codec}")
+
+        self.filepath = filepath
+        self.part_path = filepath + PART_SUFFIX
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.codec = codec
+        self.frames_written = 0
+        self._clip_buffer = np.empty(0, dtype=np.float32)
+
+        options = {}
+        if compression_level is not None:
+            options["compression_level"] = compression_level
+        # The .part name hides the codec from libsndfile, so it is explicit
+        self.file = sf.SoundFile(self.part_path, mode='w', samplerate=sample_rate,
+                                 channels=channels, format=container, subtype=subtype,
+                                 **options)
+
+    def write(self, block):
+        """Encode a (frames, channels) block"""
+        if block.dtype.kind == 'f':
+            if self._clip_buffer.size < block.size:
+                self._clip_buffer = np.empty(block.size, dtype=np.float32)
+            clipped = self._clip_buffer[:block.size].reshape(block.shape)
+            np.minimum(block, np.float32(1.0), out=clipped)
+            np.maximum(clipped, np.float32(-1.0), out=clipped)
+            block = clipped
+        self.file.write(block)
+        self.frames_written += len(block)
+
+    __call__ = write
+
+    def close(self):
+        """Finish the stream and move the file to its final name"""
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+        finally:
+            self.file = None
+        os.replace(self.part_path, self.filepath)
+
+
+class BackgroundEncoder:
+    """Run a sink on a worker thread so slow encoding never stalls capture.
+
+    Calling the wrapper copies the block into a queue and returns at once;
+    the worker feeds the queued blocks to the wrapped sink in order. The
+    queue holds up to backlog_blocks blocks. Only an encoder that is slower
+    than real time for longer than that makes the caller wait. close()
+    drains the queue, closes the sink and re-raises any error the worker
+    hit.
+    """
+
+    def __init__(self, sink, backlog_blocks=1024):
+        self.sink = sink
+        self.filepath = getattr(sink, "filepath", None)
+        self.max_backlog = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=backlog_blocks)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __call__(self, block):
+        if self.error is not None:
+            return  # The worker failed; close() reports it
+        # The capture engine reuses its block buffers, so keep a copy
+        self._queue.put(block.copy())
+        self.max_backlog = max(self.max_backlog, self._queue.qsize())
+
+    write = __call__
+
+    @property
+    def frames_written(self):
+        return self.sink.frames_written
+
+    def _run(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self.sink(block)
+            except Exception as e:
+                self.error = e
+
+    def close(self):
+        """Encode everything still queued and finalize the file"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self.sink.close()
+        if self.error is not None:
+            raise EncoderError(f"Encoding {self.filepath} failed: {self.error}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_audio_sink(filepath, codec, sample_rate, channels=1, sample_format="int16",
+                    dither=False, compression_level=None,
+                    backlog_seconds=DEFAULT_BACKLOG_SECONDS, block_size=1024):
+    """Open a capture sink that writes filepath with codec.
+
+    WAV is written synchronously (it is cheap); compressed codecs are
+    wrapped in a BackgroundEncoder. Raises EncoderError if the codec is not
+    available or cannot handle the stream.
+    """
+    audio_extension(codec)
+    if codec == "wav":
+        return WavStreamWriter(filepath, sample_rate, channels=channels,
+                               sample_format=sample_format, dither=dither)
+
+    encoder = SoundFileEncoder(filepath, sample_rate, channels=channels, codec=codec,
+                               sample_format=sample_format,
+                               compression_level=compression_level)
+    backlog_blocks = max(16, int(backlog_seconds * sample_rate / block_size))
+    return BackgroundEncoder(encoder, backlog_blocks=backlog_blocks)
+
+
+def recover_partial_encodes(directory):
+    """Keep compressed takes left behind by a crash.
+
+    libsndfile writes FLAC and Ogg streams frame by frame, so a truncated
+    file still decodes up to the last complete frame; it is only renamed
+    to its final name. Returns the list of recovered file paths.
+    """
+    recovered = []
+    if not os.path.isdir(directory):
+        return recovered
+
+    suffixes = tuple(ext + PART_SUFFIX for ext, _, background in CODECS.values() if background)
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(suffixes):
+            continue
+        filepath = entry.path[:-len(PART_SUFFIX)]
+        try:
+            os.replace(entry.path, filepath)
+            recovered.append(filepath)
+            print(f"Recovered interrupted take: {os.path.basename(filepath)}")
+        except OSError as e:
+            print(f"Warning: Could not recover {entry.name}: {e}")
+    return recovered
@@ -16,50 +16,107 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
 import time
-import wave
-import sounddevice as sd
-import numpy as np
 import os
 import platform
-import re
-from datetime import datetime
-import cv2
+import argparse
+from recorder import Recorder, RecorderConfig, sanitize_filename
+from capture_profiles import ProfileError
+from device_probe import DeviceProber
+from ui_events import TkEventPump, UIEventChannel
+
+# Quietest level shown on the input meter, in dBFS
+LEVEL_FLOOR_DB = -60
+# How long a "saved" notification stays visible, in milliseconds
+NOTICE_MS = 6000
 
 
 class AudioRecorderApp:
-    def __init__(self, root):
+    def __init__(self, root, enable_video=True, profile="default", preroll=3.0, countdown=3):
         self.root = root
         self.root.title("Audio Recorder")
-        self.root.geometry("400x300")
+        # Tall enough for the level meter and the save notices below the form
+        self.root.geometry("400x540")
         self.root.resizable(False, False)
         
         # Recording parameters
-        self.sample_rate = 44100  # Hz
         self.duration = 5  # seconds
-        self.countdown_time = 3  # seconds
-        self.recording_data = None
+        # With a pre-roll at least as long as the countdown, nothing said
+        # during the countdown is lost, so it is only a visual cue
+        self.countdown_time = countdown  # seconds
         self.is_recording = False
         
-        # Webcam parameters
-        self.webcam = None
-        self.webcam_available = False
-        self.video_writer = None
+        # Worker threads never touch Tk directly: they post updates to this
+        # channel, which the main loop drains at a fixed refresh rate
+        self.ui_events = UIEventChannel()
         
-        # Check audio device availability on startup
-        self.check_audio_devices()
+        # Capture, encode and save are handled by the UI-independent engine.
+        # With enable_video=False (audio-only kiosks) OpenCV is never loaded.
+        # Set output_mode="muxed" for a single .mp4 per take (requires ffmpeg).
+        self.enable_video = enable_video
+        # profile selects the audio input settings (see capture_profiles.py)
+        self.recorder = Recorder(RecorderConfig.from_profile(profile,
+                                                             duration=self.duration,
+                                                             preroll_seconds=preroll,
+                                                             enable_video=enable_video,
+                                                             output_dir=os.path.join(os.getcwd(), "recordings")),
+                                 listener=self.ui_events)
         
-        # Check webcam availability on startup
-        self.check_webcam_devices()
+        # Device probing runs in the background once the window is shown.
+        # Until it finishes, the cached webcam result (if any) is used.
+        self.device_prober = DeviceProber(camera_index=0, probe_webcam=enable_video)
+        self.webcam_available = False
+        if enable_video:
+            cached = self.device_prober.cached_webcam()
+            self.webcam_available = bool(cached and cached.get("available"))
         
         self.setup_ui()
         
-    def check_audio_devices(self):
-        """Check if audio input devices are available"""
+        self.event_pump = TkEventPump(self.root, self.ui_events, self.on_ui_event)
+        self.event_pump.start()
+        self.root.after(0, self.start_device_probe)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    @property
+    def webcam_available(self):
+        return self.recorder.webcam_available
+    
+    @webcam_available.setter
+    def webcam_available(self, available):
+        self.recorder.webcam_available = bool(available) and self.enable_video
+        
+    def on_close(self):
+        """Finish saving queued takes, close the pre-roll stream and release
+        the warm camera before the window closes"""
+        if self.recorder.finalize_queue.pending:
+            self.status_var.set("💾 Finishing saves...")
+            self.root.update_idletasks()
+        self.event_pump.stop()
+        self.recorder.close()
+        self.root.destroy()
+        
+    def start_device_probe(self):
+        """Start probing audio and webcam devices in the background"""
+        self.device_prober.start()
+        self.root.after(100, self.poll_device_probe)
+        
+    def poll_device_probe(self):
+        """Apply probe results on the Tk thread as they arrive"""
+        while not self.device_prober.results.empty():
+            kind, result = self.device_prober.results.get_nowait()
+            if kind == "audio":
+                self.check_audio_devices(result)
+            elif kind == "webcam":
+                self.check_webcam_devices(result)
+        if not self.device_prober.finished or not self.device_prober.results.empty():
+            self.root.after(100, self.poll_device_probe)
+        
+    def check_audio_devices(self, result):
+        """Warn if the probe found no audio input devices"""
         try:
-            devices = sd.query_devices()
-            input_devices = [d for d in devices if d['max_input_channels'] > 0]
+            if result["error"] is not None:
+                raise RuntimeError(result["error"])
             
-            if not input_devices:
+            if not result["input_devices"]:
                 # Show warning but don't prevent startup
                 system_name = platform.system()
                 if system_name == "Windows":
@@ -73,23 +130,30 @@ class AudioRecorderApp:
                                  "Please check your microphone connection and system audio settings.")
                 
                 messagebox.showwarning("Audio Device Warning", warning_msg)
+                return
+            
+            # Make sure the microphone can record with the capture profile
+            # and start filling the pre-roll
+            try:
+                self.recorder.arm()
+            except ProfileError as e:
+                messagebox.showwarning("Audio Profile Warning", str(e))
                 
         except Exception as e:
             messagebox.showwarning("Audio System Warning", 
                                  f"Could not check audio devices: {str(e)}\n"
                                  "Recording may not work properly.")
         
-    def check_webcam_devices(self):
-        """Check if webcam devices are available"""
+    def check_webcam_devices(self, result):
+        """Update webcam availability from the probe result"""
         try:
-            # Try to access the default camera (index 0)
-            cap = cv2.VideoCapture(0)
-            if cap.isOpened():
-                self.webcam_available = True
-                cap.release()
-            else:
-                self.webcam_available = False
-                
+            if result["error"] is not None:
+                raise RuntimeError(result["error"])
+            
+            self.webcam_available = bool(result["available"])
+            self.update_webcam_status()
+            
+            if not self.webcam_available:
                 # Provide Windows-specific guidance
                 if platform.system() == "Windows":
                     warning_msg = ("No webcam detected or webcam is in use by another application.\n\n"
@@ -107,6 +171,7 @@ class AudioRecorderApp:
                 messagebox.showwarning("Webcam Warning", warning_msg)
         except Exception as e:
             self.webcam_available = False
+            self.update_webcam_status()
             
             # Enhanced error message for Windows
             if platform.system() == "Windows":
@@ -125,28 +190,7 @@ class AudioRecorderApp:
         
     def sanitize_filename(self, filename):
         """Sanitize filename for cross-platform compatibility, especially Windows"""
-        # Remove or replace invalid characters for Windows filenames
-        # Invalid characters: < > : " | ? * \ /
-        invalid_chars = r'<>:"|?*\/'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-            
-        # Remove leading/trailing dots and spaces (Windows issue)
-        filename = filename.strip('. ')
-        
-        # Ensure filename is not empty
-        if not filename:
-            filename = "recording"
-            
-        # Windows reserved names
-        reserved_names = ['CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'COM4', 
-                         'COM5', 'COM6', 'COM7', 'COM8', 'COM9', 'LPT1', 'LPT2', 
-                         'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9']
-        
-        if filename.upper() in reserved_names:
-            filename = f"user_{filename}"
-            
-        return filename
+        return sanitize_filename(filename)
         
     def setup_ui(self):
         """Set up the user interface"""
@@ -195,6 +239,17 @@ class AudioRecorderApp:
         self.progress = ttk.Progressbar(main_frame, length=300, mode='determinate')
         self.progress.grid(row=5, column=0, columnspan=2, pady=(0, 10))
         
+        # Input level meter, fed with throttled "level" events while recording
+        level_frame = ttk.Frame(main_frame)
+        level_frame.grid(row=6, column=0, columnspan=2)
+        self.level_bar = ttk.Progressbar(level_frame, length=200, mode='determinate',
+                                         maximum=-LEVEL_FLOOR_DB)
+        self.level_bar.grid(row=0, column=0, padx=(0, 10))
+        self.level_var = tk.StringVar(value="")
+        self.level_label = ttk.Label(level_frame, textvariable=self.level_var,
+                                     font=("Arial", 9), width=18)
+        self.level_label.grid(row=0, column=1)
+        
         # Instructions
         instructions = ("Instructions:\n"
                        "1. Enter your name in the text field\n"
@@ -203,16 +258,35 @@ class AudioRecorderApp:
                        "4. Recording will start automatically for 5 seconds\n"
                        "5. Audio and video files will be saved with your name")
         
-        # Add webcam status to instructions
-        if self.webcam_available:
-            instructions += "\n\n✅ Webcam detected - Video recording enabled"
-        else:
-            instructions += "\n\n⚠️ No webcam detected - Audio only"
-        
         instructions_label = ttk.Label(main_frame, text=instructions, 
                                       font=("Arial", 9), 
                                       justify=tk.LEFT)
-        instructions_label.grid(row=6, column=0, columnspan=2, pady=(20, 0))
+        instructions_label.grid(row=7, column=0, columnspan=2, pady=(20, 0))
+        
+        # Webcam status, updated when background device probing finishes
+        self.webcam_status_var = tk.StringVar()
+        webcam_status_label = ttk.Label(main_frame, textvariable=self.webcam_status_var,
+                                       font=("Arial", 9))
+        webcam_status_label.grid(row=8, column=0, columnspan=2, pady=(10, 0))
+        self.update_webcam_status(probing=True)
+        
+        # Non-modal notices about takes saved in the background
+        self.notice_var = tk.StringVar(value="")
+        self.notice_label = ttk.Label(main_frame, textvariable=self.notice_var,
+                                      font=("Arial", 9), wraplength=360)
+        self.notice_label.grid(row=9, column=0, columnspan=2, pady=(10, 0))
+        self._notice_timer = None
+        
+    def update_webcam_status(self, probing=False):
+        """Show the current webcam availability below the instructions"""
+        if self.webcam_available:
+            self.webcam_status_var.set("✅ Webcam detected - Video recording enabled")
+        elif not self.enable_video:
+            self.webcam_status_var.set("🎤 Audio-only mode")
+        elif probing:
+            self.webcam_status_var.set("⏳ Checking for webcam...")
+        else:
+            self.webcam_status_var.set("⚠️ No webcam detected - Audio only")
         
     def start_recording_process(self):
         """Start the recording process with countdown"""
@@ -229,275 +303,134 @@ class AudioRecorderApp:
         # Disable the button and start the process
         self.record_button.config(state='disabled')
         
-        # Pre-initialize webcam if available to avoid delay after countdown
-        if self.webcam_available:
-            try:
-                self.webcam = cv2.VideoCapture(0)
-                if not self.webcam.isOpened():
-                    print("Warning: Could not open webcam, falling back to audio-only")
-                    self.webcam_available = False
-                    if self.webcam:
-                        self.webcam.release()
-                        self.webcam = None
-                else:
-                    # Set webcam properties for better Windows compatibility
-                    if platform.system() == "Windows":
-                        # Set buffer size to reduce latency on Windows
-                        self.webcam.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                        # Set frame format for better compatibility
-                        self.webcam.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
-            except Exception as e:
-                print(f"Warning: Webcam initialization failed: {e}")
-                self.webcam_available = False
-                if self.webcam:
-                    self.webcam.release()
-                    self.webcam = None
-        
         # Start countdown and recording in a separate thread
-        thread = threading.Thread(target=self.recording_thread)
+        thread = threading.Thread(target=self.recording_thread, args=(name,))
         thread.daemon = True
         thread.start()
         
-    def recording_thread(self):
-        """Handle countdown and recording in a separate thread"""
+    def recording_thread(self, name):
+        """Handle countdown and recording in a separate thread.
+        
+        All UI updates are posted to self.ui_events and applied on the Tk
+        thread by on_ui_event.
+        """
+        post = self.ui_events.post
         try:
-            # Countdown phase
-            self.status_var.set("Get ready! Recording will start in...")
+            # Open (or reuse) the webcam while the countdown runs so
+            # its latency is hidden
+            self.recorder.acquire_camera()
             
-            for i in range(self.countdown_time, 0, -1):
-                self.countdown_var.set(str(i))
-                time.sleep(1)
+            # Countdown phase
+            if self.countdown_time > 0:
+                post("status", text="Get ready! Recording will start in...")
                 
-            self.countdown_var.set("")
-            
-            # Recording phase
-            status_text = "🔴 RECORDING... Speak now!"
-            if self.webcam_available:
-                status_text += " (Audio + Video)"
-            self.status_var.set(status_text)
+                for i in range(self.countdown_time, 0, -1):
+                    post("countdown", text=str(i))
+                    time.sleep(1)
+                    
+                post("countdown", text="")
+            
+            # Recording phase - capture and encode are done by the engine.
+            # The files are finalized in the background and reported with a
+            # "saved" event, so the next take can start right away
             self.is_recording = True
-            
-            # Start progress bar
-            self.progress['maximum'] = self.duration * 10  # Update every 0.1 seconds
-            self.progress['value'] = 0
-            
-            # New approach: Record video with audio synchronously if webcam available
-            if self.webcam_available:
-                self.record_video_with_audio()
-            else:
-                # Record audio only
-                self.record_audio_only()
-            
-            # Save the recordings
-            self.save_recording()
+            self.recorder.record(name, duration=self.duration, background=True)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Recording failed: {str(e)}")
+            post("error", title="Error", text=f"Recording failed: {str(e)}")
         finally:
-            # Reset UI
+            # Keep the webcam warm for the next take
+            self.recorder.release_camera()
             self.is_recording = False
+            post("finished")
+    
+    def on_ui_event(self, event, data):
+        """Apply an update posted by the recording engine or worker thread"""
+        if event == "status":
+            self.status_var.set(data["text"])
+        elif event == "countdown":
+            self.countdown_var.set(data["text"])
+        elif event == "progress":
+            self.progress['maximum'] = data["duration"] * 10  # Update every 0.1 seconds
+            self.progress['value'] = min(int(data["elapsed"] * 10), data["duration"] * 10)
+        elif event == "level":
+            # Bar spans LEVEL_FLOOR_DB..0 dBFS of the peak level
+            self.level_bar['value'] = max(0.0, data["peak_db"] - LEVEL_FLOOR_DB)
+            if data["clipping"]:
+                self.level_var.set("⚠️ CLIPPING")
+                self.level_label.config(foreground="red")
+            else:
+                self.level_var.set(f"Peak {data['peak_db']:.0f} dBFS")
+                self.level_label.config(foreground="")
+        elif event == "levels":
+            # Take summary: keep clipping or silence warnings visible
+            if data["problems"]:
+                self.level_var.set("⚠️ " + data["problems"][0].split(" - ")[0])
+                self.level_label.config(foreground="red")
+        elif event == "webcam" and not data["available"]:
+            # The camera failed to open for a take - forget the cached probe
+            self.device_prober.invalidate_webcam()
+            self.update_webcam_status()
+        elif event == "saved":
+            self.save_recording(data["take"])
+        elif event == "save_failed":
+            self.notify(f"❌ Saving {data['take'].basename} failed: {data['error']}", error=True)
+        elif event == "error":
+            messagebox.showerror(data["title"], data["text"])
+        elif event == "finished":
+            # Reset UI
             self.status_var.set("Enter your name and click 'Start Recording'")
             self.countdown_var.set("")
             self.progress['value'] = 0
+            self.level_bar['value'] = 0
             self.record_button.config(state='normal')
-            
-            # Cleanup webcam if it was initialized for this recording
-            if hasattr(self, 'webcam') and self.webcam:
-                self.webcam.release()
-                self.webcam = None
-            
-    def record_video_with_audio(self):
-        """Record video and audio synchronously to avoid timing issues"""
-        try:
-            # Webcam should already be initialized in start_recording_process
-            if not self.webcam or not self.webcam.isOpened():
-                print("Warning: Webcam not available for recording")
-                # Fall back to audio only
-                self.record_audio_only()
-                return
-            
-            # Get webcam properties
-            fps = 30  # Frame rate
-            width = int(self.webcam.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(self.webcam.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            # Ensure we have valid dimensions
-            if width <= 0 or height <= 0:
-                width, height = 640, 480  # Default resolution
-                print(f"Warning: Invalid webcam resolution, using default {width}x{height}")
-            
-            # Create video filename
-            name = self.name_var.get().strip()
-            safe_name = self.sanitize_filename(name) if name else "anonymous"
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            video_filename = f"{safe_name}_{timestamp}.mp4"
-            
-            # Ensure recordings directory exists
-            recordings_dir = os.path.join(os.getcwd(), "recordings")
-            if not os.path.exists(recordings_dir):
-                os.makedirs(recordings_dir, exist_ok=True)
-            
-            video_filepath = os.path.join(recordings_dir, video_filename)
-            
-            # Initialize video writer (MP4 codec, no audio)
-            # Use Windows-compatible codec selection
-            if platform.system() == "Windows":
-                # Try different codecs for better Windows compatibility
-                codecs_to_try = ['mp4v', 'XVID', 'MJPG', 'WMV2']
-                self.video_writer = None
-                
-                for codec_name in codecs_to_try:
-                    try:
-                        fourcc = cv2.VideoWriter_fourcc(*codec_name)
-                        self.video_writer = cv2.VideoWriter(video_filepath, fourcc, fps, (width, height))
-                        if self.video_writer.isOpened():
-                            break
-                        else:
-                            self.video_writer.release()
-                    except:
-                        continue
-                
-                if not self.video_writer or not self.video_writer.isOpened():
-                    print("Warning: Could not initialize video writer with any codec")
-                    # Fall back to audio only
-                    self.record_audio_only()
-                    return
-            else:
-                # Use default codec for other platforms
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                self.video_writer = cv2.VideoWriter(video_filepath, fourcc, fps, (width, height))
-            
-            # Verify video writer is working
-            if not self.video_writer.isOpened():
-                print("Warning: Video writer could not be initialized")
-                # Fall back to audio only
-                self.record_audio_only()
-                return
-            
-            # Start audio recording in the background
-            self.recording_data = sd.rec(int(self.duration * self.sample_rate), 
-                                       samplerate=self.sample_rate, 
-                                       channels=1, dtype=np.float32)
-            
-            # Record video for the duration - synchronized with audio
-            start_time = time.time()
-            frame_count = 0
-            target_frames = fps * self.duration
-            
-            while time.time() - start_time < self.duration and frame_count < target_frames:
-                ret, frame = self.webcam.read()
-                if ret:
-                    self.video_writer.write(frame)
-                    frame_count += 1
-                else:
-                    # Handle frame read failures
-                    print("Warning: Failed to read frame from webcam")
-                    break
-                
-                # Update progress bar
-                progress_value = int((time.time() - start_time) * 10)
-                if progress_value <= self.duration * 10:
-                    self.progress['value'] = progress_value
-                
-                time.sleep(1.0 / fps)  # Maintain frame rate
-            
-            # Wait for audio recording to complete
-            sd.wait()
-            
-            print(f"Recorded {frame_count} video frames")
-            
-        except Exception as e:
-            error_msg = f"Error during synchronized recording: {e}"
-            print(error_msg)
-            # On Windows, provide additional troubleshooting info
-            if platform.system() == "Windows":
-                print("Windows troubleshooting:")
-                print("- Check camera permissions in Windows Settings")
-                print("- Close other apps using the camera")
-                print("- Try running as administrator")
-            # Fall back to audio only
-            self.record_audio_only()
-        finally:
-            # Cleanup webcam resources
-            if hasattr(self, 'video_writer') and self.video_writer:
-                self.video_writer.release()
-                self.video_writer = None
-            if hasattr(self, 'webcam') and self.webcam:
-                self.webcam.release()
-                self.webcam = None
+            if self.recorder.finalize_queue.pending:
+                self.notify("💾 Saving the last take in the background...")
     
-    def record_audio_only(self):
-        """Record audio only when no webcam is available"""
-        try:
-            # Record audio
-            self.recording_data = sd.rec(int(self.duration * self.sample_rate), 
-                                       samplerate=self.sample_rate, 
-                                       channels=1, dtype=np.float32)
-            
-            # Update progress bar during recording
-            for i in range(self.duration * 10):
-                time.sleep(0.1)
-                self.progress['value'] = i + 1
-                
-            sd.wait()  # Wait until recording is finished
-            
-        except Exception as e:
-            print(f"Error during audio recording: {e}")
-            raise
+    def notify(self, text, error=False):
+        """Show a notice below the form without blocking the next take.
+        
+        Notices disappear after NOTICE_MS; errors stay until the next one.
+        """
+        self.notice_var.set(text)
+        self.notice_label.config(foreground="red" if error else "")
+        if self._notice_timer is not None:
+            self.root.after_cancel(self._notice_timer)
+            self._notice_timer = None
+        if not error:
+            self._notice_timer = self.root.after(NOTICE_MS, self._clear_notice)
     
-    def save_recording(self):
-        """Save the recorded audio to a WAV file"""
-        try:
-            name = self.name_var.get().strip()
-            
-            # Sanitize name for cross-platform filename compatibility
-            safe_name = self.sanitize_filename(name) if name else "anonymous"
-            
-            # Create filename with timestamp to avoid conflicts
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{safe_name}_{timestamp}.wav"
-            
-            # Ensure recordings directory exists with cross-platform path handling
-            recordings_dir = os.path.join(os.getcwd(), "recordings")
-            if not os.path.exists(recordings_dir):
-                os.makedirs(recordings_dir, exist_ok=True)
-                
-            filepath = os.path.join(recordings_dir, filename)
-            
-            # Convert float32 to int16 for WAV file
-            audio_data = (self.recording_data * 32767).astype(np.int16)
-            
-            # Write WAV file with explicit binary mode for Windows compatibility
-            with wave.open(filepath, 'wb') as wf:
-                wf.setnchannels(1)  # Mono
-                wf.setsampwidth(2)  # 2 bytes per sample (int16)
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(audio_data.tobytes())
-                
-            self.status_var.set(f"✅ Recording saved as: {filename}")
-            
-            # Prepare success message
-            success_msg = f"Recording saved successfully!\nAudio file: {filename}\nLocation: {recordings_dir}"
-            
+    def _clear_notice(self):
+        self._notice_timer = None
+        self.notice_var.set("")
+    
+    def save_recording(self, take):
+        """Tell the user a take's files were written"""
+        filename = os.path.basename(take.muxed_path or take.audio_path)
+        if take.muxed_path:
+            message = f"✅ Saved {filename} (audio + video)"
+        else:
+            message = f"✅ Saved {filename}"
             # Check if video was also recorded
-            if self.webcam_available:
-                video_filename = f"{safe_name}_{timestamp}.mp4"
-                video_filepath = os.path.join(recordings_dir, video_filename)
-                if os.path.exists(video_filepath):
-                    success_msg += f"\nVideo file: {video_filename}"
-                else:
-                    success_msg += "\nNote: Video recording may have failed"
-            
-            messagebox.showinfo("Success", success_msg)
-            
-        except Exception as e:
-            error_msg = f"Failed to save recording: {str(e)}"
-            self.status_var.set("❌ Save failed - check console")
-            messagebox.showerror("Error", error_msg)
-
+            if take.video_path and os.path.exists(take.video_path):
+                message += f" + {os.path.basename(take.video_path)}"
+            elif take.video_path:
+                message += " - video recording may have failed"
+        self.notify(f"{message} in {take.directory}")
 
 def main():
     """Main function to run the application"""
+    parser = argparse.ArgumentParser(description="Audio Recorder")
+    parser.add_argument("--audio-only", action="store_true",
+                        help="disable the webcam (OpenCV is never loaded)")
+    parser.add_argument("--profile", default="default",
+                        help="named audio capture profile, e.g. speech or music")
+    parser.add_argument("--preroll", type=float, default=3.0, metavar="SECONDS",
+                        help="audio from before the countdown ends to keep (0 to disable)")
+    parser.add_argument("--countdown", type=int, default=3, metavar="SECONDS",
+                        help="countdown before each take (0 to start at once)")
+    args = parser.parse_args()
+    
     try:
         # Handle Windows-specific DPI awareness for better GUI scaling
         if platform.system() == "Windows":
@@ -517,7 +450,8 @@ def main():
         except:
             pass  # Ignore if icon file not found
             
-        app = AudioRecorderApp(root)
+        app = AudioRecorderApp(root, enable_video=not args.audio_only, profile=args.profile,
+                               preroll=args.preroll, countdown=args.countdown)
         
         try:
             root.mainloop()
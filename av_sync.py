@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Shared clock and A/V sync index.
+
+Every audio block and every video frame of a take is stamped against one
+monotonic clock (time.perf_counter()). The stamps are streamed to a sidecar
+``<take>.sync.jsonl`` file next to the recordings so downstream tools can
+align audio and video with a lookup instead of a cross-correlation.
+
+Sidecar format (one JSON object per line):
+    {"type": "header", ...take metadata...}
+    {"type": "audio", "frame": <first sample frame>, "frames": <n>, "t": <s>}
+    {"type": "video", "frame": <output frame>, "t": <capture s>, "deadline": <s>}
+    {"type": "trim", "leading_frames": <n>, "trailing_frames": <n>}  (VAD takes)
+    {"type": "levels", "peak_db": <dBFS>, "rms_db": <dBFS>, "clipped_samples": <n>, ...}
+    {"type": "summary", "audio_start": <s>, "video_start": <s>, "av_offset": <s>}
+Times are seconds relative to the take's clock origin.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+
+
+def _round(value):
+    return None if value is None else round(value, 6)
+
+
+class MonotonicClock:
+    """Monotonic take clock shared by the audio and video paths"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.wall_origin = time.time()
+
+    def now(self):
+        """Seconds since the clock origin"""
+        return time.perf_counter() - self.origin
+
+    def relative(self, perf_time):
+        """Convert an absolute time.perf_counter() value to take time"""
+        return perf_time - self.origin
+
+
+class StreamClockMapper:
+    """Translate PortAudio stream times into time.perf_counter() time.
+
+    The audio callback reports inputBufferAdcTime on the stream's own clock.
+    Each callback also observes currentTime and perf_counter() together; the
+    smallest observed difference is the best estimate of the clock offset
+    because callback scheduling delay can only make it larger.
+    """
+
+    def __init__(self):
+        self.offset = None
+
+    def adc_time(self, time_info, frames, sample_rate):
+        """Return the perf_counter() time at which the block's first sample
+        was captured by the ADC"""
+        now = time.perf_counter()
+        current = getattr(time_info, 'currentTime', 0.0)
+        adc = getattr(time_info, 'inputBufferAdcTime', 0.0)
+        if not current:
+            # Host API does not report stream times - assume the block
+            # has just been completed
+            return now - frames / sample_rate
+
+        offset = now - current
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        if not adc:
+            adc = current - frames / sample_rate
+        return adc + self.offset
+
+
+class SyncIndex:
+    """Stream A/V timestamps of a take to a sidecar JSON lines file"""
+
+    def __init__(self, filepath, clock, **metadata):
+        self.filepath = filepath
+        self.clock = clock
+        self.audio_start = None
+        self.video_start = None
+        self.audio_blocks = 0
+        self.video_frames = 0
+        self._lock = threading.Lock()
+        self.file = open(filepath, 'w', encoding='utf-8')
+
+        header = {"type": "header",
+                  "version": 1,
+                  "clock": "perf_counter",
+                  "wall_origin": datetime.fromtimestamp(clock.wall_origin).isoformat()}
+        header.update(metadata)
+        self._write(header)
+
+    def _write(self, record):
+        with self._lock:
+            self.file.write(json.dumps(record) + "\n")
+
+    def add_audio_block(self, first_frame, frames, perf_time):
+        """Record the capture time of an audio block's first sample"""
+        t = self.clock.relative(perf_time)
+        if self.audio_start is None:
+            self.audio_start = t
+        self.audio_blocks += 1
+        self._write({"type": "audio", "frame": first_frame, "frames": frames,
+                     "t": round(t, 6)})
+
+    def add_video_frame(self, frame_index, perf_time, deadline=None):
+        """Record the capture time of a written video frame"""
+        t = self.clock.relative(perf_time)
+        if self.video_start is None:
+            self.video_start = t
+        self.video_frames += 1
+        record = {"type": "video", "frame": frame_index, "t": round(t, 6)}
+        if deadline is not None:
+            record["deadline"] = round(self.clock.relative(deadline), 6)
+        self._write(record)
+
+    def trim_audio(self, leading_frames, trailing_frames, sample_rate):
+        """Record that the audio file omits leading_frames captured frames
+        at its start (and trailing_frames at its end). Audio records keep
+        their capture frame numbers; audio_start moves to the file's first
+        sample so the A/V offset stays correct for the trimmed file."""
+        if self.audio_start is not None:
+            self.audio_start += leading_frames / sample_rate
+        self._write({"type": "trim", "leading_frames": leading_frames,
+                     "trailing_frames": trailing_frames})
+
+    def add_levels(self, stats):
+        """Record the audio level statistics of the take's file"""
+        record = {"type": "levels"}
+        record.update(stats)
+        self._write(record)
+
+    @property
+    def av_offset(self):
+        """Seconds by which the first video frame trails the first audio
+        sample (negative if video started first)"""
+        if self.audio_start is None or self.video_start is None:
+            return None
+        return self.video_start - self.audio_start
+
+    def close(self):
+        """Write the summary record and close the sidecar"""
+        if self.file is None:
+            return
+        offset = self.av_offset
+        self._write({"type": "summary",
+                     "audio_start": _round(self.audio_start),
+                     "video_start": _round(self.video_start),
+                     "av_offset": _round(offset),
+                     "audio_blocks": self.audio_blocks,
+                     "video_frames": self.video_frames})
+        self.file.close()
+        self.file = None
+
+
+def load_sync_index(filepath):
+    """Read a sidecar file into (header, audio, video, summary)"""
+    header, summary = None, None
+    audio, video = [], []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            kind = record.get("type")
+            if kind == "audio":
+                audio.append(record)
+            elif kind == "video":
+                video.append(record)
+            elif kind == "header":
+                header = record
+            elif kind == "summary":
+                summary = record
+    return header, audio, video, summary
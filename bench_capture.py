@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+End-to-end recording benchmark on synthetic devices.
+
+Records takes through Recorder exactly as the CLI does, with the
+microphone and webcam replaced by the fake backends in fake_backends.py,
+so it runs on CI and headless build boxes. For every take it reports:
+
+    capture fps      rate at which the camera delivered frames
+    dropped          video frames dropped because the encoder fell behind
+    start latency    record() call to the start of capture (camera, writers)
+    end latency      scheduled end of the take to record() returning with
+                     every file finalized (with --background: to record()
+                     returning, i.e. until the next take could start)
+    peak RSS         highest resident memory of the process during the take
+    CPU              process CPU time per second of record() (1.0 = one core)
+
+Inputs are deterministic (tone or seeded noise, generated video frames), so
+runs on the same machine are comparable.
+
+Usage: python bench_capture.py [--takes N] [--duration S] [--audio tone|noise|FILE.wav]
+                               [--video pattern|none|FILE] [--video-mode encode|passthrough]
+                               [--audio-codec flac|opus|wav] [--background] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from fake_backends import (FileCamera, NoiseSource, SyntheticCamera, ToneSource, WavSource,
+                           fake_audio)
+from frame_preprocess import parse_size
+from recorder import Recorder, RecorderConfig
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss():
+    """Resident memory of this process in bytes, or None if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    # Not the current value but the process peak: kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RSSSampler:
+    """Track the peak resident memory on a background thread"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+
+
+def audio_source(spec):
+    """Audio source for --audio: "tone", "noise" or a .wav path"""
+    if spec == "tone":
+        return ToneSource(440.0, amplitude=0.25)
+    if spec == "noise":
+        return NoiseSource(0.05, seed=0)
+    return WavSource(spec)
+
+
+def camera_factory(spec, size=(640, 480), fps=30):
+    """open_capture for --video: "pattern", "none" or a video file"""
+    if spec == "none":
+        return None
+    if spec == "pattern":
+        return lambda index: SyntheticCamera(size[0], size[1], fps)
+    return lambda index: FileCamera(spec, fps=fps)
+
+
+def measure_take(recorder, duration, background=False):
+    """Record one take and return its metrics"""
+    starts = []
+
+    def listener(event, data):
+        # Progress events during the take give its start: now - elapsed
+        if event == "progress" and data["elapsed"] > 0:
+            starts.append(time.perf_counter() - data["elapsed"])
+
+    recorder.listener = listener
+    called = time.perf_counter()
+    cpu = time.process_time()
+    with RSSSampler() as rss:
+        take = recorder.record("bench", duration=duration, background=background)
+    returned = time.perf_counter()
+    cpu = time.process_time() - cpu
+
+    started = min(starts) if starts else called
+    return {"take": take.basename,
+            "capture_fps": round(take.capture_fps, 2),
+            "video_frames": take.video_frames,
+            "dropped_frames": take.dropped_frames,
+            "audio_frames": take.audio_frames,
+            "audio_overruns": take.audio_overruns,
+            "start_latency_ms": round((started - called) * 1000, 1),
+            "end_latency_ms": round((returned - started - duration) * 1000, 1),
+            "peak_rss_mb": round(rss.peak / 2 ** 20, 1) if rss.peak else None,
+            "cpu_per_second": round(cpu / (returned - called), 3),
+            "stages": take.metrics,
+            "take_object": take}
+
+
+def run_benchmark(takes=3, duration=5.0, audio="tone", video="pattern", output_dir=None,
+                  frame_size=(640, 480), background=False, **config):
+    """Record takes on fake devices and return one metrics dict per take.
+
+    Extra keyword arguments are RecorderConfig fields (e.g. video_mode,
+    audio_codec). Files go to a temporary directory unless output_dir is
+    given. With background=True the files are finalized on the recorder's
+    finalize queue while the next take records.
+    """
+    open_capture = camera_factory(video, frame_size, config.get("fps", 30))
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(audio_source(audio)):
+        config = RecorderConfig(output_dir=output_dir or tmp, enable_video=open_capture is not None,
+                                camera_idle_timeout=None, **config)
+        recorder = Recorder(config, open_capture=open_capture)
+        try:
+            results = [measure_take(recorder, duration, background) for _ in range(takes)]
+        finally:
+            recorder.close()
+    for result in results:
+        # Background saves have finished once the recorder is closed
+        result["stages"] = result.pop("take_object").metrics
+    return results
+
+
+def summarize(results):
+    """Median of each numeric metric over the takes"""
+    keys = [k for k, v in results[0].items() if isinstance(v, (int, float))]
+    return {k: statistics.median(r[k] for r in results if r[k] is not None) for k in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recording on synthetic devices")
+    parser.add_argument("--takes", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--audio", default="tone", help="tone, noise or a 16-bit .wav file")
+    parser.add_argument("--video", default="pattern", help="pattern, none or a video file")
+    parser.add_argument("--frame-size", type=parse_size, default=(640, 480),
+                        help="size of the generated frames (default: 640x480)")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--video-mode", choices=["encode", "passthrough"], default="encode")
+    parser.add_argument("--audio-codec", choices=["flac", "opus", "wav"], default="flac")
+    parser.add_argument("--background", action="store_true",
+                        help="finalize files in the background, as the GUI does")
+    parser.add_argument("--json", action="store_true", help="print one JSON line per take")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.takes, args.duration, audio=args.audio, video=args.video,
+                            frame_size=args.frame_size, fps=args.fps,
+                            video_mode=args.video_mode, audio_codec=args.audio_codec,
+                            background=args.background)
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+        return
+
+    print(f"{args.takes} x {args.duration:g} s takes, audio {args.audio}, video {args.video} "
+          f"({args.video_mode}), {args.audio_codec}")
+    for number, r in enumerate(results, 1):
+        print(f"take {number}: {r['capture_fps']:5.1f} fps, {r['dropped_frames']} dropped, "
+              f"start {r['start_latency_ms']:6.1f} ms, end {r['end_latency_ms']:6.1f} ms, "
+              f"peak RSS {r['peak_rss_mb']} MB, CPU {r['cpu_per_second']:.2f}")
+    median = summarize(results)
+    print(f"median: {median['capture_fps']:5.1f} fps, {median['dropped_frames']:g} dropped, "
+          f"start {median['start_latency_ms']:6.1f} ms, end {median['end_latency_ms']:6.1f} ms, "
+          f"peak RSS {median['peak_rss_mb']} MB, CPU {median['cpu_per_second']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Level meter callback cost benchmark.
+
+Runs the capture engine's audio callback on synthetic blocks with and
+without a LevelMeter and reports the cost per block, the metering overhead
+and how much of the real-time budget (the duration of one block) it uses.
+No audio device is needed: the callback is called directly, exactly as
+PortAudio would.
+
+Usage: python bench_meter.py [--block-size N] [--sample-rate HZ] [--channels 1,2,8]
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from audio_capture import AudioCaptureEngine
+from level_meter import LevelMeter
+
+
+def _callback_cost(engine, block, repeats):
+    """Seconds per call of the engine's audio callback"""
+    time_info = SimpleNamespace(inputBufferAdcTime=0.0, currentTime=0.0)
+    frames = len(block)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        engine._callback(block, frames, time_info, None)
+        # Keep the ring from filling up, as the drain thread would
+        engine.ring.release()
+    return (time.perf_counter() - start) / repeats
+
+
+def run_benchmark(block_size=1024, sample_rate=44100, channels=1, repeats=5000):
+    """Return per-block callback costs with and without metering"""
+    rng = np.random.default_rng(0)
+    block = rng.uniform(-0.5, 0.5, size=(block_size, channels)).astype(np.float32)
+
+    plain = AudioCaptureEngine(sample_rate=sample_rate, channels=channels,
+                               blocksize=block_size)
+    metered = AudioCaptureEngine(sample_rate=sample_rate, channels=channels,
+                                 blocksize=block_size, meter=LevelMeter(channels))
+    # Warm up both paths before timing them
+    _callback_cost(plain, block, 100)
+    _callback_cost(metered, block, 100)
+    plain_s = _callback_cost(plain, block, repeats)
+    metered_s = _callback_cost(metered, block, repeats)
+
+    budget_s = block_size / sample_rate
+    return {"plain_us": plain_s * 1e6, "metered_us": metered_s * 1e6,
+            "meter_us": (metered_s - plain_s) * 1e6,
+            "budget_us": budget_s * 1e6,
+            "budget_fraction": max(0.0, metered_s - plain_s) / budget_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark level metering in the audio callback")
+    parser.add_argument("--block-size", type=int, default=1024)
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--channels", default="1,2,8",
+                        help="comma separated channel counts (default: 1,2,8)")
+    args = parser.parse_args()
+
+    print(f"{args.block_size}-frame blocks at {args.sample_rate} Hz "
+          f"({args.block_size / args.sample_rate * 1000:.1f} ms real-time budget per block)")
+    for channels in (int(c) for c in args.channels.split(",")):
+        r = run_benchmark(args.block_size, args.sample_rate, channels)
+        print(f"{channels} ch: callback {r['plain_us']:6.1f} us, with meter "
+              f"{r['metered_us']:6.1f} us, meter {r['meter_us']:6.1f} us "
+              f"({r['budget_fraction']:.2%} of the budget)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Float to PCM conversion micro-benchmark.
+
+Compares the old one-shot conversion, ``(data * 32767).astype(np.int16)``,
+with pcm.PCMConverter writing the same take in chunks. It reports the peak
+memory allocated during the conversion (measured with tracemalloc, which
+numpy reports its buffers to) and the throughput of both paths, plus the
+per-block cost at the capture engine's block size.
+
+Usage: python bench_pcm.py [--seconds S] [--sample-rate HZ] [--format FMT] [--dither]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from pcm import SAMPLE_FORMATS, PCMConverter
+
+
+def _measure(func):
+    """Run func and return (seconds, peak bytes allocated while it ran)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def naive_convert(data, sink):
+    """The original conversion: full-size temporaries for the whole take"""
+    sink.write((data * 32767).astype(np.int16).tobytes())
+
+
+def chunked_convert(data, sink, converter):
+    for pcm in converter.convert_chunks(data):
+        sink.write(pcm)
+
+
+def run_benchmark(seconds=600, sample_rate=44100, sample_format="int16", dither=False,
+                  block_size=1024):
+    """Return a dict of timings and peak memory for both conversion paths"""
+    rng = np.random.default_rng(0)
+    data = rng.uniform(-1.0, 1.0, size=(int(seconds * sample_rate), 1)).astype(np.float32)
+    converter = PCMConverter(sample_format, dither=dither)
+
+    with open(os.devnull, "wb") as sink:
+        naive_s, naive_peak = _measure(lambda: naive_convert(data, sink))
+        chunked_s, chunked_peak = _measure(lambda: chunked_convert(data, sink, converter))
+
+    # Per-block cost as seen by the capture engine's drain thread
+    block = data[:block_size]
+    repeats = 2000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        (block * 32767).astype(np.int16).tobytes()
+    naive_block_us = (time.perf_counter() - start) / repeats * 1e6
+    start = time.perf_counter()
+    for _ in range(repeats):
+        converter.convert(block)
+    block_us = (time.perf_counter() - start) / repeats * 1e6
+
+    return {"input_bytes": data.nbytes,
+            "naive_seconds": naive_s, "naive_peak": naive_peak,
+            "chunked_seconds": chunked_s, "chunked_peak": chunked_peak,
+            "naive_block_us": naive_block_us, "block_us": block_us}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark float to PCM conversion")
+    parser.add_argument("--seconds", type=float, default=600,
+                        help="length of the simulated take (default: 600)")
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--format", choices=list(SAMPLE_FORMATS), default="int16")
+    parser.add_argument("--dither", action="store_true")
+    args = parser.parse_args()
+
+    r = run_benchmark(args.seconds, args.sample_rate, args.format, args.dither)
+    mb = 1024 * 1024
+    print(f"{args.seconds:.0f} s take at {args.sample_rate} Hz "
+          f"({r['input_bytes'] / mb:.1f} MB of float32 input)")
+    print(f"naive int16:      peak {r['naive_peak'] / mb:8.1f} MB  {r['naive_seconds'] * 1000:8.1f} ms  "
+          f"{r['naive_block_us']:6.1f} us/block")
+    print(f"chunked {args.format + (' dither' if args.dither else ''):<9} peak {r['chunked_peak'] / mb:8.1f} MB  "
+          f"{r['chunked_seconds'] * 1000:8.1f} ms  {r['block_us']:6.1f} us/block")
+
+
+if __name__ == "__main__":
+    main()
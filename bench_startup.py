@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Startup import benchmark.
+
+Runs ``python -X importtime -c "import audio_recorder"`` in a fresh
+interpreter several times and reports the import cost of the application
+module. It fails (exit code 1) if a heavy media backend such as OpenCV or
+sounddevice is imported at startup, or if the median import time exceeds the
+budget, so it can guard the lazy-import behaviour in CI.
+
+Usage: python bench_startup.py [--runs N] [--budget-ms MS] [--module NAME]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("cv2", "sounddevice", "soundfile")
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into {module: (self_us, cumulative_us)}"""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # Column header line
+        timings[parts[2].strip()] = (self_us, cumulative_us)
+    return timings
+
+
+def measure_import(module="audio_recorder"):
+    """Import module in a fresh interpreter and return its import timings"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=here, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def run_benchmark(module="audio_recorder", runs=5):
+    """Return (median import ms, heavy modules imported at startup)"""
+    totals = []
+    heavy = set()
+    for _ in range(runs):
+        timings = measure_import(module)
+        totals.append(timings[module][1] / 1000.0)
+        heavy.update(name for name in timings if name.split(".")[0] in HEAVY_MODULES)
+    return statistics.median(totals), sorted(heavy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure application import time")
+    parser.add_argument("--module", default="audio_recorder")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    median_ms, heavy = run_benchmark(args.module, args.runs)
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs")
+
+    ok = True
+    if heavy:
+        print(f"❌ Heavy backends imported at startup: {', '.join(heavy)}")
+        ok = False
+    else:
+        print(f"✅ No heavy backends imported ({', '.join(HEAVY_MODULES)})")
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"❌ Import time exceeds budget of {args.budget_ms:.0f} ms")
+        ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Persistent webcam handle shared across takes.
+
+Opening the camera and waiting for auto-exposure to settle is the slowest
+part of starting a take. CameraManager keeps the device open and warm between
+takes and only releases it after it has been idle for idle_timeout seconds.
+Because a warm camera may have buffered frames from seconds ago, flush()
+discards them right before recording so the first recorded frame is fresh.
+"""
+
+import platform
+import threading
+import time
+
+from media_backends import get_cv2
+
+
+def configure_capture(cap):
+    """Apply platform-specific capture settings to a freshly opened camera"""
+    cv2 = get_cv2()
+    if platform.system() == "Windows":
+        # Set buffer size to reduce latency on Windows
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # Set frame format for better compatibility
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+
+
+_JPEG_START = b'\xff\xd8'
+
+
+def enable_passthrough(cap):
+    """Ask the camera for MJPG and turn off decoding in OpenCV.
+
+    Returns True if frames retrieved from cap are now undecoded JPEG
+    images. Decoding is switched back on if the camera or capture backend
+    does not deliver raw JPEG frames.
+    """
+    cv2 = get_cv2()
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+    # FORMAT = -1 asks V4L2 and FFmpeg for raw packets and must come first;
+    # MSMF and DirectShow honour CONVERT_RGB
+    cap.set(cv2.CAP_PROP_FORMAT, -1)
+    cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+
+    ok, frame = cap.read()
+    if ok and is_jpeg_frame(frame):
+        return True
+    disable_passthrough(cap)
+    return False
+
+
+def disable_passthrough(cap):
+    """Restore decoded BGR frames"""
+    cv2 = get_cv2()
+    cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+    cap.set(cv2.CAP_PROP_FORMAT, cv2.CV_8UC3)
+
+
+def is_jpeg_frame(frame):
+    """Whether a retrieved frame is an undecoded JPEG buffer"""
+    return (frame is not None and frame.dtype.itemsize == 1 and frame.size > 2
+            and (frame.ndim == 1 or frame.shape[0] == 1)
+            and frame.reshape(-1)[:2].tobytes() == _JPEG_START)
+
+
+class CameraManager:
+    """Open the webcam on demand and keep it warm between takes.
+
+    open_capture(index) opens the camera; it defaults to cv2.VideoCapture
+    and can return any object with the same interface (see fake_backends.py).
+    Open times are recorded in metrics (metrics.MetricsRegistry) if given.
+    """
+
+    def __init__(self, index=0, idle_timeout=120.0, open_capture=None, metrics=None):
+        self.index = index
+        self.idle_timeout = idle_timeout
+        self.open_capture = open_capture
+        self.metrics = metrics
+        self.capture = None
+        self.opened_at = None
+        self.passthrough = False
+        self._passthrough_unsupported = False
+        self._in_use = False
+        self._idle_timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.capture is not None
+
+    def acquire(self):
+        """Return an open camera, opening it only if it is not already warm.
+
+        Returns None if the camera could not be opened.
+        """
+        with self._lock:
+            self._cancel_idle_timer()
+            if self.capture is not None and not self.capture.isOpened():
+                self._close_locked()
+
+            if self.capture is None:
+                open_capture = self.open_capture or get_cv2().VideoCapture
+                start = time.perf_counter()
+                cap = open_capture(self.index)
+                if not cap.isOpened():
+                    cap.release()
+                    return None
+                configure_capture(cap)
+                self.capture = cap
+                self.opened_at = time.perf_counter()
+                if self.metrics is not None:
+                    self.metrics.observe("camera_open_seconds", self.opened_at - start)
+
+            self._in_use = True
+            return self.capture
+
+    def set_passthrough(self, enabled):
+        """Switch the open camera between undecoded JPEG and BGR frames.
+
+        Returns whether passthrough is active afterwards. A camera that
+        cannot do passthrough is not asked again until it is reopened.
+        """
+        if self.capture is None or enabled == self.passthrough:
+            return self.passthrough
+        if not enabled:
+            disable_passthrough(self.capture)
+            self.passthrough = False
+        elif not self._passthrough_unsupported:
+            self.passthrough = enable_passthrough(self.capture)
+            self._passthrough_unsupported = not self.passthrough
+        return self.passthrough
+
+    def flush(self, max_grabs=10, fresh_threshold=0.01):
+        """Discard frames buffered while the camera sat idle.
+
+        Buffered frames are returned almost instantly; once a grab has to
+        wait for the sensor (longer than fresh_threshold seconds) the buffer
+        is empty and the next frame will be current.
+        """
+        if self.capture is None:
+            return 0
+        discarded = 0
+        for _ in range(max_grabs):
+            start = time.perf_counter()
+            if not self.capture.grab():
+                break
+            discarded += 1
+            if time.perf_counter() - start > fresh_threshold:
+                break
+        return discarded
+
+    def release(self):
+        """Hand the camera back; it is closed after idle_timeout seconds"""
+        with self._lock:
+            self._in_use = False
+            self._cancel_idle_timer()
+            if self.capture is None:
+                return
+            if self.idle_timeout is None:
+                return
+            if self.idle_timeout <= 0:
+                self._close_locked()
+                return
+            self._idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _close_if_idle(self):
+        with self._lock:
+            if not self._in_use:
+                self._close_locked()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _close_locked(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+            self.opened_at = None
+            self.passthrough = False
+            self._passthrough_unsupported = False
+
+    def close(self):
+        """Release the camera immediately"""
+        with self._lock:
+            self._cancel_idle_timer()
+            self._in_use = False
+            self._close_locked()
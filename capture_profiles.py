@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Named audio capture profiles.
+
+A profile bundles the input stream settings of a take: sample rate, channel
+count, sample dtype, block size and latency hint. Low-rate speech profiles
+cut storage and CPU by a factor of three compared to 48 kHz, while
+multi-channel profiles drive array microphones on nodes that have them.
+
+Besides the built-in profiles below, custom profiles can be defined in a
+JSON file (DEFAULT_PROFILES_PATH, or any path passed to load_profiles())
+mapping profile names to their settings:
+
+    {"booth": {"sample_rate": 32000, "channels": 2, "latency": "low"}}
+
+validate_profile() checks a profile against the input device with
+sounddevice.check_input_settings() so an unsupported profile fails before a
+take starts rather than in the middle of it.
+"""
+
+import json
+import os
+from dataclasses import dataclass, fields
+from typing import Optional, Union
+
+from media_backends import get_sounddevice
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.expanduser("~"), ".audio_recorder", "profiles.json")
+
+# Sample dtypes the capture engine and the WAV writer accept
+CAPTURE_DTYPES = ("float32", "int16", "int32")
+
+
+class ProfileError(ValueError):
+    """Raised for unknown profiles or settings the input device rejects"""
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    """Input stream settings for a take"""
+    name: str
+    sample_rate: int = 44100  # Hz
+    channels: int = 1
+    dtype: str = "float32"
+    block_size: int = 1024  # frames per audio callback block
+    latency: Optional[Union[str, float]] = None  # 'low', 'high' or seconds
+    description: str = ""
+
+    def __post_init__(self):
+        if self.sample_rate <= 0:
+            raise ProfileError(f"{self.name}: sample_rate must be positive")
+        if self.channels <= 0:
+            raise ProfileError(f"{self.name}: channels must be positive")
+        if self.block_size <= 0:
+            raise ProfileError(f"{self.name}: block_size must be positive")
+        if self.dtype not in CAPTURE_DTYPES:
+            raise ProfileError(f"{self.name}: dtype must be one of {', '.join(CAPTURE_DTYPES)}")
+        if isinstance(self.latency, str) and self.latency not in ("low", "high"):
+            raise ProfileError(f"{self.name}: latency must be 'low', 'high' or seconds")
+
+    @property
+    def block_duration(self):
+        """Length of one callback block in seconds"""
+        return self.block_size / self.sample_rate
+
+    def bytes_per_second(self, sample_width=2):
+        """Storage rate of this profile for a given output sample width"""
+        return self.sample_rate * self.channels * sample_width
+
+
+PROFILES = {p.name: p for p in (
+    CaptureProfile("default", 44100, 1, block_size=1024,
+                   description="CD-rate mono, the historical default"),
+    CaptureProfile("speech", 16000, 1, block_size=320, latency="low",
+                   description="16 kHz mono for voice; 20 ms blocks"),
+    CaptureProfile("music", 48000, 2, block_size=1024,
+                   description="48 kHz stereo"),
+    CaptureProfile("array4", 48000, 4, block_size=1024, latency="high",
+                   description="4-channel microphone array"),
+    CaptureProfile("array8", 48000, 8, block_size=2048, latency="high",
+                   description="8-channel microphone array"),
+)}
+
+
+def load_profiles(path=DEFAULT_PROFILES_PATH):
+    """Read custom profiles from a JSON file.
+
+    Returns {name: CaptureProfile}; a missing file yields no profiles.
+    Unknown keys or invalid values raise ProfileError.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise ProfileError(f"Could not read profiles from {path}: {e}")
+
+    if not isinstance(entries, dict):
+        raise ProfileError(f"{path}: expected a JSON object mapping profile names to settings")
+
+    known = {f.name for f in fields(CaptureProfile)} - {"name"}
+    profiles = {}
+    for name, settings in entries.items():
+        if not isinstance(settings, dict):
+            raise ProfileError(f"{path}: settings of {name!r} must be a JSON object")
+        unknown = set(settings) - known
+        if unknown:
+            raise ProfileError(f"{name}: unknown settings {', '.join(sorted(unknown))}")
+        profiles[name] = CaptureProfile(name=name, **settings)
+    return profiles
+
+
+def available_profiles(path=DEFAULT_PROFILES_PATH):
+    """Built-in profiles overlaid with the custom ones from path"""
+    profiles = dict(PROFILES)
+    profiles.update(load_profiles(path))
+    return profiles
+
+
+def get_profile(name, path=DEFAULT_PROFILES_PATH):
+    """Look up a profile by name"""
+    profiles = available_profiles(path)
+    if name not in profiles:
+        raise ProfileError(f"Unknown capture profile {name!r} "
+                           f"(available: {', '.join(sorted(profiles))})")
+    return profiles[name]
+
+
+def validate_profile(profile, device=None):
+    """Check that the input device supports profile.
+
+    Raises ProfileError with the device's reason if it does not.
+    """
+    sd = get_sounddevice()
+    try:
+        sd.check_input_settings(device=device, channels=profile.channels,
+                                dtype=profile.dtype, samplerate=profile.sample_rate)
+    except Exception as e:
+        raise ProfileError(f"Input device does not support profile {profile.name!r} "
+                           f"({profile.sample_rate} Hz, {profile.channels} ch, "
+                           f"{profile.dtype}): {e}")
+
+
+def describe_profiles(profiles):
+    """One line per profile, for --list-profiles"""
+    lines = []
+    for profile in sorted(profiles.values(), key=lambda p: p.name):
+        latency = str(profile.latency or "default")
+        lines.append(f"{profile.name:<10} {profile.sample_rate:>6} Hz  {profile.channels:>2} ch  "
+                     f"{profile.dtype:<8} block {profile.block_size:<5} latency {latency:<8} "
+                     f"{profile.description}")
+    return lines
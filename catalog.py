@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog of the recorded takes.
+
+Finding a participant's takes used to mean listing the recordings
+directory and parsing filenames, which gets slow once it holds tens of
+thousands of files. The recorder now adds one row per take to
+<output_dir>/catalog.sqlite3 when the take's files are finalized:
+
+    takes   name, sanitized name, start and save time, duration, sample
+            rate, channels, frame counts, codec, capture profile, audio
+            device and camera
+    files   every file of the take with its size and SHA-256 (hashed
+            on the finalize queue right after the take is added)
+
+Lookups by name and by time use indexes. The database runs in WAL mode,
+so the catalog can be queried (e.g. with ``python -m catalog``) while a
+recorder is writing to it. File paths are stored relative to the catalog's
+directory, so a recordings directory can be moved as a whole.
+
+Takes recorded before the catalog existed can be added from their A/V sync
+sidecars with reindex():
+
+    python -m catalog --output-dir recordings --reindex
+    python -m catalog --name alice --since 2024-05-01
+    python -m catalog --verify
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from storage_layout import find_takes, split_basename
+
+CATALOG_NAME = "catalog.sqlite3"
+SCHEMA_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS takes (
+    id INTEGER PRIMARY KEY,
+    take TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    safe_name TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    saved_at TEXT,
+    duration REAL,
+    sample_rate INTEGER,
+    channels INTEGER,
+    audio_frames INTEGER,
+    audio_codec TEXT,
+    video_frames INTEGER,
+    capture_fps REAL,
+    profile TEXT,
+    audio_device TEXT,
+    camera TEXT
+);
+CREATE INDEX IF NOT EXISTS takes_name ON takes (name, started_at);
+CREATE INDEX IF NOT EXISTS takes_safe_name ON takes (safe_name, started_at);
+CREATE INDEX IF NOT EXISTS takes_started_at ON takes (started_at);
+CREATE TABLE IF NOT EXISTS files (
+    take_id INTEGER NOT NULL REFERENCES takes (id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (take_id, path)
+);
+"""
+
+# Columns of the takes table that add_take() accepts
+TAKE_FIELDS = ("take", "name", "safe_name", "started_at", "saved_at", "duration",
+               "sample_rate", "channels", "audio_frames", "audio_codec", "video_frames",
+               "capture_fps", "profile", "audio_device", "camera")
+
+
+class CatalogError(Exception):
+    """The catalog file cannot be used"""
+
+
+def file_checksum(filepath):
+    """SHA-256 of a file as a hex string, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _timestamp(value):
+    """ISO 8601 text for a datetime; other values are passed through"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class RecordingCatalog:
+    """Takes and their files in a SQLite database.
+
+    Safe to share between threads: the recorder writes from its finalize
+    thread while the GUI or a script queries.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = os.path.abspath(filepath)
+        self.root = os.path.dirname(self.filepath)
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        try:
+            self.db = sqlite3.connect(self.filepath, check_same_thread=False)
+            self.db.row_factory = sqlite3.Row
+            # Readers never block the writer and vice versa; NORMAL only
+            # syncs at checkpoints, which WAL keeps consistent after a crash
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("PRAGMA foreign_keys=ON")
+            version = self.db.execute("PRAGMA user_version").fetchone()[0]
+            if version > SCHEMA_VERSION:
+                raise CatalogError(f"{filepath} was written by a newer version "
+                                   f"(schema {version})")
+            with self.db:
+                self.db.executescript(_SCHEMA)
+                self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        except sqlite3.DatabaseError as e:
+            raise CatalogError(f"Cannot open catalog {filepath}: {e}") from e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+    def relative(self, filepath):
+        """Path of a file as stored in the catalog"""
+        return os.path.relpath(os.path.abspath(filepath), self.root).replace(os.sep, "/")
+
+    def absolute(self, path):
+        """Path of a catalogued file on this machine"""
+        return os.path.join(self.root, *path.split("/"))
+
+    # -- Writing ------------------------------------------------------------
+
+    def add_take(self, fields, files=(), checksums=True):
+        """Add or replace a take.
+
+        fields maps column names (TAKE_FIELDS) to values, "take" (the base
+        filename) being the key; datetimes are stored as ISO 8601 text.
+        files are paths of the take's files, which are sized and, with
+        checksums=True, hashed before the database is locked.
+        """
+        unknown = set(fields) - set(TAKE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown catalog fields: {', '.join(sorted(unknown))}")
+        row = {key: _timestamp(fields.get(key)) for key in TAKE_FIELDS}
+        row["safe_name"] = row["safe_name"] or row["take"]
+        row["name"] = row["name"] or row["safe_name"]
+        entries = [(self.relative(p), os.path.getsize(p),
+                    file_checksum(p) if checksums else None) for p in files]
+
+        columns = ", ".join(TAKE_FIELDS)
+        placeholders = ", ".join(f":{key}" for key in TAKE_FIELDS)
+        with self._lock, self.db:
+            # Deleting the old row drops its files too (ON DELETE CASCADE)
+            self.db.execute("DELETE FROM takes WHERE take = ?", (row["take"],))
+            take_id = self.db.execute(f"INSERT INTO takes ({columns}) VALUES ({placeholders})",
+                                      row).lastrowid
+            self.db.executemany("INSERT INTO files (take_id, path, bytes, sha256) "
+                                "VALUES (?, ?, ?, ?)",
+                                [(take_id,) + entry for entry in entries])
+        return take_id
+
+    def update_checksums(self, take):
+        """Hash the take's files that were added without a checksum.
+
+        The recorder catalogs a take as soon as it is saved and fills in
+        the checksums afterwards, off the path to the next take. Returns
+        the number of files hashed.
+        """
+        pending = self._query("SELECT files.take_id, files.path FROM files "
+                              "JOIN takes ON takes.id = files.take_id "
+                              "WHERE takes.take = ? AND files.sha256 IS NULL", (take,))
+        # Hash without holding the lock so queries are not held up
+        checksums = [(file_checksum(self.absolute(path)), take_id, path)
+                     for take_id, path in pending]
+        with self._lock, self.db:
+            self.db.executemany("UPDATE files SET sha256 = ? WHERE take_id = ? AND path = ?",
+                                checksums)
+        return len(checksums)
+
+    def remove_take(self, take):
+        """Forget a take (its files are left alone); True if it was catalogued"""
+        with self._lock, self.db:
+            return self.db.execute("DELETE FROM takes WHERE take = ?", (take,)).rowcount > 0
+
+    def reindex(self, directory=None, checksums=True):
+        """Catalog the takes found under directory (default: the catalog's
+        own) that are not in it yet, from their .sync.jsonl sidecars.
+
+        Returns the number of takes added.
+        """
+        directory = os.path.abspath(directory or self.root)
+        known = {row[0] for row in self._query("SELECT take FROM takes", ())}
+        added = 0
+        for folder, basename, names in find_takes(directory):
+            if basename in known:
+                continue
+            fields = _fields_from_sidecar(os.path.join(folder, basename + ".sync.jsonl"))
+            if fields is None:
+                continue
+            files = [os.path.join(folder, n) for n in names if not n.endswith(".part")]
+            self.add_take(fields, files, checksums=checksums)
+            known.add(basename)
+            added += 1
+        return added
+
+    def relocate_take(self, take, moves):
+        """Record that a take's files moved; moves maps old paths to new"""
+        with self._lock, self.db:
+            for old, new in moves.items():
+                self.db.execute("UPDATE files SET path = ? WHERE path = ? AND take_id = "
+                                "(SELECT id FROM takes WHERE take = ?)",
+                                (self.relative(new), self.relative(old), take))
+
+    # -- Queries ------------------------------------------------------------
+
+    def _query(self, sql, params):
+        with self._lock:
+            if self.db is None:
+                raise CatalogError("Catalog is closed")
+            return self.db.execute(sql, params).fetchall()
+
+    def find(self, name=None, since=None, until=None, limit=None, newest_first=True):
+        """Takes matching all given filters, as dicts with a "files" list.
+
+        name matches the name as typed or its sanitized form. since and
+        until (datetimes or ISO 8601 strings) bound the start time; until
+        is exclusive.
+        """
+        clauses, params = [], []
+        if name is not None:
+            clauses.append("(name = ? OR safe_name = ?)")
+            params += [name, name]
+        if since is not None:
+            clauses.append("started_at >= ?")
+            params.append(_timestamp(since))
+        if until is not None:
+            clauses.append("started_at < ?")
+            params.append(_timestamp(until))
+        sql = "SELECT * FROM takes"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY started_at " + ("DESC" if newest_first else "ASC")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._with_files(self._query(sql, params))
+
+    def get(self, take):
+        """The take with this base filename, or None"""
+        rows = self._with_files(self._query("SELECT * FROM takes WHERE take = ?", (take,)))
+        return rows[0] if rows else None
+
+    def names(self):
+        """(name, number of takes) of everyone recorded, by name"""
+        return [tuple(row) for row in self._query(
+            "SELECT name, COUNT(*) FROM takes GROUP BY name ORDER BY name", ())]
+
+    def count(self):
+        return self._query("SELECT COUNT(*) FROM takes", ())[0][0]
+
+    def _with_files(self, rows):
+        takes = [dict(row) for row in rows]
+        if not takes:
+            return takes
+        by_id = {take["id"]: take for take in takes}
+        for take in takes:
+            take["files"] = []
+        marks = ", ".join("?" * len(by_id))
+        for row in self._query(f"SELECT * FROM files WHERE take_id IN ({marks}) ORDER BY path",
+                               list(by_id)):
+            by_id[row["take_id"]]["files"].append(
+                {"path": row["path"], "bytes": row["bytes"], "sha256": row["sha256"]})
+        return takes
+
+    def verify(self, takes=None):
+        """Check catalogued files against the disk.
+
+        takes defaults to every take. Returns a list of (path, problem)
+        for files that are missing, changed size or no longer match their
+        checksum.
+        """
+        problems = []
+        for take in self.find() if takes is None else takes:
+            for entry in take["files"]:
+                filepath = self.absolute(entry["path"])
+                if not os.path.exists(filepath):
+                    problems.append((entry["path"], "missing"))
+                elif os.path.getsize(filepath) != entry["bytes"]:
+                    problems.append((entry["path"], "size changed"))
+                elif entry["sha256"] and file_checksum(filepath) != entry["sha256"]:
+                    problems.append((entry["path"], "checksum mismatch"))
+        return problems
+
+
+def _fields_from_sidecar(sidecar):
+    """Catalog fields of a take rebuilt from its A/V sync sidecar"""
+    header, frames, video_frames = None, 0, 0
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                kind = record.get("type")
+                if kind == "audio":
+                    frames += record["frames"]
+                elif kind == "video":
+                    video_frames += 1
+                elif kind == "trim":
+                    frames -= record["leading_frames"] + record["trailing_frames"]
+                elif kind == "header":
+                    header = record
+    except (OSError, ValueError, KeyError):
+        return None
+    if header is None:
+        return None
+    basename = header.get("take") or os.path.basename(sidecar)[:-len(".sync.jsonl")]
+    safe_name = split_basename(basename)[0]
+    sample_rate = header.get("sample_rate")
+    return {"take": basename,
+            "name": header.get("name") or safe_name,
+            "safe_name": safe_name,
+            "started_at": header.get("wall_origin"),
+            "saved_at": datetime.fromtimestamp(os.path.getmtime(sidecar)),
+            "duration": frames / sample_rate if sample_rate else None,
+            "sample_rate": sample_rate,
+            "channels": header.get("channels"),
+            "audio_frames": frames,
+            "video_frames": video_frames,
+            "profile": header.get("profile")}
+
+
+def _format_take(take):
+    size = sum(entry["bytes"] for entry in take["files"])
+    duration = f"{take['duration']:7.1f} s" if take["duration"] is not None else "      ? s"
+    return (f"{take['started_at'][:19].replace('T', ' ')}  {duration}  "
+            f"{size / 1e6:8.1f} MB  {take['take']}")
+
+
+def main(argv=None):
+    """Query the catalog from the command line"""
+    parser = argparse.ArgumentParser(prog="python -m catalog",
+                                     description="Find recorded takes")
+    parser.add_argument("--output-dir", default="recordings",
+                        help=f"recordings directory holding {CATALOG_NAME}")
+    parser.add_argument("--db", help="catalog file (default: OUTPUT_DIR/" + CATALOG_NAME + ")")
+    parser.add_argument("--name", help="takes of this name (as typed or sanitized)")
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="takes started at or after this ISO date/time")
+    parser.add_argument("--until", type=datetime.fromisoformat,
+                        help="takes started before this ISO date/time")
+    parser.add_argument("--limit", type=int, help="at most this many takes, newest first")
+    parser.add_argument("--names", action="store_true",
+                        help="list the recorded names with their number of takes")
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    parser.add_argument("--reindex", action="store_true",
+                        help="add takes found in the directory that are not catalogued")
+    parser.add_argument("--verify", action="store_true",
+                        help="check the matching takes' files against their checksums")
+    args = parser.parse_args(argv)
+
+    try:
+        catalog = RecordingCatalog(args.db or os.path.join(args.output_dir, CATALOG_NAME))
+    except CatalogError as e:
+        print(f"❌ {e}")
+        return 2
+    with catalog:
+        if args.reindex:
+            print(f"Added {catalog.reindex()} takes to {catalog.filepath}")
+        if args.names:
+            for name, count in catalog.names():
+                print(f"{count:6d}  {name}")
+            return 0
+        takes = catalog.find(name=args.name, since=args.since, until=args.until,
+                             limit=args.limit)
+        if args.verify:
+            problems = catalog.verify(takes)
+            for path, problem in problems:
+                print(f"❌ {path}: {problem}")
+            print(f"Checked {sum(len(t['files']) for t in takes)} files of {len(takes)} takes, "
+                  f"{len(problems)} problems")
+            return 1 if problems else 0
+        for take in takes:
+            print(json.dumps(take) if args.json else _format_take(take))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Asynchronous, cached device probing.
+
+Opening the webcam just to see whether it exists can take seconds, so it is
+done on a background thread after the window is shown. Webcam results are
+cached on disk keyed by the device's identity (its name and bus path where the
+platform exposes them), so as long as the same camera is attached later
+startups skip opening it altogether.
+"""
+
+import json
+import os
+import platform
+import queue
+import threading
+import time
+
+from media_backends import get_cv2, get_sounddevice
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".audio_recorder", "device_cache.json")
+
+# Cached results older than this are probed again
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # seconds
+
+
+def camera_identity(index=0):
+    """Cheap identity string for a camera that does not require opening it.
+
+    On Linux the V4L2 device name and bus path are read from sysfs. Other
+    platforms do not expose this without opening the device, so the identity
+    falls back to the platform and camera index.
+    """
+    system = platform.system()
+    if system == "Linux":
+        sysfs = f"/sys/class/video4linux/video{index}"
+        if not os.path.exists(sysfs):
+            return f"Linux:video{index}:absent"
+        try:
+            with open(os.path.join(sysfs, "name"), encoding="utf-8") as f:
+                name = f.read().strip()
+        except OSError:
+            name = "unknown"
+        device = os.path.realpath(os.path.join(sysfs, "device"))
+        return f"Linux:video{index}:{name}:{device}"
+    return f"{system}:camera{index}"
+
+
+class DeviceProbeCache:
+    """JSON file mapping device identities to probe results"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, key):
+        """Cached result for key, or None if missing or stale"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.get("probed_at", 0) > self.max_age:
+            return None
+        return entry
+
+    def put(self, key, result):
+        entry = dict(result, probed_at=time.time())
+        self.entries[key] = entry
+        self.save()
+        return entry
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write device cache: {e}")
+
+
+def probe_camera(index=0):
+    """Open the camera once to check that it works"""
+    try:
+        cv2 = get_cv2()
+        cap = cv2.VideoCapture(index)
+        try:
+            if not cap.isOpened():
+                return {"available": False, "error": None}
+            return {"available": True,
+                    "error": None,
+                    "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}
+        finally:
+            cap.release()
+    except Exception as e:
+        return {"available": False, "error": str(e)}
+
+
+def probe_audio_inputs():
+    """Count the available audio input devices"""
+    try:
+        devices = get_sounddevice().query_devices()
+        input_devices = [d for d in devices if d['max_input_channels'] > 0]
+        return {"input_devices": len(input_devices), "error": None}
+    except Exception as e:
+        return {"input_devices": 0, "error": str(e)}
+
+
+class DeviceProber:
+    """Probe audio and video devices on a background thread.
+
+    Results are delivered through a queue as ("audio", result) and
+    ("webcam", result) tuples so the UI thread can poll for them without
+    touching Tk from the worker.
+    """
+
+    def __init__(self, camera_index=0, cache=None, probe_webcam=True):
+        self.camera_index = camera_index
+        self.probe_webcam = probe_webcam
+        self.cache = cache if cache is not None else DeviceProbeCache()
+        self.results = queue.Queue()
+        self._thread = None
+
+    def cached_webcam(self):
+        """Best guess for the webcam from the cache, without any device I/O
+        beyond reading its identity"""
+        return self.cache.get(camera_identity(self.camera_index))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def finished(self):
+        return self._thread is not None and not self._thread.is_alive()
+
+    def _run(self):
+        self.results.put(("audio", probe_audio_inputs()))
+        if not self.probe_webcam:
+            return
+
+        identity = camera_identity(self.camera_index)
+        result = self.cache.get(identity)
+        if result is None:
+            result = probe_camera(self.camera_index)
+            # Only successes are cached: a camera that is busy or broken
+            # now may well work on the next start
+            if result["available"]:
+                result = self.cache.put(identity, result)
+        self.results.put(("webcam", result))
+
+    def invalidate_webcam(self):
+        """Forget the cached webcam result, e.g. after it failed to open"""
+        self.cache.entries.pop(camera_identity(self.camera_index), None)
+        self.cache.save()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Synthetic capture backends for tests, benchmarks and headless machines.
+
+The recorder only talks to its devices through two interfaces: the
+sounddevice module (InputStream with a PortAudio-style callback) and a
+cv2.VideoCapture-like camera. This module provides stand-ins for both, so
+every recording path can run without a microphone or webcam:
+
+    audio sources   ToneSource, NoiseSource, WavSource (replays a .wav file)
+    sounddevice     FakeSoundDevice(source) - install with fake_audio()
+    cameras         SyntheticCamera (generated frames), FileCamera (replays
+                    a video file); hand a factory to Recorder(open_capture=)
+
+Streams and cameras are paced in real time like hardware: an InputStream
+delivers a block every blocksize / samplerate seconds (or faster, with
+speed > 1) and a camera's grab() waits for its next frame. Sources are
+deterministic (fixed seeds and generated patterns), so benchmark runs are
+comparable.
+
+    with fake_audio(ToneSource(440)):
+        recorder = Recorder(config, open_capture=lambda index: SyntheticCamera())
+        recorder.record("bench")
+"""
+
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+
+from media_backends import get_cv2, set_backend
+
+
+# -- Audio sources ----------------------------------------------------------
+
+class ToneSource:
+    """Phase-continuous sine tone on every channel"""
+
+    def __init__(self, frequency=440.0, amplitude=0.25):
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self._phase = 0.0
+
+    def read(self, frames, channels, sample_rate):
+        step = 2 * np.pi * self.frequency / sample_rate
+        phases = self._phase + step * np.arange(frames)
+        self._phase = float((self._phase + step * frames) % (2 * np.pi))
+        tone = (self.amplitude * np.sin(phases)).astype(np.float32)
+        return np.repeat(tone.reshape(-1, 1), channels, axis=1)
+
+
+class NoiseSource:
+    """Gaussian noise with a fixed seed"""
+
+    def __init__(self, level=0.05, seed=0):
+        self.level = level
+        self.rng = np.random.default_rng(seed)
+
+    def read(self, frames, channels, sample_rate):
+        return (self.level * self.rng.standard_normal((frames, channels))).astype(np.float32)
+
+
+class WavSource:
+    """Replay a 16-bit PCM .wav file, looping at its end.
+
+    Channels are repeated or dropped to match the stream; the file's sample
+    rate is not converted.
+    """
+
+    def __init__(self, filepath, loop=True):
+        with wave.open(filepath, 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{filepath}: only 16-bit WAV files can be replayed")
+            data = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+            self.sample_rate = wav.getframerate()
+            self.samples = (data.reshape(-1, wav.getnchannels()) / 32768.0).astype(np.float32)
+        if len(self.samples) == 0:
+            raise ValueError(f"{filepath} contains no audio")
+        self.loop = loop
+        self.position = 0
+
+    def read(self, frames, channels, sample_rate):
+        parts = []
+        needed = frames
+        while needed:
+            if self.position >= len(self.samples):
+                if not self.loop:
+                    parts.append(np.zeros((needed, self.samples.shape[1]), dtype=np.float32))
+                    break
+                self.position = 0
+            part = self.samples[self.position:self.position + needed]
+            self.position += len(part)
+            needed -= len(part)
+            parts.append(part)
+        block = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        columns = np.arange(channels) % block.shape[1]
+        return block[:, columns]
+
+
+def _to_dtype(block, dtype):
+    """Float samples in [-1, 1] as the stream's sample type"""
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'f':
+        return block.astype(dtype)
+    full_scale = 2 ** (8 * dtype.itemsize - 1)
+    return np.clip(np.round(block * full_scale), -full_scale, full_scale - 1).astype(dtype)
+
+
+# -- sounddevice ------------------------------------------------------------
+
+class CallbackStop(Exception):
+    """Raised by a callback to end the stream, as in sounddevice"""
+
+
+class FakeInputStream:
+    """sounddevice.InputStream fed by an audio source on a thread"""
+
+    def __init__(self, device_module, samplerate, channels=1, dtype='float32', blocksize=1024,
+                 device=None, latency=None, callback=None, finished_callback=None):
+        self.sd = device_module
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize or 1024
+        self.callback = callback
+        self.finished_callback = finished_callback
+        self.active = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.active = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        block_seconds = self.blocksize / self.samplerate / self.sd.speed
+        start = time.perf_counter()
+        blocks = 0
+        try:
+            while not self._stop_event.is_set():
+                # A block is complete one block length after its first sample
+                first_sample = start + blocks * block_seconds
+                ready = first_sample + block_seconds
+                delay = ready - time.perf_counter()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+                block = _to_dtype(self.sd.source.read(self.blocksize, self.channels,
+                                                      self.samplerate), self.dtype)
+                now = time.perf_counter()
+                time_info = SimpleNamespace(inputBufferAdcTime=first_sample, currentTime=now)
+                # Flag an overflow when the callback thread fell a block behind
+                status = 1 if now - ready > block_seconds else 0
+                blocks += 1
+                try:
+                    self.callback(block, self.blocksize, time_info, status)
+                except CallbackStop:
+                    break
+        finally:
+            self.active = False
+            if self.finished_callback is not None:
+                self.finished_callback()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    abort = stop
+
+    def close(self):
+        self.stop()
+
+
+class FakeSoundDevice:
+    """Stand-in for the sounddevice module with one input device.
+
+    speed > 1 delivers blocks faster than real time, e.g. to run long takes
+    through the sinks quickly.
+    """
+
+    CallbackStop = CallbackStop
+
+    def __init__(self, source=None, speed=1.0, name="Synthetic input", max_channels=8):
+        self.source = source if source is not None else ToneSource()
+        self.speed = speed
+        self.name = name
+        self.max_channels = max_channels
+
+    def InputStream(self, **kwargs):
+        return FakeInputStream(self, **kwargs)
+
+    def check_input_settings(self, device=None, channels=None, dtype=None, samplerate=None,
+                             **kwargs):
+        if channels is not None and not 1 <= channels <= self.max_channels:
+            raise ValueError(f"Invalid number of channels: {channels}")
+
+    def query_devices(self, device=None, kind=None):
+        info = {"name": self.name, "max_input_channels": self.max_channels,
+                "max_output_channels": 0, "default_samplerate": 48000.0}
+        return info if device is not None or kind is not None else [info]
+
+
+@contextmanager
+def fake_audio(source=None, speed=1.0):
+    """Make get_sounddevice() return a FakeSoundDevice for the duration"""
+    device = FakeSoundDevice(source, speed=speed)
+    set_backend("sounddevice", device)
+    try:
+        yield device
+    finally:
+        set_backend("sounddevice", None)
+
+
+# -- Cameras ----------------------------------------------------------------
+
+class _PacedCamera:
+    """grab() blocks until the next frame is due, like a real sensor"""
+
+    def __init__(self, fps):
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self._next_frame = None
+
+    def _wait_for_frame(self):
+        now = time.perf_counter()
+        if self._next_frame is None or now - self._next_frame > self.interval:
+            # First frame, or the reader fell behind: the sensor does not
+            # queue missed frames up
+            self._next_frame = now
+        else:
+            delay = self._next_frame - now
+            if delay > 0:
+                time.sleep(delay)
+        self._next_frame += self.interval
+
+
+class SyntheticCamera(_PacedCamera):
+    """cv2.VideoCapture stand-in that generates a moving test pattern.
+
+    Supports passthrough: after set(CAP_PROP_FORMAT, -1) retrieve() returns
+    JPEG-encoded frames, like a webcam in MJPEG mode.
+    """
+
+    def __init__(self, width=640, height=480, fps=30, jpeg_quality=80):
+        super().__init__(fps)
+        self.width = width
+        self.height = height
+        self.jpeg_quality = jpeg_quality
+        self.frames_grabbed = 0
+        self.raw = False
+        self._opened = True
+        # Gradient background with a bar that moves one step per frame
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32).reshape(-1, 1)
+        self._background = np.dstack([np.broadcast_to(x, (height, width)),
+                                      np.broadcast_to(y, (height, width)),
+                                      np.full((height, width), 128, np.float32)]).astype(np.uint8)
+        self._frame = np.empty_like(self._background)
+
+    def isOpened(self):
+        return self._opened
+
+    def grab(self):
+        if not self._opened:
+            return False
+        self._wait_for_frame()
+        self.frames_grabbed += 1
+        return True
+
+    def retrieve(self):
+        if not self._opened or self.frames_grabbed == 0:
+            return False, None
+        np.copyto(self._frame, self._background)
+        bar = (self.frames_grabbed * 8) % self.width
+        self._frame[:, bar:bar + 16] = 255
+        if not self.raw:
+            return True, self._frame.copy()
+        cv2 = get_cv2()
+        ok, jpeg = cv2.imencode(".jpg", self._frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        return ok, jpeg.reshape(1, -1)
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop):
+        cv2 = get_cv2()
+        return {cv2.CAP_PROP_FRAME_WIDTH: float(self.width),
+                cv2.CAP_PROP_FRAME_HEIGHT: float(self.height),
+                cv2.CAP_PROP_FPS: float(self.fps)}.get(prop, 0.0)
+
+    def set(self, prop, value):
+        cv2 = get_cv2()
+        if prop == cv2.CAP_PROP_FORMAT:
+            self.raw = value == -1
+            return True
+        return prop == cv2.CAP_PROP_FOURCC
+
+    def release(self):
+        self._opened = False
+
+
+class FileCamera(_PacedCamera):
+    """Replay a video file at camera speed, looping at its end"""
+
+    def __init__(self, filepath, fps=None, loop=True):
+        self.capture = get_cv2().VideoCapture(filepath)
+        self.loop = loop
+        super().__init__(fps or self.capture.get(get_cv2().CAP_PROP_FPS) or 30)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def grab(self):
+        self._wait_for_frame()
+        if self.capture.grab():
+            return True
+        if not self.loop:
+            return False
+        self.capture.set(get_cv2().CAP_PROP_POS_FRAMES, 0)
+        return self.capture.grab()
+
+    def retrieve(self):
+        return self.capture.retrieve()
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+    def release(self):
+        self.capture.release()
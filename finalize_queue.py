@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Background finalize jobs.
+
+Once a take's capture has stopped, flushing the audio encoder, closing the
+video file, muxing and writing the sidecars can take from milliseconds to
+seconds. FinalizeQueue runs that work on a worker thread so the recorder
+(and a kiosk UI) can start the next take right away.
+
+The number of takes in flight is bounded: reserve() blocks while
+max_pending jobs are queued or running, so a slow disk makes the next take
+wait before it starts capturing instead of piling up unsaved takes in
+memory. A reservation is either used by submit() or given back with
+cancel().
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FinalizeQueue:
+    """Bounded queue of finalize jobs run on worker threads"""
+
+    def __init__(self, max_pending=2, workers=1):
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="finalize")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self):
+        """Jobs reserved, queued or running"""
+        return self._pending
+
+    def reserve(self, timeout=None):
+        """Wait for a free slot. Returns False if the timeout expired."""
+        if not self._slots.acquire(timeout=timeout):
+            return False
+        with self._lock:
+            self._pending += 1
+        return True
+
+    def cancel(self):
+        """Give back a reservation that will not be submitted"""
+        self._release()
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def submit(self, job, *args):
+        """Run job(*args) on a worker using a reserved slot; returns a
+        concurrent.futures.Future"""
+        def run():
+            try:
+                return job(*args)
+            finally:
+                self._release()
+        return self._executor.submit(run)
+
+    def close(self, wait=True):
+        """Stop accepting jobs; by default wait for the queued ones"""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Frame preprocessing before encoding.
+
+Cameras deliver frames at whatever resolution they report, and encoding full
+colour frames is the dominant cost of video recording. A FramePreprocessor
+reduces each frame before it reaches the video writer:
+
+    crop       "center" (largest centred region with the output's aspect
+               ratio) or an (x, y, width, height) region of interest
+    size       (width, height) the cropped region is scaled to
+    grayscale  single-channel output
+
+All work is done into buffers allocated once when the preprocessor is
+created (cv2.resize(..., dst=...), cv2.cvtColor(..., dst=...)), so no memory
+is allocated per frame. The returned frame is therefore only valid until the
+next call; the frame pipeline runs the preprocessor on its encoder thread,
+right before the synchronous writer.write().
+"""
+
+import argparse
+
+import numpy as np
+
+from media_backends import get_cv2
+
+
+def parse_size(value):
+    """Parse WIDTHxHEIGHT, e.g. 640x480"""
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r} (expected WIDTHxHEIGHT)")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r}")
+    return width, height
+
+
+def parse_crop(value):
+    """Parse "center" or X,Y,WIDTH,HEIGHT"""
+    if value == "center":
+        return value
+    try:
+        x, y, width, height = (int(part) for part in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid crop {value!r} (expected center or X,Y,W,H)")
+    if x < 0 or y < 0 or width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"invalid crop {value!r}")
+    return x, y, width, height
+
+
+def crop_region(input_size, crop, output_size=None):
+    """(x, y, width, height) of the part of the frame that is kept"""
+    in_width, in_height = input_size
+    if crop is None:
+        return 0, 0, in_width, in_height
+    if crop == "center":
+        if output_size is None:
+            # Without a target size, center crop to a square
+            out_width = out_height = min(in_width, in_height)
+        else:
+            out_width, out_height = output_size
+        # Largest region with the output's aspect ratio
+        width = min(in_width, in_height * out_width // out_height)
+        height = min(in_height, in_width * out_height // out_width)
+        return (in_width - width) // 2, (in_height - height) // 2, width, height
+
+    x, y, width, height = crop
+    if x >= in_width or y >= in_height:
+        raise ValueError(f"Crop region {crop} lies outside the {in_width}x{in_height} frame")
+    # Clamp regions that extend past the frame edge
+    return x, y, min(width, in_width - x), min(height, in_height - y)
+
+
+class FramePreprocessor:
+    """Crop, scale and/or convert BGR frames to grayscale into reused buffers"""
+
+    def __init__(self, input_size, size=None, crop=None, grayscale=False):
+        self.cv2 = get_cv2()
+        self.input_size = tuple(input_size)
+        self.roi = crop_region(self.input_size, crop, size)
+        x, y, width, height = self.roi
+        self.output_size = tuple(size) if size is not None else (width, height)
+        self.grayscale = grayscale
+        self.frames_processed = 0
+
+        out_width, out_height = self.output_size
+        self._resize = self.output_size != (width, height)
+        self._crop_only = not grayscale and not self._resize
+        # Rows spanning the whole frame width are already contiguous, so
+        # such a crop (or no crop at all) is handed on as a view
+        self._crop_view = self._crop_only and width == self.input_size[0]
+        # Shrinking before the conversion means fewer pixels to convert;
+        # when enlarging, convert first so only one channel is scaled
+        self._gray_first = grayscale and out_width * out_height > width * height
+
+        self._gray_input = None
+        self._resized = None
+        self._gray = None
+        if self._gray_first:
+            self._gray_input = np.empty((height, width), dtype=np.uint8)
+            self._resized = np.empty((out_height, out_width), dtype=np.uint8)
+        else:
+            if self._resize or (self._crop_only and not self._crop_view):
+                self._resized = np.empty((out_height, out_width, 3), dtype=np.uint8)
+            if grayscale:
+                self._gray = np.empty((out_height, out_width), dtype=np.uint8)
+        self._last = None
+
+    @property
+    def active(self):
+        """Whether frames are changed at all"""
+        return self.grayscale or self.roi != (0, 0) + self.input_size or \
+            self.output_size != self.input_size
+
+    @property
+    def is_color(self):
+        return not self.grayscale
+
+    def process(self, frame):
+        """Return the preprocessed frame (valid until the next call)"""
+        if self._last is not None and frame is self._last[0]:
+            return self._last[1]  # Pacing duplicate of the previous frame
+
+        cv2 = self.cv2
+        x, y, width, height = self.roi
+        region = frame[y:y + height, x:x + width]
+        if self._crop_view:
+            result = region
+        elif self._crop_only:
+            # Writers need contiguous frames, the region is a strided view
+            np.copyto(self._resized, region)
+            result = self._resized
+        elif self._gray_first:
+            cv2.cvtColor(region, cv2.COLOR_BGR2GRAY, dst=self._gray_input)
+            cv2.resize(self._gray_input, self.output_size, dst=self._resized,
+                       interpolation=cv2.INTER_LINEAR)
+            result = self._resized
+        else:
+            result = region
+            if self._resize:
+                cv2.resize(region, self.output_size, dst=self._resized,
+                           interpolation=cv2.INTER_AREA)
+                result = self._resized
+            if self.grayscale:
+                cv2.cvtColor(result, cv2.COLOR_BGR2GRAY, dst=self._gray)
+                result = self._gray
+
+        self.frames_processed += 1
+        self._last = (frame, result)
+        return result
+
+    __call__ = process
+
+    def describe(self):
+        """One-line summary for logs"""
+        parts = []
+        if self.roi != (0, 0) + self.input_size:
+            parts.append("crop {2}x{3}+{0}+{1}".format(*self.roi))
+        if self._resize:
+            parts.append("scale to {}x{}".format(*self.output_size))
+        if self.grayscale:
+            parts.append("grayscale")
+        return "{}x{}: ".format(*self.input_size) + (", ".join(parts) or "unchanged")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Audio level metering and clipping detection.
+
+LevelMeter measures the peak and RMS level of every captured block. It is
+cheap enough to run inside the PortAudio callback: per block it takes the
+block's max and min and one sum of squares per channel. Per-channel peaks
+are only searched when the block peak exceeds a channel's take peak, and
+clipped samples are only counted for blocks that reach the clip level.
+
+A meter keeps two sets of figures:
+
+    window   peak/RMS since the last read_window() call, for a live level
+             display polled at a throttled rate (e.g. 10 times a second)
+    totals   peak, RMS and clipped sample count since reset(), for the
+             statistics stored with a take
+
+The callback updates the window without a lock; a window update racing
+with read_window() can be lost, which only delays the display by one read.
+
+MeteredSink wraps a capture sink to compute take statistics from exactly
+the samples that are written to the file.
+"""
+
+import math
+
+import numpy as np
+
+# Samples at or above this magnitude count as clipped (float full scale)
+CLIP_LEVEL = 0.999
+# Takes quieter than this (peak, dBFS) are reported as near-silent
+QUIET_PEAK_DB = -40.0
+SILENCE_DB = -120.0
+
+
+def to_db(value):
+    """Linear amplitude to dBFS"""
+    return 20.0 * math.log10(value) if value > 0 else SILENCE_DB
+
+
+class LevelMeter:
+    """Per-channel peak, RMS and clip statistics of an audio stream"""
+
+    def __init__(self, channels=1, clip_level=CLIP_LEVEL):
+        self.channels = channels
+        self.clip_level = clip_level
+        self._scales = {}
+        self.reset()
+        self._window_peak = 0.0
+        self._window_power = 0.0
+        self._window_frames = 0
+
+    def reset(self):
+        """Start new take totals"""
+        self.peak = np.zeros(self.channels)
+        self.sum_squares = np.zeros(self.channels)
+        self.frames = 0
+        self.clipped = 0
+
+    def _scale(self, dtype):
+        scale = self._scales.get(dtype)
+        if scale is None:
+            # Integer samples are measured against their full scale
+            scale = self._scales[dtype] = \
+                float(2 ** (8 * dtype.itemsize - 1)) if dtype.kind == 'i' else 1.0
+        return scale
+
+    def update(self, block):
+        """Meter a (frames, channels) block"""
+        frames = len(block)
+        if frames == 0:
+            return
+        scale = self._scale(block.dtype)
+        # Whole-block extremes are much cheaper than per-channel reductions
+        # over the short channel axis
+        block_peak = max(float(block.max()), -float(block.min())) / scale
+        if block_peak > self.peak.min():
+            # Only then can a channel's take peak have grown
+            for channel in range(self.channels):
+                column = block[:, channel]
+                channel_peak = max(float(column.max()), -float(column.min())) / scale
+                if channel_peak > self.peak[channel]:
+                    self.peak[channel] = channel_peak
+        if scale == 1.0:
+            squares = np.einsum('ij,ij->j', block, block)
+        else:
+            wide = block.astype(np.float64)
+            squares = np.einsum('ij,ij->j', wide, wide) / (scale * scale)
+
+        if block_peak >= self.clip_level:
+            limit = self.clip_level * scale
+            self.clipped += int(np.count_nonzero(block >= limit) +
+                                np.count_nonzero(block <= -limit))
+        self.sum_squares += squares
+        self.frames += frames
+
+        if block_peak > self._window_peak:
+            self._window_peak = block_peak
+        self._window_power += float(squares.sum()) / self.channels
+        self._window_frames += frames
+
+    __call__ = update
+
+    def read_window(self):
+        """Return (peak_db, rms_db) since the previous call and start a new
+        window, or None if no audio arrived in between"""
+        frames = self._window_frames
+        if frames == 0:
+            return None
+        peak, power = self._window_peak, self._window_power
+        self._window_peak = 0.0
+        self._window_power = 0.0
+        self._window_frames = 0
+        return to_db(peak), to_db(math.sqrt(power / frames))
+
+    def stats(self):
+        """Take totals as a JSON-friendly dict"""
+        if self.frames == 0:
+            rms = np.zeros(self.channels)
+        else:
+            rms = np.sqrt(self.sum_squares / self.frames)
+        return {"peak_db": round(to_db(float(self.peak.max())), 2),
+                "rms_db": round(to_db(float(np.sqrt(np.mean(rms ** 2)))), 2),
+                "channel_peak_db": [round(to_db(float(p)), 2) for p in self.peak],
+                "channel_rms_db": [round(to_db(float(r)), 2) for r in rms],
+                "clipped_samples": self.clipped,
+                "frames": self.frames}
+
+    def problems(self):
+        """Human readable warnings about the take totals"""
+        warnings = []
+        if self.clipped:
+            warnings.append(f"{self.clipped} clipped samples - lower the input gain")
+        elif self.frames and to_db(float(self.peak.max())) < QUIET_PEAK_DB:
+            warnings.append(f"Recording is nearly silent (peak "
+                            f"{to_db(float(self.peak.max())):.1f} dBFS) - check the microphone")
+        return warnings
+
+
+class MeteredSink:
+    """Sink wrapper that meters every block before passing it on"""
+
+    def __init__(self, sink, channels=1):
+        self.sink = sink
+        self.filepath = getattr(sink, "filepath", None)
+        self.meter = LevelMeter(channels)
+
+    @property
+    def frames_written(self):
+        return self.sink.frames_written
+
+    def __call__(self, block):
+        self.meter.update(block)
+        self.sink(block)
+
+    write = __call__
+
+    def close(self):
+        self.sink.close()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Lazy loading of the heavy media backends.
+
+OpenCV and sounddevice are expensive to import: OpenCV alone costs hundreds
+of milliseconds and a lot of resident memory, and importing sounddevice
+initializes PortAudio. Modules that need them call get_cv2() or
+get_sounddevice() at the point of use instead of importing them at module
+level, so startup stays fast and an audio-only session never loads OpenCV.
+"""
+
+import threading
+
+_modules = {}
+_lock = threading.Lock()
+
+
+def _load(name):
+    module = _modules.get(name)
+    if module is None:
+        # Imports can race between the UI thread and the device probe thread
+        with _lock:
+            module = _modules.get(name)
+            if module is None:
+                module = __import__(name)
+                _modules[name] = module
+    return module
+
+
+def get_cv2():
+    """Import OpenCV on first use"""
+    return _load("cv2")
+
+
+def get_sounddevice():
+    """Import sounddevice (and initialize PortAudio) on first use"""
+    return _load("sounddevice")
+
+
+def get_soundfile():
+    """Import soundfile (and load libsndfile) on first use.
+
+    soundfile is optional; callers handle the ImportError.
+    """
+    return _load("soundfile")
+
+
+def set_backend(name, module):
+    """Use module in place of a backend, e.g. a fake device for tests and
+    benchmarks (see fake_backends.py). None goes back to the real module."""
+    with _lock:
+        if module is None:
+            _modules.pop(name, None)
+        else:
+            _modules[name] = module
+
+
+def is_loaded(name):
+    """Whether a backend has been imported through this module"""
+    return name in _modules
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing histograms and their export.
+
+The recorder's hot paths record into a MetricsRegistry when one is passed
+to them (metrics=None costs nothing):
+
+    camera_open_seconds       opening the webcam (CameraManager.acquire)
+    camera_grab_seconds       camera grab(), mostly waiting for the sensor
+    camera_decode_seconds     retrieve() of frames that are kept
+    video_queue_depth         frames waiting for the encoder
+    video_encode_seconds      preprocessing + writing one frame
+    video_finalize_seconds    closing the video file
+    audio_open_seconds        opening and starting the input stream
+    audio_callback_seconds    time spent in the PortAudio callback
+    audio_ring_depth          blocks waiting for the drain thread
+    audio_finalize_seconds    flushing and closing the audio file
+    catalog_write_seconds     adding a take to the recordings catalog
+    catalog_checksum_seconds  hashing a take's files for the catalog
+    take_save_seconds         end of capture to all files finalized
+    audio_input_overflows     callbacks flagged status.input_overflow
+    audio_ring_overruns       blocks dropped because the ring was full
+
+Histograms have fixed buckets, so observe() is a bisect and a few additions.
+The capture stages (camera, video encoder, audio callback and ring) are
+each fed by a single thread, so their histograms take no lock. The
+finalize, catalog and take_save histograms are fed both by the thread
+calling record() and by the finalize queue's worker when a background save
+overlaps a foreground one; they are observed once or twice per take and
+take a lock.
+
+begin_take()/take_summary() give count, mean, p50/p95/p99 (estimated from
+the buckets) and max of each metric for one take. Summaries go to a
+pluggable sink:
+
+    JsonLinesMetricsSink(path)     one JSON line per take
+    PrometheusEndpoint(registry)   cumulative histograms in the Prometheus
+                                   text format on http://127.0.0.1:PORT/metrics
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 50 us to 13 s, doubling
+TIME_BUCKETS = tuple(50e-6 * 2 ** i for i in range(19))
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+_HISTOGRAMS = {
+    "camera_open_seconds": ("Time to open the webcam", TIME_BUCKETS),
+    "camera_grab_seconds": ("Time per camera grab()", TIME_BUCKETS),
+    "camera_decode_seconds": ("Time per camera retrieve() (decode)", TIME_BUCKETS),
+    "video_queue_depth": ("Frames queued for the encoder", DEPTH_BUCKETS),
+    "video_encode_seconds": ("Time to preprocess and write one frame", TIME_BUCKETS),
+    "video_finalize_seconds": ("Time to close the video file", TIME_BUCKETS),
+    "audio_open_seconds": ("Time to open and start the input stream", TIME_BUCKETS),
+    "audio_callback_seconds": ("Time spent in the audio callback", TIME_BUCKETS),
+    "audio_ring_depth": ("Audio blocks queued for the drain thread", DEPTH_BUCKETS),
+    "audio_finalize_seconds": ("Time to flush and close the audio file", TIME_BUCKETS),
+    "catalog_write_seconds": ("Time to add a take to the catalog", TIME_BUCKETS),
+    "catalog_checksum_seconds": ("Time to hash a take's files for the catalog", TIME_BUCKETS),
+    "take_save_seconds": ("End of capture to all files finalized", TIME_BUCKETS),
+}
+# Observed from more than one thread (see the module docstring)
+_SHARED_HISTOGRAMS = {"video_finalize_seconds", "audio_finalize_seconds",
+                      "catalog_write_seconds", "catalog_checksum_seconds", "take_save_seconds"}
+_COUNTERS = {
+    "audio_input_overflows": "Audio callbacks reporting an input overflow",
+    "audio_ring_overruns": "Audio blocks dropped because the ring buffer was full",
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values"""
+
+    def __init__(self, name, help_text="", buckets=TIME_BUCKETS, shared=False):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(buckets)
+        # One count per bound plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = None
+        self.window_max = None
+        self._lock = threading.Lock() if shared else None
+
+    def observe(self, value):
+        if self._lock is None:
+            self._observe(value)
+        else:
+            with self._lock:
+                self._observe(value)
+
+    def _observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.max is None or value > self.max:
+            self.max = value
+        if self.window_max is None or value > self.window_max:
+            self.window_max = value
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        return list(self.counts), self.count, self.sum
+
+    def summary(self, since=None):
+        """Count, mean, estimated percentiles and max, since a snapshot"""
+        counts, count, total = self.counts, self.count, self.sum
+        if since is not None:
+            counts = [a - b for a, b in zip(counts, since[0])]
+            count -= since[1]
+            total -= since[2]
+        if count <= 0:
+            return {"count": 0}
+        top = self.window_max if since is not None else self.max
+        result = {"count": count, "mean": total / count}
+        for q in (0.5, 0.95, 0.99):
+            result[f"p{int(q * 100)}"] = self._quantile(counts, count, q, top)
+        result["max"] = top
+        return result
+
+    def _quantile(self, counts, count, q, top):
+        """Interpolate the q-th value within its bucket, like Prometheus'
+        histogram_quantile(), capped at the largest value seen"""
+        rank = q * count
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(self.bounds, counts):
+            if n and seen + n >= rank:
+                upper = min(bound, top)
+                lower = min(lower, upper)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = bound
+        return top
+
+
+class Counter:
+    """Monotonic event counter"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class MetricsRegistry:
+    """The recorder's histograms and counters, by name"""
+
+    def __init__(self):
+        self.histograms = {name: Histogram(name, text, buckets,
+                                           shared=name in _SHARED_HISTOGRAMS)
+                           for name, (text, buckets) in _HISTOGRAMS.items()}
+        self.counters = {name: Counter(name, text) for name, text in _COUNTERS.items()}
+        self._take_start = None
+
+    def histogram(self, name):
+        return self.histograms[name]
+
+    def counter(self, name):
+        return self.counters[name]
+
+    def observe(self, name, value):
+        self.histograms[name].observe(value)
+
+    def time(self, name):
+        return self.histograms[name].time()
+
+    def begin_take(self):
+        """Start the window that take_summary() reports on"""
+        for histogram in self.histograms.values():
+            histogram.window_max = None
+        self._take_start = ({name: h.snapshot() for name, h in self.histograms.items()},
+                            {name: c.value for name, c in self.counters.items()})
+
+    def take_summary(self):
+        """Per-metric summaries since begin_take() (or since the start);
+        metrics without observations are left out"""
+        histograms, counters = self._take_start or ({}, {})
+        summary = {}
+        for name, histogram in self.histograms.items():
+            stats = histogram.summary(histograms.get(name))
+            if stats["count"]:
+                summary[name] = {k: round(v, 6) if isinstance(v, float) else v
+                                 for k, v in stats.items()}
+        for name, counter in self.counters.items():
+            summary[name] = counter.value - counters.get(name, 0)
+        return summary
+
+    def render_prometheus(self, prefix="whoop_"):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for histogram in self.histograms.values():
+            name = prefix + histogram.name
+            lines.append(f"# HELP {name} {histogram.help}")
+            lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(histogram.bounds, histogram.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum {histogram.sum:.9g}")
+            lines.append(f"{name}_count {histogram.count}")
+        for counter in self.counters.values():
+            name = prefix + counter.name + "_total"
+            lines.append(f"# HELP {name} {counter.help}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {counter.value}")
+        return "\n".join(lines) + "\n"
+
+
+def single_summary(value):
+    """Summary of a metric observed once per take"""
+    return {"count": 1, "mean": round(value, 6), "p50": round(value, 6),
+            "p95": round(value, 6), "p99": round(value, 6), "max": round(value, 6)}
+
+
+def format_summary(summary):
+    """One-line digest of a take summary for the console"""
+    parts = []
+    for name, label in (("camera_grab_seconds", "grab"), ("camera_decode_seconds", "decode"),
+                        ("video_encode_seconds", "encode"),
+                        ("audio_callback_seconds", "callback"),
+                        ("take_save_seconds", "save")):
+        stats = summary.get(name)
+        if not stats:
+            continue
+        if stats["count"] == 1:
+            parts.append(f"{label} {stats['max'] * 1000:.1f} ms")
+        else:
+            parts.append(f"{label} p95 {stats['p95'] * 1000:.2f} ms "
+                         f"(max {stats['max'] * 1000:.2f})")
+    for name, label in (("video_queue_depth", "video queue"), ("audio_ring_depth", "audio ring")):
+        stats = summary.get(name)
+        if stats:
+            parts.append(f"{label} max {stats['max']:g}")
+    overflows = summary.get("audio_input_overflows", 0) + summary.get("audio_ring_overruns", 0)
+    if overflows:
+        parts.append(f"{overflows} audio overflows")
+    return ", ".join(parts)
+
+
+class JsonLinesMetricsSink:
+    """Append each take's summary to a JSON lines file"""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        directory = os.path.dirname(os.path.abspath(filepath))
+        os.makedirs(directory, exist_ok=True)
+        self.file = open(filepath, 'a', encoding='utf-8')
+        # Takes are summarized on record()'s thread and the finalize worker
+        self._lock = threading.Lock()
+
+    def write_take(self, take, summary):
+        record = {"take": take, "time": datetime.now().isoformat(), "metrics": summary}
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        with self._lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+class PrometheusEndpoint:
+    """Serve a registry at http://host:port/metrics on a daemon thread.
+
+    Binds to localhost by default; port 0 picks a free port (see .port).
+    """
+
+    def __init__(self, registry, port=9464, host="127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass  # Keep scrapes out of the recorder's console output
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def write_take(self, take, summary):
+        pass  # Scrapers read the cumulative histograms
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+MJPEG passthrough recording.
+
+Most webcams compress frames to JPEG on the device. Decoding every frame to
+BGR only to re-encode it with mp4v is the most expensive part of recording
+video, so in passthrough mode (camera_manager.enable_passthrough()) the
+camera's JPEG frames are stored exactly as delivered:
+
+    <take>.mjpeg          the JPEG frames back to back (a raw MJPEG stream)
+    <take>.mjpeg.jsonl    one JSON line per output frame with its byte
+                          offset, size and capture time
+
+Frames the pacer duplicates to keep a constant frame rate are not stored
+twice; their index entries point at the earlier frame's bytes. Because JPEG
+frames are self-delimiting, an archive cut short by a crash still plays up to
+its last complete frame.
+
+Converting the archive to a regular video file is an optional offline step
+(ffmpeg required). The frames are piped to ffmpeg in index order, repeats
+included, so the output has one frame per index entry and the take's full
+duration:
+
+    python mjpeg_archive.py recordings/            # MJPEG .avi, no re-encode
+    python mjpeg_archive.py recordings/ --codec h264 --with-audio
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from av_sync import load_sync_index
+from muxer import MuxError, find_ffmpeg
+
+ARCHIVE_SUFFIX = ".mjpeg"
+INDEX_SUFFIX = ".mjpeg.jsonl"
+
+
+class MjpegFrameArchive:
+    """Store JPEG frames as-is with a timestamp index.
+
+    Quacks like cv2.VideoWriter (write(), isOpened(), release()) so it can
+    be handed to a FramePipeline; the pipeline calls write_timed() instead
+    when available to pass each frame's capture time and deadline.
+    """
+
+    def __init__(self, filepath, fps, size, clock=None):
+        self.filepath = filepath
+        self.index_path = filepath[:-len(ARCHIVE_SUFFIX)] + INDEX_SUFFIX \
+            if filepath.endswith(ARCHIVE_SUFFIX) else filepath + ".jsonl"
+        self.fps = fps
+        self.size = size
+        self.clock = clock
+        self.frames_written = 0
+        self.frames_stored = 0
+        self.bytes_written = 0
+        self._last = None
+
+        # Explicit binary mode for Windows compatibility
+        self.file = open(filepath, 'wb')
+        self.index = open(self.index_path, 'w', encoding='utf-8')
+        self._write_index({"type": "header", "codec": "mjpeg", "fps": fps,
+                           "width": size[0], "height": size[1],
+                           "archive": os.path.basename(filepath)})
+
+    def isOpened(self):
+        return self.file is not None
+
+    def _write_index(self, record):
+        self.index.write(json.dumps(record) + "\n")
+
+    def write(self, frame):
+        self.write_timed(frame)
+
+    def write_timed(self, frame, timestamp=None, deadline=None):
+        """Append a JPEG frame (or reference it again if it is a repeat)"""
+        if self._last is not None and frame is self._last[0]:
+            offset, size = self._last[1]
+        else:
+            data = frame.reshape(-1).data
+            offset, size = self.bytes_written, len(data)
+            self.file.write(data)
+            self.bytes_written += size
+            self.frames_stored += 1
+            self._last = (frame, (offset, size))
+
+        record = {"type": "frame", "frame": self.frames_written,
+                  "offset": offset, "size": size}
+        if timestamp is not None:
+            record["t"] = round(self._relative(timestamp), 6)
+        if deadline is not None:
+            record["deadline"] = round(self._relative(deadline), 6)
+        self._write_index(record)
+        self.frames_written += 1
+
+    def _relative(self, perf_time):
+        return self.clock.relative(perf_time) if self.clock is not None else perf_time
+
+    def release(self):
+        if self.file is None:
+            return
+        self._last = None
+        self.file.close()
+        self.file = None
+        self._write_index({"type": "summary", "frames": self.frames_written,
+                           "stored": self.frames_stored, "bytes": self.bytes_written})
+        self.index.close()
+
+
+def load_archive_index(index_path):
+    """Return (header, frames) from an archive index"""
+    header = None
+    frames = []
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # Torn last line of an interrupted take
+            if record["type"] == "header":
+                header = record
+            elif record["type"] == "frame":
+                frames.append(record)
+    return header, frames
+
+
+def read_frame(archive_path, entry):
+    """Return the JPEG bytes of one index entry"""
+    with open(archive_path, 'rb') as f:
+        f.seek(entry["offset"])
+        return f.read(entry["size"])
+
+
+def indexed_frames(archive_path, frames):
+    """Yield the JPEG bytes of every index entry in order, repeats included.
+
+    Entries past the end of an archive cut short by a crash are left out.
+    """
+    last = None
+    with open(archive_path, 'rb') as f:
+        for entry in frames:
+            key = (entry["offset"], entry["size"])
+            if last is None or last[0] != key:
+                f.seek(entry["offset"])
+                data = f.read(entry["size"])
+                if len(data) < entry["size"]:
+                    return
+                last = (key, data)
+            yield last[1]
+
+
+def build_transcode_command(archive_path, output_path, fps, codec="copy",
+                            audio_path=None, av_offset=0.0, ffmpeg="ffmpeg"):
+    """ffmpeg command converting an MJPEG stream to a video file.
+
+    archive_path is read as a raw MJPEG stream at fps; transcode_archive
+    passes "pipe:0" and feeds it the indexed frames. codec "copy" remuxes the JPEG frames into the output (use .avi or .mkv)
+    without decoding them; "h264" re-encodes with libx264 for small files.
+    If audio_path is given it is muxed in, delayed by av_offset as in
+    muxer.build_mux_command.
+    """
+    command = [ffmpeg, "-y", "-loglevel", "error"]
+    video_input = ["-f", "mjpeg", "-framerate", str(fps), "-i", archive_path]
+    if audio_path is not None and av_offset and av_offset > 0:
+        video_input = ["-itsoffset", f"{av_offset:.6f}"] + video_input
+    command += video_input
+    if audio_path is not None:
+        audio_input = ["-i", audio_path]
+        if av_offset and av_offset < 0:
+            audio_input = ["-itsoffset", f"{-av_offset:.6f}"] + audio_input
+        command += audio_input
+        command += ["-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac"]
+
+    if codec == "copy":
+        command += ["-c:v", "copy"]
+    elif codec == "h264":
+        command += ["-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p"]
+    else:
+        raise ValueError(f"Unknown transcode codec: {codec!r}")
+    command.append(output_path)
+    return command
+
+
+def transcode_archive(archive_path, output_path=None, codec="copy", audio_path=None,
+                      sync_path=None):
+    """Convert an archive to a video file with ffmpeg and return its path.
+
+    The frame rate comes from the archive index and the A/V offset from the
+    take's sync index, if given. Raises MuxError if ffmpeg is missing or
+    fails.
+    """
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise MuxError("ffmpeg not found - install it to transcode MJPEG archives")
+
+    base = archive_path[:-len(ARCHIVE_SUFFIX)]
+    if output_path is None:
+        output_path = base + (".avi" if codec == "copy" else ".mp4")
+    header, frames = load_archive_index(base + INDEX_SUFFIX)
+    av_offset = 0.0
+    if sync_path is not None and os.path.exists(sync_path):
+        _, _, _, summary = load_sync_index(sync_path)
+        av_offset = (summary or {}).get("av_offset") or 0.0
+
+    command = build_transcode_command("pipe:0", output_path, header["fps"], codec=codec,
+                                      audio_path=audio_path, av_offset=av_offset,
+                                      ffmpeg=ffmpeg)
+    # The archive holds each repeated frame once; piping the index's frames
+    # writes the repeats out again so the frame count matches the index
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=stderr)
+        try:
+            for data in indexed_frames(archive_path, frames):
+                process.stdin.write(data)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its error is reported below
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            returncode = process.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", errors="replace").strip()
+            raise MuxError(f"ffmpeg failed: {message}")
+    return output_path
+
+
+def _find_audio(base):
+    for extension in (".flac", ".opus", ".wav"):
+        if os.path.exists(base + extension):
+            return base + extension
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcode MJPEG passthrough takes")
+    parser.add_argument("paths", nargs="+", help="archives or directories of takes")
+    parser.add_argument("--codec", choices=["copy", "h264"], default="copy",
+                        help="copy: MJPEG .avi without re-encoding; h264: .mp4")
+    parser.add_argument("--with-audio", action="store_true",
+                        help="mux the take's audio file into the output")
+    args = parser.parse_args(argv)
+
+    archives = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            # Includes the subdirectories of sharded layouts (storage_layout.py)
+            for directory, _, names in sorted(os.walk(path)):
+                archives += sorted(os.path.join(directory, name) for name in names
+                                   if name.endswith(ARCHIVE_SUFFIX))
+        else:
+            archives.append(path)
+
+    failures = 0
+    for archive in archives:
+        base = archive[:-len(ARCHIVE_SUFFIX)]
+        audio = _find_audio(base) if args.with_audio else None
+        try:
+            output = transcode_archive(archive, codec=args.codec, audio_path=audio,
+                                       sync_path=base + ".sync.jsonl")
+            print(f"✅ {os.path.basename(archive)} -> {os.path.basename(output)}")
+        except (MuxError, OSError, ValueError) as e:
+            failures += 1
+            print(f"❌ {os.path.basename(archive)}: {e}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Mux the audio and video of a take into a single container.
+
+Muxing is done with the ffmpeg command line tool right after capture. The
+video stream is copied as-is and the audio is encoded to AAC, so the cost is
+only the audio encode. The A/V start offset measured by the sync index is
+applied with ``-itsoffset`` so the streams line up without a separate
+alignment pass. ffmpeg is optional: if it is not installed, takes keep their
+separate .wav and .mp4 files.
+"""
+
+import os
+import shutil
+import subprocess
+
+
+class MuxError(RuntimeError):
+    """Raised when the audio and video of a take could not be muxed"""
+
+
+def find_ffmpeg():
+    """Return the path of the ffmpeg executable, or None if not installed"""
+    return shutil.which("ffmpeg")
+
+
+def build_mux_command(video_path, audio_path, output_path, av_offset=0.0,
+                      audio_codec="aac", ffmpeg="ffmpeg", output_format=None):
+    """Build the ffmpeg command line that muxes one take.
+
+    av_offset is how many seconds the first video frame trails the first
+    audio sample (as reported by SyncIndex.av_offset); the later stream is
+    delayed by that amount so both play back in sync. output_format defaults
+    to the container implied by the extension of output_path.
+    """
+    if output_format is None:
+        output_format = _container_format(output_path)
+
+    command = [ffmpeg, "-y", "-loglevel", "error"]
+
+    video_input = ["-i", video_path]
+    audio_input = ["-i", audio_path]
+    if av_offset and av_offset > 0:
+        video_input = ["-itsoffset", f"{av_offset:.6f}"] + video_input
+    elif av_offset and av_offset < 0:
+        audio_input = ["-itsoffset", f"{-av_offset:.6f}"] + audio_input
+
+    command += video_input + audio_input
+    command += ["-map", "0:v:0", "-map", "1:a:0",
+                "-c:v", "copy", "-c:a", audio_codec]
+    if output_format in ("mp4", "mov"):
+        # Put the index first so players can start before the file is read
+        command += ["-movflags", "+faststart"]
+    command += ["-f", output_format, output_path]
+    return command
+
+
+def mux_av(video_path, audio_path, output_path, av_offset=0.0, audio_codec="aac",
+           remove_inputs=True):
+    """Mux a silent video file and a WAV file into output_path.
+
+    The inputs are removed after a successful mux unless remove_inputs is
+    False. Raises MuxError if ffmpeg is missing or fails; the inputs are
+    left untouched in that case.
+    """
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise MuxError("ffmpeg not found - install it to enable muxed output")
+
+    # Mux into a temporary name; its extension does not tell ffmpeg the
+    # container, so the format is passed explicitly
+    command = build_mux_command(video_path, audio_path, output_path + ".part",
+                                av_offset=av_offset, audio_codec=audio_codec,
+                                ffmpeg=ffmpeg,
+                                output_format=_container_format(output_path))
+
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        if os.path.exists(output_path + ".part"):
+            os.remove(output_path + ".part")
+        raise MuxError(f"ffmpeg failed: {result.stderr.strip()}")
+
+    os.replace(output_path + ".part", output_path)
+    if remove_inputs:
+        for path in (video_path, audio_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return output_path
+
+
+def _container_format(path):
+    """ffmpeg muxer name for an output file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    return {".mkv": "matroska", ".mov": "mov", ".avi": "avi"}.get(extension, "mp4")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Float to PCM sample conversion.
+
+Captured audio arrives as float32 blocks in [-1.0, 1.0] (or as int16/int32
+blocks for capture profiles with an integer dtype). PCMConverter turns
+them into the bytes of a WAV data chunk without per-block allocations: the
+scaled samples, the dither noise and the packed output all live in buffers
+that are allocated once and reused. Samples outside the valid range are
+clipped to full scale instead of wrapping around, which would otherwise turn
+a slightly hot peak into a full-scale click of the opposite sign.
+
+Supported sample formats:
+    "int16"   - 16-bit PCM (default)
+    "int24"   - 24-bit packed PCM
+    "float32" - 32-bit IEEE float, written unscaled and unclipped
+
+Integer formats can optionally add TPDF (triangular) dither of +/-1 LSB
+before rounding, which turns quantization distortion of quiet passages into
+benign white noise.
+"""
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+
+# name: (bytes per sample, WAV format tag, full scale)
+SAMPLE_FORMATS = {
+    "int16": (2, WAVE_FORMAT_PCM, 32767),
+    "int24": (3, WAVE_FORMAT_PCM, 8388607),
+    "float32": (4, WAVE_FORMAT_IEEE_FLOAT, None),
+}
+
+# Frames converted per step by convert_chunks()
+DEFAULT_CHUNK_FRAMES = 65536
+
+
+class PCMConverter:
+    """Convert float blocks to PCM bytes using reusable buffers.
+
+    convert() returns a memoryview into an internal buffer that is only
+    valid until the next call, which is all a file sink needs.
+    """
+
+    def __init__(self, sample_format="int16", dither=False, seed=None):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format: {sample_format!r} "
+                             f"(choose from {', '.join(SAMPLE_FORMATS)})")
+        self.sample_format = sample_format
+        self.sample_width, self.format_tag, self.full_scale = SAMPLE_FORMATS[sample_format]
+        self.dither = dither and self.full_scale is not None
+        if self.full_scale is not None:
+            # float32 scalars keep every ufunc below in single precision
+            self._max = np.float32(self.full_scale)
+            self._min = np.float32(-self.full_scale - 1)
+        self._rng = np.random.default_rng(seed)
+        self._capacity = 0
+        self._scales = {}
+
+    def _input_scale(self, dtype):
+        """Factor mapping input samples of dtype onto the output scale"""
+        out_scale = 1.0 if self.full_scale is None else self.full_scale
+        if dtype.kind == 'i':
+            # Integer capture: rescale from the input's full scale so e.g.
+            # int16 -> int16 is exact and int16 -> int24 shifts by 8 bits
+            in_scale = float(2 ** (8 * dtype.itemsize - 1))
+            if self.full_scale is not None:
+                out_scale = self.full_scale + 1
+            return np.float32(out_scale / in_scale)
+        return np.float32(out_scale)
+
+    def _ensure_capacity(self, samples):
+        """Grow the work buffers to hold at least samples values"""
+        if samples <= self._capacity:
+            return
+        self._capacity = samples
+        self._scaled = np.empty(samples, dtype=np.float32)
+        if self.dither:
+            self._noise = np.empty(samples, dtype=np.float32)
+        if self.sample_format == "int16":
+            self._out = np.empty(samples, dtype='<i2')
+        elif self.sample_format == "int24":
+            self._wide = np.empty(samples, dtype='<i4')
+            self._out = np.empty(samples * 3, dtype=np.uint8)
+        else:
+            self._out = np.empty(samples, dtype='<f4')
+
+    def convert(self, block):
+        """Return the PCM bytes of a float block as a memoryview"""
+        flat = np.asarray(block).reshape(-1)
+        n = flat.size
+        self._ensure_capacity(n)
+
+        scale = self._scales.get(flat.dtype)
+        if scale is None:
+            scale = self._scales[flat.dtype] = self._input_scale(flat.dtype)
+
+        if self.full_scale is None:
+            out = self._out[:n]
+            np.multiply(flat, scale, out=out, casting='unsafe')
+            return memoryview(out).cast('B')
+
+        scaled = self._scaled[:n]
+        np.multiply(flat, scale, out=scaled, casting='unsafe')
+        if self.dither:
+            # TPDF: difference of two uniform values, +/-1 LSB peak
+            noise = self._noise[:n]
+            self._rng.random(dtype=np.float32, out=noise)
+            scaled += noise
+            self._rng.random(dtype=np.float32, out=noise)
+            scaled -= noise
+        np.rint(scaled, out=scaled)
+        # minimum/maximum avoid np.clip's Python-level overhead on small blocks
+        np.minimum(scaled, self._max, out=scaled)
+        np.maximum(scaled, self._min, out=scaled)
+
+        if self.sample_format == "int16":
+            out = self._out[:n]
+            np.copyto(out, scaled, casting='unsafe')
+            return memoryview(out).cast('B')
+
+        # int24: convert to little-endian int32 and drop the high byte
+        wide = self._wide[:n]
+        np.copyto(wide, scaled, casting='unsafe')
+        packed = self._out[:n * 3].reshape(n, 3)
+        packed[...] = wide.view(np.uint8).reshape(n, 4)[:, :3]
+        return memoryview(self._out[:n * 3])
+
+    __call__ = convert
+
+    def convert_chunks(self, data, chunk_frames=DEFAULT_CHUNK_FRAMES):
+        """Yield the PCM bytes of a long recording chunk by chunk.
+
+        Peak memory stays at one chunk's worth of work buffers regardless
+        of the length of data.
+        """
+        for start in range(0, len(data), chunk_frames):
+            yield self.convert(data[start:start + chunk_frames])
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Always-on audio pre-roll.
+
+Normally the audio stream is opened when a take starts, so nothing said
+before the trigger (or during the GUI countdown) is recorded. A
+PreRollCapture keeps one input stream running between takes and remembers
+the most recent ``seconds`` of audio in a preallocated ring. When a take
+starts, the remembered blocks are written to the take's sink first and live
+blocks follow without a gap, so the take begins up to ``seconds`` before
+the trigger and a countdown no longer costs any content.
+
+Pre-roll blocks keep their capture timestamps in the take's sync index
+(they come before the take's video, which is reflected in its A/V offset).
+
+A listener (e.g. a voice activity detector waiting for speech) can watch
+every block as it arrives, whether or not a take is attached.
+
+PreRollCapture mimics the take-related part of AudioCaptureEngine
+(stop(), wait(), overruns) so the recorder can treat both alike.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from audio_capture import AudioCaptureEngine, BlockRingBuffer
+
+
+class PreRollCapture:
+    """Keep capturing between takes and prepend the last seconds to a take"""
+
+    def __init__(self, seconds, sample_rate=44100, channels=1, blocksize=1024,
+                 dtype='float32', device=None, latency=None, meter=None, metrics=None):
+        self.seconds = seconds
+        self.sample_rate = sample_rate
+        capacity = max(1, int(np.ceil(seconds * sample_rate / blocksize)))
+        self.history = BlockRingBuffer(capacity, blocksize, channels, dtype=np.dtype(dtype))
+        self.engine = AudioCaptureEngine(sample_rate=sample_rate, channels=channels,
+                                         blocksize=blocksize, dtype=dtype, device=device,
+                                         latency=latency, meter=meter, metrics=metrics)
+        self.engine.add_sink(self._on_block, timestamps=True)
+
+        # Called as listener(block, timestamp) for every captured block
+        self.listener = None
+
+        # State of the take currently receiving blocks
+        self.sink = None
+        self.sync_index = None
+        self.max_frames = None
+        self.frames_written = 0
+        self.preroll_frames = 0
+        self._overruns_at_start = 0
+        self._started = False
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._done.set()
+
+    @property
+    def is_running(self):
+        return self.engine.is_running
+
+    def start(self):
+        """Open the input stream; pre-roll accumulates from now on"""
+        self.engine.start()
+        self._started = True
+
+    def close(self):
+        """End any take still attached and close the input stream"""
+        self.stop()
+        self.engine.stop()
+
+    @property
+    def buffered_seconds(self):
+        """Audio currently held for the next take"""
+        return len(self.history) * self.history.blocksize / self.sample_rate
+
+    def _on_block(self, block, timestamp):
+        """Drain thread: remember the block, or pass it on to the take"""
+        listener = self.listener
+        if listener is not None:
+            listener(block, timestamp)
+        with self._lock:
+            if self.sink is not None:
+                self._deliver(block, timestamp)
+                return
+            if len(self.history) >= self.history.capacity:
+                self.history.release()  # Forget the oldest block
+            self.history.push(block, timestamp)
+
+    def _deliver(self, block, timestamp):
+        if self.max_frames is not None:
+            remaining = self.max_frames - (self.frames_written - self.preroll_frames)
+            block = block[:remaining]
+        if self.sync_index is not None:
+            self.sync_index.add_audio_block(self.frames_written, len(block), timestamp)
+        self.sink(block)
+        self.frames_written += len(block)
+        if self.max_frames is not None and \
+                self.frames_written - self.preroll_frames >= self.max_frames:
+            self._detach()
+
+    def _detach(self):
+        self.sink = None
+        self.sync_index = None
+        self._done.set()
+
+    def attach(self, sink, sync_index=None, max_frames=None):
+        """Start a take: write the pre-roll to sink, then stream live audio
+        to it until max_frames live frames were delivered or stop() is
+        called. Returns the number of pre-roll frames written."""
+        with self._lock:
+            if self.sink is not None:
+                raise RuntimeError("A take is already attached")
+            self.sink = sink
+            self.sync_index = sync_index
+            self.max_frames = None
+            self.frames_written = 0
+            self._overruns_at_start = self.engine.overruns
+            self._done.clear()
+            while len(self.history):
+                block = self.history.peek(timeout=0)
+                self._deliver(block, self.history.peek_timestamp())
+                self.history.release()
+            self.preroll_frames = self.frames_written
+            self.max_frames = max_frames
+        return self.preroll_frames
+
+    def stop(self):
+        """End the current take early"""
+        with self._lock:
+            if self.sink is not None:
+                self._detach()
+        return True
+
+    def wait(self, timeout=None):
+        """Wait until the current take has all its frames.
+
+        Returns False if the timeout expired first. If the input stream
+        failed, the take is ended and the stream's error is raised.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not self._done.is_set():
+            if self._started and not self.engine.is_running:
+                # The stream died; end the take with what was captured
+                self.stop()
+                self.engine.stop()
+                break
+            remaining = 0.1 if deadline is None else min(0.1, deadline - time.perf_counter())
+            if remaining <= 0:
+                return False
+            self._done.wait(remaining)
+        return True
+
+    @property
+    def overruns(self):
+        """Blocks dropped by the input stream since the take started"""
+        return self.engine.overruns - self._overruns_at_start
@@ -0,0 +1,1319 @@
+#!/usr/bin/env python3
+"""
+UI-independent recording engine and headless command line interface.
+
+Recorder owns everything needed to capture, encode and save a take: the
+streaming audio engine, the warm webcam, the video pipeline, the A/V sync
+index and the optional mux step. It reports progress through a listener
+callback instead of touching any UI, so the same engine drives the tkinter
+GUI (audio_recorder.py) and headless capture nodes:
+
+    python -m recorder --name alice --duration 10 --takes 3 --interval 60
+
+Run ``python -m recorder --help`` for all options.
+"""
+
+import argparse
+import os
+import platform
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+from datetime import datetime, timedelta
+
+from media_backends import get_cv2, get_sounddevice
+from audio_capture import AudioCaptureEngine
+from capture_profiles import (CaptureProfile, ProfileError, available_profiles,
+                              describe_profiles, get_profile, validate_profile)
+from pcm import SAMPLE_FORMATS
+from wav_writer import recover_partial_recordings
+from audio_encoders import (CODECS, OPUS_SAMPLE_RATES, audio_extension, codec_available,
+                            open_audio_sink, recover_partial_encodes)
+from video_pipeline import FramePipeline
+from av_sync import MonotonicClock, SyncIndex
+from muxer import MuxError, find_ffmpeg, mux_av
+from camera_manager import CameraManager
+from preroll import PreRollCapture
+from level_meter import CLIP_LEVEL, LevelMeter, MeteredSink, to_db
+from vad import EnergyVAD, SilenceTrimmer, SpeechOnsetDetector
+from frame_preprocess import FramePreprocessor, parse_crop, parse_size
+from mjpeg_archive import ARCHIVE_SUFFIX, INDEX_SUFFIX, MjpegFrameArchive
+from metrics import (JsonLinesMetricsSink, MetricsRegistry, PrometheusEndpoint, format_summary,
+                     single_summary)
+from finalize_queue import FinalizeQueue
+from catalog import CATALOG_NAME, CatalogError, RecordingCatalog
+from storage_layout import LAYOUTS, PART_SUFFIX, shard_dir
+from device_probe import camera_identity
+from segments import (MANIFEST_SUFFIX, SegmentedSink, SegmentedVideoWriter, SegmentManifest,
+                      segment_suffix)
+
+# Invalid characters for Windows filenames: < > : " | ? * \ /
+INVALID_FILENAME_CHARS = r'<>:"|?*\/'
+
+# Windows reserved names
+RESERVED_NAMES = ['CON', 'PRN', 'AUX', 'NUL', 'COM1', 'COM2', 'COM3', 'COM4',
+                  'COM5', 'COM6', 'COM7', 'COM8', 'COM9', 'LPT1', 'LPT2',
+                  'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9']
+
+# Pre-roll kept in voice-activated mode beyond vad_padding, to cover the
+# time the VAD needs to recognize the start of speech
+VAD_ONSET_SECONDS = 0.2
+
+
+def sanitize_filename(filename):
+    """Sanitize filename for cross-platform compatibility, especially Windows"""
+    # Remove or replace invalid characters for Windows filenames
+    for char in INVALID_FILENAME_CHARS:
+        filename = filename.replace(char, '_')
+
+    # Remove leading/trailing dots and spaces (Windows issue)
+    filename = filename.strip('. ')
+
+    # Ensure filename is not empty
+    if not filename:
+        filename = "recording"
+
+    if filename.upper() in RESERVED_NAMES:
+        filename = f"user_{filename}"
+
+    return filename
+
+
+@dataclass
+class RecorderConfig:
+    """Capture settings shared by the GUI and the CLI"""
+    # Audio input stream settings, normally taken from a capture profile
+    profile: str = "default"
+    sample_rate: int = 44100  # Hz
+    channels: int = 1
+    dtype: str = "float32"
+    block_size: int = 1024  # frames per audio callback block
+    latency: Optional[Union[str, float]] = None  # 'low', 'high' or seconds
+    audio_device: Optional[Union[int, str]] = None  # None: system default input
+    # "flac" (lossless), "opus" (lossy) or "wav"; compressed codecs need
+    # soundfile and fall back to WAV without it
+    audio_codec: str = "flac"
+    compression_level: Optional[float] = None  # 0.0 (fastest) to 1.0 (smallest)
+    sample_format: str = "int16"  # WAV/FLAC sample format, see pcm.SAMPLE_FORMATS
+    dither: bool = False  # TPDF dither for integer WAV samples
+    duration: float = 5  # seconds
+    # Seconds of audio from before the trigger to include in each take.
+    # Keeps the input stream open between takes (see preroll.py)
+    preroll_seconds: float = 0.0
+    # Voice activity detection (see vad.py): wait_for_speech() waits for
+    # speech before a take, which then ends after vad_silence seconds of
+    # silence (duration becomes the maximum length); silence beyond
+    # vad_padding is trimmed from both ends of the audio file
+    vad: bool = False
+    vad_threshold_db: float = -45.0  # dBFS
+    vad_silence: float = 1.5  # seconds
+    vad_padding: float = 0.3  # seconds
+    fps: int = 30
+    output_dir: str = "recordings"
+    # Subdirectories of output_dir that takes are written to (see
+    # storage_layout.py): "flat" (none), "date" (YYYY/MM/DD) or "hash"
+    storage_layout: str = "flat"
+    # "separate" keeps the audio file + silent name.mp4, "muxed" combines them
+    # into a single name.mp4 (requires ffmpeg)
+    output_mode: str = "separate"
+    # "encode" decodes camera frames and re-encodes them with mp4v;
+    # "passthrough" stores the camera's JPEG frames as-is in a .mjpeg
+    # archive (see mjpeg_archive.py) and falls back to "encode" if the
+    # camera cannot deliver them
+    video_mode: str = "encode"
+    # Preprocessing before encoding (see frame_preprocess.py): output
+    # (width, height), "center" or (x, y, width, height) crop, grayscale.
+    # Requires decoding, so it turns passthrough off
+    video_size: Optional[Tuple[int, int]] = None
+    video_crop: Optional[Union[str, Tuple[int, int, int, int]]] = None
+    grayscale: bool = False
+    # Long sessions (see segments.py): rotate the audio and video files
+    # every segment_seconds and/or once a file reaches segment_mb megabytes.
+    # Segments are listed in <take>.segments.jsonl; turns muxing off
+    segment_seconds: Optional[float] = None
+    segment_mb: Optional[float] = None
+    # Per-stage timing histograms (see metrics.py): append a summary of
+    # every take to a JSON lines file and/or serve them for Prometheus on
+    # http://127.0.0.1:<metrics_port>/metrics
+    metrics_file: Optional[str] = None
+    metrics_port: Optional[int] = None
+    # Takes recorded with record(background=True) whose files may still be
+    # being finalized; the next take waits for a free slot
+    max_pending_saves: int = 2
+    # SQLite catalog of the takes with their files' sizes and checksums
+    # (see catalog.py); relative paths are inside output_dir, None turns
+    # it off
+    catalog_file: Optional[str] = CATALOG_NAME
+    enable_video: bool = True
+    camera_index: int = 0
+    camera_idle_timeout: float = 120  # seconds
+
+    @classmethod
+    def from_profile(cls, profile="default", **overrides):
+        """Config using the input settings of a capture profile.
+
+        profile is a CaptureProfile or the name of one; other fields (and
+        individual stream settings) can be overridden by keyword.
+        """
+        if not isinstance(profile, CaptureProfile):
+            profile = get_profile(profile)
+        settings = dict(profile=profile.name,
+                        sample_rate=profile.sample_rate,
+                        channels=profile.channels,
+                        dtype=profile.dtype,
+                        block_size=profile.block_size,
+                        latency=profile.latency)
+        settings.update(overrides)
+        return cls(**settings)
+
+    def capture_profile(self):
+        """The audio input settings of this config as a CaptureProfile"""
+        return CaptureProfile(name=self.profile,
+                              sample_rate=self.sample_rate,
+                              channels=self.channels,
+                              dtype=self.dtype,
+                              block_size=self.block_size,
+                              latency=self.latency)
+
+
+class Take:
+    """Output files and statistics of one recording"""
+
+    def __init__(self, name, basename, directory, audio_codec="wav", safe_name=None):
+        self.name = name
+        self.safe_name = safe_name or basename
+        self.basename = basename
+        self.directory = directory
+        self.started_at = datetime.now()
+        self.audio_codec = audio_codec
+        self.audio_path = self.path(audio_extension(audio_codec))
+        self.sync_path = self.path(".sync.jsonl")
+        self.video_path = None
+        self.muxed_path = None
+        self.sync_index = None
+        self.manifest = None  # segments.SegmentManifest in segmenting mode
+
+        self.audio_frames = 0
+        self.preroll_frames = 0  # audio frames captured before the trigger
+        self.trimmed_frames = 0  # silent audio frames dropped by the VAD
+        self.meter = None  # level_meter.LevelMeter of the audio file
+        self.levels = None  # its stats() once the take is finished
+        self.audio_overruns = 0
+        self.video_frames = 0
+        self.dropped_frames = 0
+        self.capture_fps = 0.0
+        self.video_error = None  # exception that stopped the video encoder
+        self.av_offset = None
+        self.metrics = None  # metrics.MetricsRegistry.take_summary()
+
+        # Work left once capture has stopped (closing files), run in order
+        # by Recorder._finalize_take, possibly on the finalize queue
+        self.finalizers = []
+        self.capture_ended = None  # perf_counter() time capture stopped
+        self.saved = threading.Event()  # set once the files are finalized
+        self.save_error = None
+
+    def wait_saved(self, timeout=None):
+        """Wait for the take's files to be finalized; False on timeout"""
+        return self.saved.wait(timeout)
+
+    def path(self, suffix):
+        return os.path.join(self.directory, self.basename + suffix)
+
+    @property
+    def output_files(self):
+        """Paths of the files this take produced"""
+        if self.muxed_path:
+            candidates = [self.muxed_path]
+        elif self.manifest is not None:
+            candidates = list(self.manifest.segments)
+            candidates += [p[:-len(ARCHIVE_SUFFIX)] + INDEX_SUFFIX
+                           for p in self.manifest.segments if p.endswith(ARCHIVE_SUFFIX)]
+            candidates.append(self.manifest.filepath)
+        else:
+            candidates = [self.audio_path, self.video_path]
+            if self.video_path and self.video_path.endswith(ARCHIVE_SUFFIX):
+                candidates.append(self.video_path[:-len(ARCHIVE_SUFFIX)] + INDEX_SUFFIX)
+        candidates.append(self.sync_path)
+        return [p for p in candidates if p and os.path.exists(p)]
+
+
+class Recorder:
+    """Capture, encode and save takes without any UI.
+
+    The listener, if given, is called as listener(event, data) from the
+    recording thread. Events are:
+        "status"   - data["text"]: human readable state
+        "progress" - data["elapsed"], data["duration"] in seconds
+        "webcam"   - data["available"]: webcam availability changed
+        "warning"  - data["text"]: non-fatal problem
+        "level"    - data["peak_db"], data["rms_db"], data["clipping"]: input
+                     level, about 10 times a second while recording
+        "levels"   - data["stats"], data["problems"]: level statistics of a
+                     finished take and warnings about clipping or silence
+        "saved"    - data["take"]: all files of a take are finalized
+        "save_failed" - data["take"], data["error"]: finalizing a take failed
+
+    "levels", "saved" and "save_failed" come from the finalize queue's
+    thread for takes recorded with record(background=True).
+
+    open_capture, if given, opens the camera instead of cv2.VideoCapture
+    (see CameraManager and fake_backends.py).
+
+    Stage timings are collected in self.metrics (metrics.MetricsRegistry)
+    and summarized in take.metrics. Saved takes are added to the
+    recordings catalog (see catalog.py and open_catalog()).
+
+    Takes left behind by a crash are repaired by a scan of the whole
+    recordings directory on a background thread started here; close()
+    waits for it.
+    """
+
+    def __init__(self, config=None, listener=None, open_capture=None):
+        self.config = config or RecorderConfig()
+        self.listener = listener
+        # Hot-path timings of every stage, summarized per take
+        self.metrics = MetricsRegistry()
+        self._metrics_sinks = self._open_metrics_sinks()
+        # Closing files and muxing after capture, see record(background=True)
+        self.finalize_queue = FinalizeQueue(max_pending=self.config.max_pending_saves)
+        self.webcam = None
+        self.webcam_available = self.config.enable_video
+        self.camera_manager = None
+        if self.config.enable_video:
+            self.camera_manager = CameraManager(index=self.config.camera_index,
+                                                idle_timeout=self.config.camera_idle_timeout,
+                                                open_capture=open_capture,
+                                                metrics=self.metrics)
+        self._stop_event = threading.Event()
+        # Directories checked for crashed takes, by the startup scan or
+        # before a take is first written there
+        self._recovered_dirs = set()
+        self._recovery_lock = threading.Lock()
+        self._recovery_scan = threading.Thread(
+            target=self._scan_for_partials, args=(os.path.abspath(self.config.output_dir),),
+            name="recovery-scan", daemon=True)
+        self._recovery_scan.start()
+        self._validated_profile = None
+        self._audio_codec = None
+        self._preroll = None
+        self._preroll_settings = None
+        # arm() is called from the GUI thread as well as by record(); held
+        # while the pre-roll stream is opened, closed or attached to a take
+        self._preroll_lock = threading.RLock()
+        # Live input level, metered in the audio callback
+        self.live_meter = None
+        self._capture_ended = None
+        self._catalog = None
+        self._audio_device_name = None
+
+    def _open_metrics_sinks(self):
+        sinks = []
+        if self.config.metrics_file:
+            try:
+                sinks.append(JsonLinesMetricsSink(self.config.metrics_file))
+            except OSError as e:
+                self.warn(f"Could not open metrics file: {e}")
+        if self.config.metrics_port is not None:
+            try:
+                endpoint = PrometheusEndpoint(self.metrics, port=self.config.metrics_port)
+            except OSError as e:
+                self.warn(f"Could not serve metrics on port {self.config.metrics_port}: {e}")
+            else:
+                print(f"Serving metrics on http://127.0.0.1:{endpoint.port}/metrics")
+                sinks.append(endpoint)
+        return sinks
+
+    def emit(self, event, **data):
+        if self.listener is not None:
+            self.listener(event, data)
+
+    def warn(self, text):
+        print(f"Warning: {text}")
+        self.emit("warning", text=text)
+
+    # -- Camera -------------------------------------------------------------
+
+    def acquire_camera(self):
+        """Get the warm webcam from the camera manager, opening it if needed.
+
+        Call this ahead of record() (e.g. during a countdown) to hide the
+        camera open latency; record() acquires it itself otherwise.
+        """
+        if not self.webcam_available or self.webcam is not None:
+            return self.webcam
+        try:
+            self.webcam = self.camera_manager.acquire()
+            if self.webcam is None:
+                self.warn("Could not open webcam, falling back to audio-only")
+                self.set_webcam_available(False)
+        except Exception as e:
+            self.warn(f"Webcam initialization failed: {e}")
+            self.webcam = None
+            self.set_webcam_available(False)
+            self.camera_manager.close()
+        return self.webcam
+
+    def release_camera(self):
+        """Hand the webcam back to the manager; it stays warm for the next take"""
+        if self.webcam is not None:
+            self.webcam = None
+            self.camera_manager.release()
+
+    def set_webcam_available(self, available):
+        available = bool(available) and self.config.enable_video
+        if available != self.webcam_available:
+            self.webcam_available = available
+            self.emit("webcam", available=available)
+
+    # -- Takes --------------------------------------------------------------
+
+    def prepare_take(self, name):
+        """Choose the output directory and base filename for the next take
+        and open its A/V sync index"""
+        safe_name = sanitize_filename(name) if name else "anonymous"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        root = os.path.abspath(self.config.output_dir)
+
+        def take_directory(basename):
+            return os.path.join(root, shard_dir(self.config.storage_layout, basename))
+
+        # Back-to-back takes can start within the same second
+        basename = f"{safe_name}_{timestamp}"
+        directory = take_directory(basename)
+        suffix = 2
+        while any(os.path.exists(os.path.join(directory, basename + ext))
+                  for ext in (".sync.jsonl",) + tuple(c[0] for c in CODECS.values())):
+            basename = f"{safe_name}_{timestamp}_{suffix}"
+            directory = take_directory(basename)
+            suffix += 1
+
+        # Ensure the take's directory exists with cross-platform path handling
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        # Before any of this take's files exist, so its .part files are
+        # never mistaken for a crashed take's
+        self._recover_partials(directory)
+
+        take = Take(name, basename, directory, audio_codec=self.resolve_audio_codec(),
+                    safe_name=safe_name)
+        # Audio blocks and video frames are stamped against one clock
+        take.sync_index = SyncIndex(take.sync_path, MonotonicClock(),
+                                    take=basename,
+                                    name=name,
+                                    profile=self.config.profile,
+                                    sample_rate=self.config.sample_rate,
+                                    channels=self.config.channels)
+        if self._segmenting():
+            # Files are named <take>_part001.flac etc., listed in the manifest
+            take.audio_path = take.path(segment_suffix(1, audio_extension(take.audio_codec)))
+            take.manifest = SegmentManifest(take.path(MANIFEST_SUFFIX), take.started_at,
+                                            take=basename,
+                                            segment_seconds=self.config.segment_seconds,
+                                            segment_mb=self.config.segment_mb)
+        return take
+
+    def _recover_partials(self, directory):
+        """Repair takes left behind by a crash in directory, once per session"""
+        with self._recovery_lock:
+            if directory in self._recovered_dirs:
+                return
+            self._recovered_dirs.add(directory)
+            recover_partial_recordings(directory)
+            recover_partial_encodes(directory)
+
+    def _scan_for_partials(self, root):
+        """Check every directory under root, whatever the storage layout,
+        without holding up the first take"""
+        for folder, _, names in os.walk(root):
+            if any(name.endswith(PART_SUFFIX) for name in names):
+                self._recover_partials(folder)
+
+    def record(self, name, duration=None, background=False):
+        """Record one take.
+
+        Blocks for the duration of the take; call stop() from another
+        thread to end it early. By default the take is returned once all
+        its files are finalized. With background=True it is returned as
+        soon as capture stops and its files are finalized on the finalize
+        queue; the "saved" or "save_failed" event (and take.wait_saved())
+        report the outcome. At most config.max_pending_saves takes are
+        finalized at a time; a new take waits for a free slot first.
+        """
+        duration = self.config.duration if duration is None else duration
+        if background and not self.finalize_queue.reserve(timeout=0):
+            self.emit("status", text="⏳ Saving previous takes...")
+            self.finalize_queue.reserve()
+        self._stop_event.clear()
+        self.metrics.begin_take()
+        self._capture_ended = None
+        take = None
+        try:
+            take = self.prepare_take(name)
+            self.acquire_camera()
+
+            status_text = "🔴 RECORDING... Speak now!"
+            if self.webcam is not None:
+                status_text += " (Audio + Video)"
+            self.emit("status", text=status_text)
+            self.emit("progress", elapsed=0.0, duration=duration)
+
+            # Record video with audio synchronously if webcam available
+            if self.webcam is not None:
+                self._record_video_with_audio(take, duration)
+            else:
+                self._record_audio_only(take, duration)
+        except BaseException:
+            if background:
+                self.finalize_queue.cancel()
+            if take is not None:
+                # Close whatever was opened; the capture error wins
+                take.metrics = self.metrics.take_summary()
+                self._finalize_take(take, raise_errors=False, capture_failed=True)
+            raise
+        finally:
+            # Keep the webcam warm for the next take
+            self.release_camera()
+
+        take.capture_ended = self._capture_ended
+        take.metrics = self.metrics.take_summary()
+        if background:
+            self.finalize_queue.submit(self._save_take, take)
+        else:
+            self._finalize_take(take)
+            # Hashing long takes can take seconds; the next take need not
+            # wait for it unless the queue is full
+            if self.finalize_queue.reserve(timeout=0):
+                self.finalize_queue.submit(self._checksum_take, take)
+            else:
+                self._checksum_take(take)
+        return take
+
+    def _save_take(self, take):
+        """Finalize a take and checksum its files, on the finalize queue"""
+        self._finalize_take(take)
+        self._checksum_take(take)
+
+    def _finalize_take(self, take, raise_errors=True, capture_failed=False):
+        """Close the take's files, mux them and export its metrics.
+
+        Takes whose capture failed are closed but not catalogued.
+        """
+        try:
+            # Every file is closed even if an earlier one fails
+            for finalize in take.finalizers:
+                try:
+                    finalize()
+                except Exception as e:
+                    take.save_error = take.save_error or e
+            take.finalizers = []
+            take.save_error = take.save_error or take.video_error
+            if take.save_error is None:
+                # Combine audio and video into one file if requested
+                self._mux_take(take)
+        except Exception as e:
+            take.save_error = e
+        finally:
+            take.av_offset = take.sync_index.av_offset
+            take.sync_index.close()
+            if take.manifest is not None:
+                take.manifest.close()
+
+        if take.save_error is None and not os.path.exists(take.muxed_path or take.audio_path):
+            take.save_error = FileNotFoundError(f"Audio file was not written: {take.audio_path}")
+        if take.save_error is None and not capture_failed:
+            self._catalog_take(take)
+        if take.capture_ended is not None:
+            self._observe_take(take, "take_save_seconds",
+                               time.perf_counter() - take.capture_ended)
+        self._summarize_metrics(take)
+        take.saved.set()
+        if take.save_error is not None:
+            self.emit("save_failed", take=take, error=take.save_error)
+            if raise_errors:
+                raise take.save_error
+        else:
+            self.emit("saved", take=take)
+
+    def open_catalog(self):
+        """The catalog takes are added to, opened on first use; None if
+        it is turned off or cannot be opened"""
+        if self._catalog is None and self.config.catalog_file:
+            filepath = os.path.join(os.path.abspath(self.config.output_dir),
+                                    self.config.catalog_file)
+            try:
+                self._catalog = RecordingCatalog(filepath)
+            except (CatalogError, OSError) as e:
+                self.warn(f"Could not open the recordings catalog: {e}")
+                self.config.catalog_file = None
+        return self._catalog
+
+    def _catalog_take(self, take):
+        """Add a saved take and its files to the catalog, without checksums
+        (see _checksum_take)"""
+        catalog = self.open_catalog()
+        if catalog is None:
+            return
+        start = time.perf_counter()
+        try:
+            catalog.add_take(self._catalog_fields(take), take.output_files, checksums=False)
+        except Exception as e:
+            # The files are saved; only the catalog entry is missing
+            self.warn(f"Could not add {take.basename} to the catalog: {e}")
+        self._observe_take(take, "catalog_write_seconds", time.perf_counter() - start)
+
+    def _checksum_take(self, take):
+        """Record the SHA-256 of the take's catalogued files"""
+        if self._catalog is None or take.save_error is not None:
+            return
+        start = time.perf_counter()
+        try:
+            self._catalog.update_checksums(take.basename)
+        except Exception as e:
+            self.warn(f"Could not checksum {take.basename} for the catalog: {e}")
+        self._observe_take(take, "catalog_checksum_seconds", time.perf_counter() - start)
+
+    def _catalog_fields(self, take):
+        """Catalog row of a finalized take"""
+        config = self.config
+        return {"take": take.basename,
+                "name": take.name,
+                "safe_name": take.safe_name,
+                "started_at": take.started_at,
+                "saved_at": datetime.now(),
+                "duration": take.audio_frames / config.sample_rate,
+                "sample_rate": config.sample_rate,
+                "channels": config.channels,
+                "audio_frames": take.audio_frames,
+                "audio_codec": take.audio_codec,
+                "video_frames": take.video_frames if take.video_path else None,
+                "capture_fps": take.capture_fps if take.video_path else None,
+                "profile": config.profile,
+                "audio_device": self._describe_audio_device(),
+                "camera": camera_identity(config.camera_index) if take.video_path else None}
+
+    def _describe_audio_device(self):
+        """Name of the input device, looked up once per session"""
+        if self._audio_device_name is None:
+            device = self.config.audio_device
+            try:
+                info = get_sounddevice().query_devices(device, kind="input")
+                self._audio_device_name = str(info["name"])
+            except Exception:
+                self._audio_device_name = "default" if device is None else str(device)
+        return self._audio_device_name
+
+    def _observe_take(self, take, name, seconds):
+        """Record a finalize time, which may land after the next take began"""
+        self.metrics.observe(name, seconds)
+        if take.metrics is not None:
+            take.metrics[name] = single_summary(seconds)
+
+    def _summarize_metrics(self, take):
+        """Print and export the take's stage timings"""
+        digest = format_summary(take.metrics)
+        if digest:
+            print(f"Timing: {digest}")
+        for sink in self._metrics_sinks:
+            try:
+                sink.write_take(take.basename, take.metrics)
+            except OSError as e:
+                self.warn(f"Could not write metrics: {e}")
+
+    def stop(self):
+        """End the current take early; its files are still finalized"""
+        self._stop_event.set()
+
+    def arm(self):
+        """Start the always-on pre-roll stream if the config asks for one.
+
+        From then on the last config.preroll_seconds of audio are kept and
+        prepended to the next take. record() arms the recorder itself, so
+        calling this ahead of time only makes the first take's pre-roll
+        available too. Returns True if pre-roll is active.
+
+        The capture profile is validated first (raises ProfileError).
+        Safe to call from any thread.
+        """
+        with self._preroll_lock:
+            return self._arm()
+
+    def _arm(self):
+        config = self.config
+        profile = self.validate_capture()
+        seconds = config.preroll_seconds
+        if config.vad:
+            seconds = max(seconds, config.vad_padding + VAD_ONSET_SECONDS)
+        if seconds <= 0:
+            return False
+        settings = (profile, config.audio_device, seconds)
+        if self._preroll is not None:
+            if self._preroll.is_running and self._preroll_settings == settings:
+                return True
+            self.disarm()
+
+        meter = LevelMeter(config.channels)
+        preroll = PreRollCapture(seconds,
+                                 sample_rate=config.sample_rate,
+                                 channels=config.channels,
+                                 blocksize=config.block_size,
+                                 dtype=config.dtype,
+                                 device=config.audio_device,
+                                 latency=config.latency,
+                                 meter=meter,
+                                 metrics=self.metrics)
+        try:
+            preroll.start()
+        except Exception as e:
+            self.warn(f"Could not start pre-roll capture: {e}")
+            return False
+        self._preroll = preroll
+        self._preroll_settings = settings
+        self.live_meter = meter
+        return True
+
+    def wait_for_speech(self, timeout=None):
+        """Block until the VAD hears speech on the input (config.vad).
+
+        Listens on the pre-roll stream, so the start of the speech is part
+        of the take recorded next. Returns False if stop() was called or
+        the timeout expired first.
+        """
+        self._stop_event.clear()
+        with self._preroll_lock:
+            preroll = self._preroll if self.arm() else None
+        if preroll is None:
+            raise RuntimeError("Could not open the audio input for voice activation")
+        detector = SpeechOnsetDetector(self._make_vad(), self.config.sample_rate)
+        preroll.listener = detector
+        self.emit("status", text="👂 Waiting for speech...")
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        try:
+            while not detector.detected.wait(0.1):
+                self._emit_level()
+                if self._stop_event.is_set() or not preroll.is_running:
+                    return False
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return False
+        finally:
+            preroll.listener = None
+        return True
+
+    def _make_vad(self):
+        return EnergyVAD(threshold_db=self.config.vad_threshold_db)
+
+    def _end_take_on_silence(self):
+        print(f"Silence for {self.config.vad_silence:g} s, ending take")
+        self._stop_event.set()
+
+    def disarm(self):
+        """Close the pre-roll stream"""
+        with self._preroll_lock:
+            if self._preroll is not None:
+                preroll, self._preroll = self._preroll, None
+                preroll.close()
+
+    def close(self):
+        """Wait for takes still being saved, close the pre-roll stream,
+        release the warm camera and stop exporting metrics"""
+        self._recovery_scan.join()
+        self.finalize_queue.close()
+        self.disarm()
+        if self.camera_manager is not None:
+            self.camera_manager.close()
+        for sink in self._metrics_sinks:
+            sink.close()
+        self._metrics_sinks = []
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+    def _wait_for_take(self, start_time, duration, running):
+        """Report progress until the take ends, stop() is called or
+        running() turns False"""
+        while running():
+            elapsed = time.perf_counter() - start_time
+            if elapsed >= duration or self._stop_event.is_set():
+                break
+            self.emit("progress", elapsed=elapsed, duration=duration)
+            self._emit_level()
+            self._stop_event.wait(0.1)
+        self._capture_ended = time.perf_counter()
+
+    def _emit_level(self):
+        """Report the input level since the previous call"""
+        window = self.live_meter.read_window() if self.live_meter is not None else None
+        if window is not None:
+            peak_db, rms_db = window
+            self.emit("level", peak_db=peak_db, rms_db=rms_db,
+                      clipping=peak_db >= to_db(CLIP_LEVEL))
+
+    def _record_video_with_audio(self, take, duration):
+        """Record video and audio synchronously to avoid timing issues"""
+        video_writer = None
+        pipeline = None
+        audio = None
+        audio_captured = False
+        try:
+            cv2 = get_cv2()
+            webcam = self.webcam
+
+            if not webcam.isOpened():
+                self.warn("Webcam not available for recording")
+                # Fall back to audio only
+                self._record_audio_only(take, duration)
+                return
+
+            # Switch the camera format before reading its properties
+            passthrough = self._use_passthrough()
+
+            # Get webcam properties
+            fps = self.config.fps
+            width = int(webcam.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(webcam.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+            # Ensure we have valid dimensions
+            if width <= 0 or height <= 0:
+                width, height = 640, 480  # Default resolution
+                print(f"Warning: Invalid webcam resolution, using default {width}x{height}")
+
+            preprocessor = None
+            if not passthrough and self._preprocessing_enabled():
+                try:
+                    preprocessor = FramePreprocessor((width, height), size=self.config.video_size,
+                                                     crop=self.config.video_crop,
+                                                     grayscale=self.config.grayscale)
+                except ValueError as e:
+                    self.warn(f"{e}, recording full frames")
+                else:
+                    print(f"Video preprocessing: {preprocessor.describe()}")
+
+            if passthrough:
+                # Store the camera's JPEG frames without decoding them
+                extension = ARCHIVE_SUFFIX
+
+                def open_writer(filepath):
+                    return MjpegFrameArchive(filepath, fps, (width, height),
+                                             clock=take.sync_index.clock)
+            else:
+                # When muxing, the silent video is an intermediate file and
+                # the final .mp4 name is used for the mux
+                extension = ".video.mp4" if self._muxing_enabled() else ".mp4"
+                size, is_color = (width, height), True
+                if preprocessor is not None:
+                    size, is_color = preprocessor.output_size, preprocessor.is_color
+
+                def open_writer(filepath):
+                    return self._open_video_writer(cv2, filepath, fps, size, is_color=is_color)
+
+            if take.manifest is not None:
+                video_writer = self._open_segmented_video(take, open_writer, extension, fps)
+            else:
+                take.video_path = take.path(extension)
+                video_writer = open_writer(take.video_path)
+            if video_writer is None:
+                take.video_path = None
+                # Fall back to audio only
+                self._record_audio_only(take, duration)
+                return
+
+            # Start streaming audio capture in the background
+            audio = self._start_audio_capture(take, duration)
+
+            # Frames are captured and encoded on separate threads
+            pipeline = FramePipeline(webcam, video_writer, fps=fps,
+                                     max_frames=int(fps * duration),
+                                     sync_index=take.sync_index,
+                                     preprocess=preprocessor,
+                                     metrics=self.metrics)
+            # Drop frames buffered while the camera was idle so the first
+            # recorded frame is current
+            self.camera_manager.flush()
+            start_time = time.perf_counter()
+            pipeline.start()
+
+            self._wait_for_take(start_time, duration, lambda: pipeline.capturing)
+
+            pipeline.stop()
+            if self._stop_event.is_set():
+                audio[0].stop()
+
+            # Wait for audio capture to complete and flush to disk
+            self._finish_audio_capture(take, *audio)
+            audio = None
+            audio_captured = True
+
+            take.video_frames = pipeline.frames_written
+            take.dropped_frames = pipeline.dropped_frames
+            take.capture_fps = pipeline.capture_fps
+            print(f"Recorded {pipeline.frames_written} video frames at {fps} fps "
+                  f"(camera delivered {pipeline.capture_fps:.1f} fps, "
+                  f"{pipeline.duplicated_frames} duplicated, {pipeline.skipped_frames} skipped)")
+            if pipeline.dropped_frames:
+                self.warn(f"Repeated frames in {pipeline.dropped_frames} dropped video slots "
+                          f"(encoder too slow)")
+            if pipeline.error is not None:
+                # The video stops at the failed frame; the take is not saved
+                take.video_error = pipeline.error
+                self.warn(f"Video encoding failed after {pipeline.frames_written} frames: "
+                          f"{pipeline.error}")
+            if take.sync_index.av_offset is not None:
+                print(f"A/V offset: {take.sync_index.av_offset * 1000:.1f} ms (video after audio)")
+
+        except Exception as e:
+            print(f"Error during synchronized recording: {e}")
+            # On Windows, provide additional troubleshooting info
+            if platform.system() == "Windows":
+                print("Windows troubleshooting:")
+                print("- Check camera permissions in Windows Settings")
+                print("- Close other apps using the camera")
+                print("- Try running as administrator")
+            # Keep the audio already being captured, otherwise fall back to audio only
+            if audio is not None:
+                self._finish_audio_capture(take, *audio)
+            elif not audio_captured:
+                self._record_audio_only(take, duration)
+        finally:
+            # Cleanup video writer resources
+            if pipeline is not None:
+                pipeline.stop()
+            if video_writer is not None:
+                take.finalizers.insert(0, lambda: self._finalize_video(take, video_writer))
+
+    def _finalize_video(self, take, video_writer):
+        start = time.perf_counter()
+        try:
+            video_writer.release()
+        finally:
+            self._observe_take(take, "video_finalize_seconds", time.perf_counter() - start)
+
+    def _use_passthrough(self):
+        """Put the camera into the configured video mode; True if its
+        JPEG frames will be stored as-is"""
+        wanted = self.config.video_mode == "passthrough"
+        if wanted and self._preprocessing_enabled():
+            self.warn("Video preprocessing needs decoded frames, encoding video instead")
+            wanted = False
+        active = self.camera_manager.set_passthrough(wanted)
+        if wanted and not active:
+            self.warn("Camera does not deliver MJPEG frames, encoding video instead")
+        elif active and self.config.output_mode == "muxed":
+            self.warn("Passthrough takes are muxed offline: python mjpeg_archive.py --with-audio")
+        return active
+
+    def _segmenting(self):
+        return bool(self.config.segment_seconds or self.config.segment_mb)
+
+    def _segment_limits(self):
+        mb = self.config.segment_mb
+        return dict(segment_seconds=self.config.segment_seconds,
+                    segment_bytes=int(mb * 1024 * 1024) if mb else None)
+
+    def _open_segmented_video(self, take, open_writer, extension, fps):
+        """Video writer rotating through the take's segment files, or None
+        if the first one cannot be opened"""
+        def open_segment(index):
+            filepath = take.path(segment_suffix(index, extension))
+            return open_writer(filepath), filepath
+
+        try:
+            writer = SegmentedVideoWriter(open_segment, fps, take.manifest,
+                                          **self._segment_limits())
+        except IOError:
+            return None
+        take.video_path = writer.filepath
+        return writer
+
+    def _preprocessing_enabled(self):
+        config = self.config
+        return config.video_size is not None or config.video_crop is not None or \
+            config.grayscale
+
+    def _open_video_writer(self, cv2, filepath, fps, size, is_color=True):
+        """Open a cv2.VideoWriter, or return None if no codec works"""
+        # Use Windows-compatible codec selection
+        if platform.system() == "Windows":
+            # Try different codecs for better Windows compatibility
+            codecs_to_try = ['mp4v', 'XVID', 'MJPG', 'WMV2']
+        else:
+            # Use default codec for other platforms
+            codecs_to_try = ['mp4v']
+
+        for codec_name in codecs_to_try:
+            try:
+                fourcc = cv2.VideoWriter_fourcc(*codec_name)
+                writer = cv2.VideoWriter(filepath, fourcc, fps, size, is_color)
+                if writer.isOpened():
+                    return writer
+                writer.release()
+            except Exception:
+                continue
+
+        self.warn("Could not initialize video writer with any codec")
+        return None
+
+    def _record_audio_only(self, take, duration):
+        """Record audio only when no webcam is available"""
+        engine, sink = self._start_audio_capture(take, duration)
+        try:
+            start_time = time.perf_counter()
+            self._wait_for_take(start_time, duration, lambda: not engine.wait(timeout=0))
+            if self._stop_event.is_set():
+                engine.stop()
+        finally:
+            self._finish_audio_capture(take, engine, sink)
+
+    def validate_capture(self):
+        """Check the capture profile against the input device.
+
+        Raises ProfileError if the device cannot capture with these
+        settings. The result is remembered until the settings change.
+        """
+        profile = self.config.capture_profile()
+        if profile != self._validated_profile:
+            validate_profile(profile, device=self.config.audio_device)
+            self._validated_profile = profile
+        return profile
+
+    def resolve_audio_codec(self):
+        """The codec takes are actually written with.
+
+        Falls back to WAV (with a warning) if the configured codec is not
+        available or cannot encode the capture profile's sample rate.
+        """
+        config = self.config
+        key = (config.audio_codec, config.sample_rate)
+        if self._audio_codec is not None and self._audio_codec[0] == key:
+            return self._audio_codec[1]
+
+        codec = config.audio_codec
+        audio_extension(codec)  # Reject unknown codecs outright
+        if not codec_available(codec):
+            self.warn(f"{codec} output requires the soundfile package, saving WAV instead")
+            codec = "wav"
+        elif codec == "opus" and config.sample_rate not in OPUS_SAMPLE_RATES:
+            self.warn(f"Opus cannot encode {config.sample_rate} Hz audio, saving FLAC instead")
+            codec = "flac"
+        self._audio_codec = (key, codec)
+        return codec
+
+    def _start_audio_capture(self, take, duration):
+        """Start streaming audio blocks into the take's audio file"""
+        config = self.config
+        self.validate_capture()
+
+        def open_sink(filepath):
+            # Compressed codecs are encoded on a worker thread, so the drain
+            # thread only queues blocks for them
+            return open_audio_sink(filepath, take.audio_codec, config.sample_rate,
+                                   channels=config.channels,
+                                   sample_format=config.sample_format,
+                                   dither=config.dither,
+                                   compression_level=config.compression_level,
+                                   block_size=config.block_size)
+
+        if take.manifest is not None:
+            extension = audio_extension(take.audio_codec)
+            sink = SegmentedSink(lambda index: open_sink(take.path(segment_suffix(index, extension))),
+                                 config.sample_rate, take.manifest, **self._segment_limits())
+        else:
+            sink = open_sink(take.audio_path)
+        # Level statistics of exactly what is written to the file
+        sink = MeteredSink(sink, channels=config.channels)
+        take.meter = sink.meter
+        if config.vad:
+            # Drop silence before it is written and end the take once the
+            # speaker stops
+            sink = SilenceTrimmer(sink, self._make_vad(), config.sample_rate,
+                                  config.block_size, channels=config.channels,
+                                  dtype=config.dtype, padding=config.vad_padding,
+                                  stop_after=config.vad_silence,
+                                  on_silence=self._end_take_on_silence,
+                                  sync_index=take.sync_index)
+        with self._preroll_lock:
+            preroll = self._preroll if self.arm() else None
+            if preroll is not None:
+                # The stream is already running; the take starts with the
+                # audio remembered from before the trigger
+                try:
+                    take.preroll_frames = preroll.attach(
+                        sink, take.sync_index, max_frames=int(duration * config.sample_rate))
+                except Exception:
+                    sink.close()
+                    raise
+        if preroll is not None:
+            print(f"Included {take.preroll_frames / config.sample_rate:.2f} s of pre-roll")
+            return preroll, sink
+
+        self.live_meter = LevelMeter(config.channels)
+        engine = AudioCaptureEngine(sample_rate=config.sample_rate,
+                                    channels=config.channels,
+                                    blocksize=config.block_size,
+                                    dtype=config.dtype,
+                                    latency=config.latency,
+                                    device=config.audio_device,
+                                    sync_index=take.sync_index,
+                                    meter=self.live_meter,
+                                    metrics=self.metrics)
+        engine.add_sink(sink)
+        try:
+            engine.start(max_frames=int(duration * config.sample_rate))
+        except Exception:
+            sink.close()
+            raise
+        return engine, sink
+
+    def _finish_audio_capture(self, take, engine, sink):
+        """Wait for the capture engine (or pre-roll stream) to deliver the
+        take; the audio file is closed by the take's finalizers"""
+        try:
+            engine.wait()
+            take.audio_overruns = engine.overruns
+            if engine.overruns:
+                self.warn(f"{engine.overruns} audio blocks dropped")
+        finally:
+            take.finalizers.append(lambda: self._finalize_audio(take, sink))
+
+    def _finalize_audio(self, take, sink):
+        """Close the audio file and report its level statistics"""
+        start = time.perf_counter()
+        try:
+            sink.close()
+        finally:
+            take.audio_frames = sink.frames_written
+            self._observe_take(take, "audio_finalize_seconds", time.perf_counter() - start)
+        trimmed = getattr(sink, "leading_frames", 0) + getattr(sink, "trailing_frames", 0)
+        if trimmed:
+            take.trimmed_frames = trimmed
+            print(f"Trimmed {trimmed / self.config.sample_rate:.2f} s of silence")
+        if getattr(sink, "heard_speech", True) is False:
+            self.warn("No speech detected in take")
+
+        meter = take.meter
+        take.levels = meter.stats()
+        take.sync_index.add_levels(take.levels)
+        problems = meter.problems()
+        print(f"Audio level: peak {take.levels['peak_db']:.1f} dBFS, "
+              f"RMS {take.levels['rms_db']:.1f} dBFS, "
+              f"{take.levels['clipped_samples']} clipped samples")
+        for problem in problems:
+            self.warn(problem)
+        self.emit("levels", stats=take.levels, problems=problems)
+
+    def _muxing_enabled(self):
+        """Whether this take's audio and video should end up in one file"""
+        if self.config.output_mode != "muxed":
+            return False
+        if self._segmenting():
+            self.warn("Segmented takes are not muxed, saving audio and video separately")
+            return False
+        if find_ffmpeg() is None:
+            self.warn("ffmpeg not found, saving audio and video separately")
+            return False
+        return True
+
+    def _mux_take(self, take):
+        """Mux the take's WAV and silent video into a single .mp4"""
+        if take.video_path is None or not take.video_path.endswith(".video.mp4"):
+            return
+        if not os.path.exists(take.video_path):
+            return
+
+        av_offset = take.sync_index.av_offset
+        try:
+            take.muxed_path = mux_av(take.video_path, take.audio_path, take.path(".mp4"),
+                                     av_offset=av_offset or 0.0)
+        except MuxError as e:
+            # Keep the separate files rather than losing the take
+            self.warn(str(e))
+
+
+def _parse_start_time(value):
+    """Parse HH:MM[:SS] (next occurrence) or an ISO datetime"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            clock_time = datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+        start = datetime.combine(datetime.now().date(), clock_time)
+        if start <= datetime.now():
+            start += timedelta(days=1)
+        return start
+    raise argparse.ArgumentTypeError(f"invalid start time: {value!r}")
+
+
+def _print_event(event, data):
+    if event == "status":
+        print(data["text"])
+
+
+def main(argv=None):
+    """Run scheduled or repeated takes from the command line"""
+    parser = argparse.ArgumentParser(prog="python -m recorder",
+                                     description="Headless audio/video recorder")
+    parser.add_argument("--name", default="recording",
+                        help="name used in the output filenames")
+    parser.add_argument("--duration", type=float, default=5,
+                        help="length of each take in seconds (default: 5)")
+    parser.add_argument("--takes", type=int, default=1,
+                        help="number of takes, 0 to repeat until interrupted (default: 1)")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="seconds between the starts of consecutive takes")
+    parser.add_argument("--start-at", type=_parse_start_time,
+                        help="wait until HH:MM[:SS] or an ISO datetime before the first take")
+    parser.add_argument("--profile", default="default",
+                        help="named capture profile (see --list-profiles)")
+    parser.add_argument("--list-profiles", action="store_true",
+                        help="list the capture profiles and exit")
+    parser.add_argument("--sample-rate", type=int,
+                        help="override the profile's sample rate")
+    parser.add_argument("--channels", type=int,
+                        help="override the profile's channel count")
+    parser.add_argument("--device",
+                        help="audio input device index or name (default: system default)")
+    parser.add_argument("--audio-codec", choices=list(CODECS), default="flac",
+                        help="audio file format (default: flac, WAV if soundfile is missing)")
+    parser.add_argument("--compression-level", type=float,
+                        help="encoder effort from 0.0 (fastest) to 1.0 (smallest)")
+    parser.add_argument("--sample-format", choices=list(SAMPLE_FORMATS), default="int16",
+                        help="WAV/FLAC sample format (default: int16)")
+    parser.add_argument("--dither", action="store_true",
+                        help="add TPDF dither when writing integer WAV samples")
+    parser.add_argument("--preroll", type=float, default=0.0, metavar="SECONDS",
+                        help="include up to SECONDS of audio from before each take starts")
+    parser.add_argument("--vad", action="store_true",
+                        help="start each take on speech, end it after --vad-silence seconds "
+                             "of silence (--duration is the maximum) and trim silence")
+    parser.add_argument("--vad-threshold", type=float, default=-45.0, metavar="DB",
+                        help="speech level threshold in dBFS (default: -45)")
+    parser.add_argument("--vad-silence", type=float, default=1.5, metavar="SECONDS",
+                        help="silence that ends a voice-activated take (default: 1.5)")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--output-dir", default="recordings")
+    parser.add_argument("--output-mode", choices=["separate", "muxed"], default="separate")
+    parser.add_argument("--storage-layout", choices=LAYOUTS, default="flat",
+                        help="subdirectories for the takes: flat, date (YYYY/MM/DD) or hash")
+    parser.add_argument("--video-mode", choices=["encode", "passthrough"], default="encode",
+                        help="passthrough stores the camera's MJPEG frames without re-encoding")
+    parser.add_argument("--resolution", type=parse_size,
+                        help="scale video frames to WIDTHxHEIGHT before encoding")
+    parser.add_argument("--crop", type=parse_crop,
+                        help="keep only 'center' (output aspect ratio) or X,Y,W,H of each frame")
+    parser.add_argument("--grayscale", action="store_true",
+                        help="record single-channel video")
+    parser.add_argument("--segment-seconds", type=float, metavar="SECONDS",
+                        help="split long takes into files of SECONDS each")
+    parser.add_argument("--segment-mb", type=float, metavar="MB",
+                        help="start a new file once one reaches MB megabytes")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="append per-take stage timings to a JSON lines file")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve stage timing histograms for Prometheus on localhost:PORT")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help=f"do not add takes to OUTPUT_DIR/{CATALOG_NAME}")
+    parser.add_argument("--audio-only", action="store_true",
+                        help="disable the webcam (OpenCV is never loaded)")
+    args = parser.parse_args(argv)
+
+    if args.list_profiles:
+        print("\n".join(describe_profiles(available_profiles())))
+        return 0
+
+    overrides = {}
+    if args.sample_rate is not None:
+        overrides["sample_rate"] = args.sample_rate
+    if args.channels is not None:
+        overrides["channels"] = args.channels
+    if args.device is not None:
+        overrides["audio_device"] = int(args.device) if args.device.isdigit() else args.device
+    try:
+        config = RecorderConfig.from_profile(args.profile, **overrides,
+                                             audio_codec=args.audio_codec,
+                                             compression_level=args.compression_level,
+                                             sample_format=args.sample_format,
+                                             dither=args.dither,
+                                             duration=args.duration,
+                                             preroll_seconds=args.preroll,
+                                             vad=args.vad,
+                                             vad_threshold_db=args.vad_threshold,
+                                             vad_silence=args.vad_silence,
+                                             fps=args.fps,
+                                             output_dir=args.output_dir,
+                                             storage_layout=args.storage_layout,
+                                             output_mode=args.output_mode,
+                                             video_mode=args.video_mode,
+                                             video_size=args.resolution,
+                                             video_crop=args.crop,
+                                             grayscale=args.grayscale,
+                                             segment_seconds=args.segment_seconds,
+                                             segment_mb=args.segment_mb,
+                                             metrics_file=args.metrics_file,
+                                             metrics_port=args.metrics_port,
+                                             catalog_file=None if args.no_catalog else CATALOG_NAME,
+                                             enable_video=not args.audio_only)
+        recorder = Recorder(config, listener=_print_event)
+        # Fail before waiting for --start-at if the device cannot do it
+        recorder.validate_capture()
+        # Start filling the pre-roll while waiting for the first take
+        recorder.arm()
+    except ProfileError as e:
+        print(f"❌ {e}")
+        return 2
+
+    interrupted = threading.Event()
+
+    def handle_sigint(signum, frame):
+        # First Ctrl+C finishes the current take cleanly, the second aborts
+        if interrupted.is_set():
+            raise KeyboardInterrupt
+        interrupted.set()
+        recorder.stop()
+        print("\nFinishing the current take (Ctrl+C again to abort)")
+
+    signal.signal(signal.SIGINT, handle_sigint)
+
+    if args.start_at is not None:
+        wait = (args.start_at - datetime.now()).total_seconds()
+        if wait > 0:
+            print(f"Waiting until {args.start_at:%Y-%m-%d %H:%M:%S} to start")
+            if interrupted.wait(wait):
+                return 0
+
+    failures = 0
+    take_number = 0
+    try:
+        while not interrupted.is_set() and (args.takes == 0 or take_number < args.takes):
+            if args.vad and not recorder.wait_for_speech():
+                break
+            take_number += 1
+            started = time.monotonic()
+            try:
+                take = recorder.record(args.name)
+                files = ", ".join(os.path.basename(p) for p in take.output_files)
+                print(f"✅ Take {take_number} saved: {files}")
+            except Exception as e:
+                failures += 1
+                print(f"❌ Take {take_number} failed: {e}")
+
+            if args.takes and take_number >= args.takes:
+                break
+            # Wait for the next scheduled start
+            remaining = args.interval - (time.monotonic() - started)
+            if remaining > 0 and interrupted.wait(remaining):
+                break
+    finally:
+        recorder.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Segmented recording for long sessions.
+
+In segmenting mode a take's audio and video are written as a series of
+files, rotated every ``segment_seconds`` of content and/or once a file
+reaches ``segment_mb`` megabytes:
+
+    <take>_part001.flac  <take>_part001.mp4
+    <take>_part002.flac  <take>_part002.mp4
+    ...
+    <take>.segments.jsonl
+
+Every finished segment is a complete, playable file, so a crash loses at
+most the segment being written, and file sizes stay bounded however long
+the session runs. Boundaries are gapless: a time-based rotation splits the
+audio block at the exact boundary sample and video rotates on the frame
+grid, so concatenating the segments gives back the continuous take and the
+audio and video segments of the same number cover the same time. A size
+limit rotates each stream on its own, at the next block or frame.
+
+Rotating opens the next file at once and closes the finished one on a
+worker thread, so an encoder flushing its last segment never holds up the
+audio drain thread or the video encoder. close() waits for those closes.
+
+The manifest is a JSON lines file like the A/V sync index. Each segment
+gets a line when it is opened and another when it is closed; "wall" is
+the take's start time plus the segment's start:
+
+    {"type": "segment", "stream": "audio", "index": 1, "file": ...,
+     "start": <s into the stream>, "start_frame": <n>, "wall": <ISO time>}
+    {"type": "segment_end", "stream": "audio", "index": 1, "frames": <n>,
+     "duration": <s>, "bytes": <n>}
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from wav_writer import PART_SUFFIX
+
+MANIFEST_SUFFIX = ".segments.jsonl"
+
+
+def segment_suffix(index, extension):
+    """File suffix of segment index (1-based) of a take"""
+    return f"_part{index:03d}{extension}"
+
+
+class SegmentManifest:
+    """Append-only list of a take's segment files"""
+
+    def __init__(self, filepath, started_at, **metadata):
+        self.filepath = filepath
+        self.started_at = started_at
+        self.segments = []
+        self._lock = threading.Lock()
+        self.file = open(filepath, 'w', encoding='utf-8')
+        header = {"type": "header", "started_at": started_at.isoformat()}
+        header.update(metadata)
+        self._write(header)
+
+    def _write(self, record):
+        with self._lock:
+            self.file.write(json.dumps(record) + "\n")
+            # A crash should lose at most the segment being written
+            self.file.flush()
+
+    def open_segment(self, stream, index, filepath, start, start_frame):
+        self.segments.append(filepath)
+        wall = self.started_at + timedelta(seconds=start)
+        self._write({"type": "segment", "stream": stream, "index": index,
+                     "file": os.path.basename(filepath), "start": round(start, 6),
+                     "start_frame": start_frame, "wall": wall.isoformat()})
+
+    def close_segment(self, stream, index, frames, duration, size):
+        self._write({"type": "segment_end", "stream": stream, "index": index,
+                     "frames": frames, "duration": round(duration, 6), "bytes": size})
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def load_manifest(filepath):
+    """Return (header, segments) where segments are the "segment" records
+    merged with their "segment_end" records, in opening order"""
+    header = None
+    segments = []
+    by_key = {}
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # Torn last line of an interrupted session
+            kind = record.get("type")
+            key = (record.get("stream"), record.get("index"))
+            if kind == "header":
+                header = record
+            elif kind == "segment":
+                by_key[key] = record
+                segments.append(record)
+            elif kind == "segment_end" and key in by_key:
+                by_key[key].update(frames=record["frames"], duration=record["duration"],
+                                   bytes=record["bytes"])
+    return header, segments
+
+
+def _file_size(path):
+    """Size of a file that may still be written under its .part name"""
+    for candidate in (path + PART_SUFFIX, path):
+        try:
+            return os.path.getsize(candidate)
+        except OSError:
+            continue
+    return 0
+
+
+class _SegmentCloser:
+    """Closes finished segments in order on a worker thread"""
+
+    def __init__(self, stream):
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix=f"{stream}-segment-close")
+        self._futures = []
+
+    def submit(self, job, *args):
+        self._futures.append(self._executor.submit(job, *args))
+
+    def wait(self):
+        """Wait for every close; raises the first one's error"""
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+
+
+class SegmentedSink:
+    """Audio sink that rotates its output file.
+
+    open_segment(index) returns the sink for segment index (1-based); it
+    must have a filepath. Blocks are split at the exact segment boundary.
+    """
+
+    def __init__(self, open_segment, sample_rate, manifest, segment_seconds=None,
+                 segment_bytes=None):
+        self.open_segment = open_segment
+        self.sample_rate = sample_rate
+        self.manifest = manifest
+        self.segment_frames = None if not segment_seconds else int(segment_seconds * sample_rate)
+        self.segment_bytes = segment_bytes
+        self.frames_written = 0
+        self.index = 0
+        self.sink = None
+        self._segment_start = 0
+        self._closer = _SegmentCloser("audio")
+        self._rotate()
+        self.filepath = self.sink.filepath
+
+    def _size(self):
+        data_bytes = getattr(self.sink, "data_bytes", None)
+        return data_bytes if data_bytes is not None else _file_size(self.sink.filepath)
+
+    def _close_segment(self, sink, index, frames):
+        sink.close()
+        self.manifest.close_segment("audio", index, frames, frames / self.sample_rate,
+                                    _file_size(sink.filepath))
+
+    def _rotate(self):
+        if self.sink is not None:
+            # Called on the drain thread: don't wait for the encoder flush
+            self._closer.submit(self._close_segment, self.sink, self.index,
+                                self.frames_written - self._segment_start)
+        self.index += 1
+        self._segment_start = self.frames_written
+        self.sink = self.open_segment(self.index)
+        self.manifest.open_segment("audio", self.index, self.sink.filepath,
+                                   self.frames_written / self.sample_rate, self.frames_written)
+
+    def __call__(self, block):
+        while len(block):
+            if self.segment_frames is not None:
+                room = self.segment_frames - (self.frames_written - self._segment_start)
+                if room <= 0:
+                    self._rotate()
+                    continue
+                part, block = block[:room], block[room:]
+            else:
+                part, block = block, block[:0]
+            self.sink(part)
+            self.frames_written += len(part)
+        if self.segment_bytes is not None and self._size() >= self.segment_bytes:
+            self._rotate()
+
+    write = __call__
+
+    def close(self):
+        """Close the last segment and wait for the earlier ones"""
+        try:
+            if self.sink is not None:
+                sink, self.sink = self.sink, None
+                self._close_segment(sink, self.index, self.frames_written - self._segment_start)
+        finally:
+            self._closer.wait()
+
+
+class SegmentedVideoWriter:
+    """Video writer that rotates its output file on the frame grid.
+
+    open_segment(index) returns (writer, filepath) for segment index
+    (1-based), or (None, filepath) if it cannot be opened. Quacks like
+    cv2.VideoWriter, and forwards capture times to writers with
+    write_timed() (MjpegFrameArchive).
+    """
+
+    def __init__(self, open_segment, fps, manifest, segment_seconds=None, segment_bytes=None):
+        self.open_segment = open_segment
+        self.fps = fps
+        self.manifest = manifest
+        self.segment_frames = None if not segment_seconds else max(1, int(segment_seconds * fps))
+        self.segment_bytes = segment_bytes
+        self.frames_written = 0
+        self.index = 0
+        self.writer = None
+        self.filepath = None
+        self._segment_start = 0
+        self._closer = _SegmentCloser("video")
+        self._rotate()
+
+    def isOpened(self):
+        return self.writer is not None
+
+    def _size(self):
+        bytes_written = getattr(self.writer, "bytes_written", None)
+        return bytes_written if bytes_written is not None else _file_size(self.filepath)
+
+    def _close_segment(self, writer, filepath, index, frames):
+        writer.release()
+        self.manifest.close_segment("video", index, frames, frames / self.fps,
+                                    _file_size(filepath))
+
+    def _rotate(self):
+        if self.writer is not None:
+            # Called on the encoder thread: keep encoding while it closes
+            self._closer.submit(self._close_segment, self.writer, self.filepath, self.index,
+                                self.frames_written - self._segment_start)
+        self.index += 1
+        self._segment_start = self.frames_written
+        self.writer, self.filepath = self.open_segment(self.index)
+        if self.writer is None:
+            raise IOError(f"Could not open video segment {self.filepath}")
+        self.manifest.open_segment("video", self.index, self.filepath,
+                                   self.frames_written / self.fps, self.frames_written)
+
+    def _before_frame(self):
+        frames = self.frames_written - self._segment_start
+        if self.segment_frames is not None and frames >= self.segment_frames:
+            self._rotate()
+        elif self.segment_bytes is not None and frames and frames % self.fps == 0 and \
+                self._size() >= self.segment_bytes:
+            # Checked once a second of video: the file size needs a stat
+            self._rotate()
+
+    def write(self, frame):
+        self._before_frame()
+        self.writer.write(frame)
+        self.frames_written += 1
+
+    def write_timed(self, frame, timestamp=None, deadline=None):
+        self._before_frame()
+        write_timed = getattr(self.writer, "write_timed", None)
+        if write_timed is not None:
+            write_timed(frame, timestamp, deadline)
+        else:
+            self.writer.write(frame)
+        self.frames_written += 1
+
+    def release(self):
+        """Close the last segment and wait for the earlier ones"""
+        try:
+            if self.writer is not None:
+                writer, self.writer = self.writer, None
+                self._close_segment(writer, self.filepath, self.index,
+                                    self.frames_written - self._segment_start)
+        finally:
+            self._closer.wait()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Sharded directory layouts for the recordings directory.
+
+A flat recordings/ directory with hundreds of thousands of files makes
+listing, recovery scans and backups slow. A storage layout puts every take
+into a subdirectory derived from its base filename, so all of a take's
+files (audio, video, segments, sidecars) always stay together:
+
+    flat   recordings/alice_20240501_093000.flac
+    date   recordings/2024/05/01/alice_20240501_093000.flac
+    hash   recordings/3f/a2/alice_20240501_093000.flac
+
+"date" keeps a day's takes together, which suits incremental backups.
+"hash" spreads takes evenly over at most 65536 directories whatever the
+recording pattern. The recorder's catalog (catalog.py) stays at the root
+and finds takes in any layout.
+
+Existing directories are resharded in parallel with
+
+    python -m storage_layout --output-dir recordings --layout date
+
+which moves each take's files (renames within the volume) and updates the
+catalog. Takes with unfinished .part files are left alone; run it while no
+recorder is writing to the directory.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+LAYOUTS = ("flat", "date", "hash")
+
+SIDECAR_SUFFIX = ".sync.jsonl"
+PART_SUFFIX = ".part"
+
+
+def split_basename(basename):
+    """(sanitized name, start time) of a take's <name>_<YYYYmmdd>_<HHMMSS>[_n]
+    base filename; the time is None if the name does not carry one"""
+    parts = basename.split("_")
+    for i in range(len(parts) - 2, 0, -1):
+        try:
+            started = datetime.strptime(parts[i] + parts[i + 1], "%Y%m%d%H%M%S")
+        except ValueError:
+            continue
+        return "_".join(parts[:i]), started
+    return basename, None
+
+
+def shard_dir(layout, basename):
+    """Directory of a take relative to the recordings root ("" for flat)"""
+    if layout == "flat":
+        return ""
+    if layout == "date":
+        started = split_basename(basename)[1]
+        if started is None:
+            return "undated"
+        return os.path.join(f"{started:%Y}", f"{started:%m}", f"{started:%d}")
+    if layout == "hash":
+        digest = hashlib.sha1(basename.encode("utf-8")).hexdigest()
+        return os.path.join(digest[:2], digest[2:4])
+    raise ValueError(f"Unknown storage layout {layout!r}, expected one of {', '.join(LAYOUTS)}")
+
+
+def take_files(names, basename):
+    """The names among names that belong to the take: <take>.wav,
+    <take>.video.mp4, <take>_part001.flac, ... but not <take>_2.wav"""
+    return [n for n in names
+            if n.startswith(basename + ".") or n.startswith(basename + "_part")]
+
+
+def find_takes(root):
+    """Yield (directory, basename, file names) of every take under root,
+    recognized by its A/V sync sidecar"""
+    for directory, _, names in os.walk(root):
+        names = sorted(names)
+        for name in names:
+            if name.endswith(SIDECAR_SUFFIX):
+                basename = name[:-len(SIDECAR_SUFFIX)]
+                yield directory, basename, take_files(names, basename)
+
+
+class MigrationResult:
+    """What migrate() did (or would do, for a dry run)"""
+
+    def __init__(self):
+        self.moved = []  # basenames
+        self.in_place = 0
+        self.skipped = []  # (basename, reason)
+        self.files = 0
+
+    def __str__(self):
+        return (f"{len(self.moved)} takes moved ({self.files} files), {self.in_place} already "
+                f"in place, {len(self.skipped)} skipped")
+
+
+def migrate(root, layout, workers=8, dry_run=False, catalog=None):
+    """Move every take under root into the directory the layout gives it.
+
+    Takes are moved on workers threads; each take's sidecar goes last, so
+    an interrupted migration can simply be run again. catalog, if given, is
+    a catalog.RecordingCatalog whose file paths are updated as takes move.
+    """
+    shard_dir(layout, "")  # Reject unknown layouts before touching anything
+    root = os.path.abspath(root)
+    result = MigrationResult()
+    plans = []
+    for directory, basename, names in find_takes(root):
+        target = os.path.join(root, shard_dir(layout, basename))
+        if os.path.normpath(target) == os.path.normpath(directory):
+            result.in_place += 1
+        elif any(name.endswith(PART_SUFFIX) for name in names):
+            result.skipped.append((basename, "unfinished .part files"))
+        else:
+            # The sidecar marks the take; moving it last keeps it findable
+            names.sort(key=lambda name: name.endswith(SIDECAR_SUFFIX))
+            plans.append((directory, target, basename, names))
+    if dry_run:
+        result.moved = [plan[2] for plan in plans]
+        result.files = sum(len(plan[3]) for plan in plans)
+        return result
+
+    def move(plan):
+        directory, target, basename, names = plan
+        existing = [name for name in names if os.path.exists(os.path.join(target, name))]
+        if existing:
+            return basename, f"{existing[0]} already exists in {target}"
+        os.makedirs(target, exist_ok=True)
+        moves = {}
+        for name in names:
+            source, destination = os.path.join(directory, name), os.path.join(target, name)
+            os.replace(source, destination)
+            moves[source] = destination
+        if catalog is not None:
+            catalog.relocate_take(basename, moves)
+        return basename, None
+
+    # Renames and catalog updates wait on the disk, not the GIL
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for plan, (basename, error) in zip(plans, executor.map(_guarded(move), plans)):
+            if error is None:
+                result.moved.append(basename)
+                result.files += len(plan[3])
+            else:
+                result.skipped.append((basename, error))
+    _remove_empty_dirs(root, {plan[0] for plan in plans})
+    return result
+
+
+def _guarded(move):
+    def run(plan):
+        try:
+            return move(plan)
+        except OSError as e:
+            return plan[2], str(e)
+    return run
+
+
+def _remove_empty_dirs(root, directories):
+    """Drop the directories takes were moved out of, and their parents up
+    to root, once they are empty"""
+    for directory in sorted(directories, key=len, reverse=True):
+        while os.path.normpath(directory) != root:
+            try:
+                os.rmdir(directory)  # Fails unless empty
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+
+def main(argv=None):
+    """Reshard a recordings directory from the command line"""
+    # Imported here because catalog.py builds on this module
+    from catalog import CATALOG_NAME, CatalogError, RecordingCatalog
+
+    parser = argparse.ArgumentParser(prog="python -m storage_layout",
+                                     description="Move recorded takes into a storage layout")
+    parser.add_argument("--output-dir", default="recordings",
+                        help="recordings directory (default: recordings)")
+    parser.add_argument("--layout", choices=LAYOUTS, required=True,
+                        help="flat, date (YYYY/MM/DD) or hash (two hex levels)")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="takes moved in parallel (default: 8)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report what would be moved")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.output_dir):
+        print(f"❌ {args.output_dir} is not a directory")
+        return 2
+    catalog = None
+    catalog_path = os.path.join(args.output_dir, CATALOG_NAME)
+    if os.path.exists(catalog_path) and not args.dry_run:
+        try:
+            catalog = RecordingCatalog(catalog_path)
+        except CatalogError as e:
+            print(f"❌ {e}")
+            return 2
+    try:
+        result = migrate(args.output_dir, args.layout, workers=args.workers,
+                         dry_run=args.dry_run, catalog=catalog)
+    finally:
+        if catalog is not None:
+            catalog.close()
+    for basename, reason in result.skipped:
+        print(f"⚠️  {basename}: {reason}")
+    if args.dry_run:
+        print(f"Would move {len(result.moved)} takes ({result.files} files), "
+              f"{result.in_place} already in place, {len(result.skipped)} skipped")
+    else:
+        print(result)
+    return 1 if result.skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
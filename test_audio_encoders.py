@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for the compressed audio encoders and the background encoding worker.
+
+The FLAC and Opus tests need the optional soundfile package and are skipped
+without it.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from audio_encoders import BackgroundEncoder, EncoderError, open_audio_sink
+from wav_writer import WavStreamWriter
+
+try:
+    import soundfile
+except (ImportError, OSError):
+    soundfile = None
+
+
+def _tone(frames, sample_rate, channels=1):
+    t = np.arange(frames) / sample_rate
+    tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    return np.repeat(tone.reshape(-1, 1), channels, axis=1)
+
+
+def test_flac_is_lossless_and_smaller():
+    """FLAC takes decode to the same 16-bit samples as WAV takes"""
+    print("Testing FLAC encoding...")
+    if soundfile is None:
+        print("⚠️  soundfile not installed, skipping")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        audio = _tone(48000, 48000, channels=2)
+        flac_path = os.path.join(tmp, "take.flac")
+        wav_path = os.path.join(tmp, "take.wav")
+        with open_audio_sink(flac_path, "flac", 48000, channels=2) as sink:
+            assert isinstance(sink, BackgroundEncoder)
+            for start in range(0, len(audio), 1024):
+                sink(audio[start:start + 1024])
+        with WavStreamWriter(wav_path, 48000, channels=2) as sink:
+            sink(audio)
+
+        assert not os.path.exists(flac_path + ".part")
+        decoded, rate = soundfile.read(flac_path, dtype='int16')
+        reference, _ = soundfile.read(wav_path, dtype='int16')
+        assert rate == 48000 and decoded.shape == (48000, 2)
+        assert np.abs(decoded.astype(np.int32) - reference).max() <= 1
+        ratio = os.path.getsize(flac_path) / os.path.getsize(wav_path)
+    print(f"✅ FLAC matches WAV at {ratio:.0%} of its size")
+
+
+def test_opus_encoding():
+    """Opus takes decode to the right length and are much smaller"""
+    print("\nTesting Opus encoding...")
+    if soundfile is None:
+        print("⚠️  soundfile not installed, skipping")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "take.opus")
+        with open_audio_sink(path, "opus", 16000) as sink:
+            sink(_tone(32000, 16000))
+        info = soundfile.info(path)
+        assert info.samplerate == 16000
+        assert abs(info.frames - 32000) < 1000
+        size = os.path.getsize(path)
+        assert size < 32000 * 2 / 4
+    print(f"✅ 2 s of Opus in {size} bytes")
+
+
+def test_opus_rejects_unsupported_rate():
+    """Opus only accepts its native sample rates"""
+    print("\nTesting Opus sample rate check...")
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            open_audio_sink(os.path.join(tmp, "take.opus"), "opus", 44100)
+            assert False, "44.1 kHz Opus accepted"
+        except EncoderError as e:
+            assert "44100" in str(e)
+    print("✅ 44.1 kHz Opus rejected")
+
+
+class RecordingSink:
+    """Sink that records what it receives, optionally slowly or failing"""
+
+    def __init__(self, delay=0.0, fail_after=None):
+        self.blocks = []
+        self.frames_written = 0
+        self.closed = False
+        self.delay = delay
+        self.fail_after = fail_after
+        self.release = threading.Event()
+
+    def __call__(self, block):
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.fail_after is not None and len(self.blocks) >= self.fail_after:
+            raise IOError("disk full")
+        self.blocks.append(block)
+        self.frames_written += len(block)
+
+    def close(self):
+        self.closed = True
+
+
+def test_background_encoder_never_waits_for_sink():
+    """Blocks are queued as copies while the sink is busy"""
+    print("\nTesting background encoding...")
+    sink = RecordingSink(delay=5.0)
+    encoder = BackgroundEncoder(sink, backlog_blocks=64)
+    block = np.zeros((256, 1), dtype=np.float32)
+    for i in range(32):
+        block[:] = i  # The capture engine reuses its buffers
+        encoder(block)
+    assert encoder.max_backlog >= 31
+    sink.release.set()
+    encoder.close()
+    assert sink.closed
+    assert [int(b[0, 0]) for b in sink.blocks] == list(range(32))
+    assert encoder.frames_written == 32 * 256
+    print(f"✅ Queued up to {encoder.max_backlog} blocks without blocking")
+
+
+def test_background_encoder_reports_errors():
+    """A failing encoder surfaces its error when the take is closed"""
+    print("\nTesting background encoder errors...")
+    sink = RecordingSink(fail_after=3)
+    encoder = BackgroundEncoder(sink)
+    for _ in range(10):
+        encoder(np.zeros((16, 1), dtype=np.float32))
+    try:
+        encoder.close()
+        assert False, "error swallowed"
+    except EncoderError as e:
+        assert "disk full" in str(e)
+    assert sink.closed and len(sink.blocks) == 3
+    print("✅ Worker error raised on close")
+
+
+def main():
+    """Run all audio encoder tests"""
+    tests = [test_flac_is_lossless_and_smaller, test_opus_encoding,
+             test_opus_rejects_unsupported_rate,
+             test_background_encoder_never_waits_for_sink,
+             test_background_encoder_reports_errors]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All audio encoder tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
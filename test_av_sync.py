@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared take clock and the A/V sync sidecar index.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from av_sync import MonotonicClock, StreamClockMapper, SyncIndex, load_sync_index
+
+
+def test_stream_clock_mapping():
+    """ADC stream times are mapped onto the perf_counter() clock"""
+    print("Testing stream clock mapping...")
+    mapper = StreamClockMapper()
+    now = time.perf_counter()
+    # Stream clock runs 1000 s behind perf_counter(); ADC time is 10 ms ago
+    info = SimpleNamespace(currentTime=now - 1000.0, inputBufferAdcTime=now - 1000.010)
+    adc = mapper.adc_time(info, 441, 44100)
+    assert abs(adc - (now - 0.010)) < 0.005
+
+    # Host APIs without stream times fall back to the block duration
+    info = SimpleNamespace(currentTime=0.0, inputBufferAdcTime=0.0)
+    adc = mapper.adc_time(info, 4410, 44100)
+    assert abs(adc - (time.perf_counter() - 0.1)) < 0.005
+    print("✅ Stream clock mapped correctly")
+
+
+def test_sync_index_roundtrip():
+    """Audio and video stamps are written to the sidecar and the offset is summarized"""
+    print("\nTesting sync index sidecar...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "take.sync.jsonl")
+        clock = MonotonicClock()
+        index = SyncIndex(path, clock, take="take", sample_rate=44100)
+
+        index.add_audio_block(0, 1024, clock.origin + 0.100)
+        index.add_audio_block(1024, 1024, clock.origin + 0.123)
+        index.add_video_frame(0, clock.origin + 0.150, deadline=clock.origin + 0.140)
+        index.close()
+
+        header, audio, video, summary = load_sync_index(path)
+        assert header["sample_rate"] == 44100
+        assert [a["frame"] for a in audio] == [0, 1024]
+        assert video[0]["deadline"] == 0.14
+        assert abs(summary["av_offset"] - 0.050) < 1e-6
+    print("✅ Sync index written and summarized")
+
+
+def main():
+    """Run all A/V sync tests"""
+    tests = [test_stream_clock_mapping, test_sync_index_roundtrip]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All A/V sync tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
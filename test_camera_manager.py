@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the warm camera manager. A short video file stands in for the
+webcam so no camera is required.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from camera_manager import CameraManager
+
+
+def _make_video(path, frames=30):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i * 8 % 256, dtype=np.uint8))
+    writer.release()
+
+
+def test_camera_stays_warm_between_takes():
+    """The same handle is reused until the idle timeout expires"""
+    print("Testing warm camera reuse...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "camera.avi")
+        _make_video(path)
+
+        manager = CameraManager(index=path, idle_timeout=0.2)
+        first = manager.acquire()
+        assert first is not None and first.isOpened()
+        manager.release()
+
+        second = manager.acquire()
+        assert second is first
+        manager.release()
+
+        time.sleep(0.4)
+        assert not manager.is_open
+        manager.close()
+    print("✅ Camera reused while warm and closed when idle")
+
+
+def test_flush_discards_buffered_frames():
+    """flush() grabs and discards frames that are already available"""
+    print("\nTesting stale frame flush...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "camera.avi")
+        _make_video(path)
+
+        manager = CameraManager(index=path, idle_timeout=None)
+        cap = manager.acquire()
+        # A file delivers frames instantly, like a full camera buffer
+        assert manager.flush(max_grabs=5) == 5
+        assert int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == 5
+        manager.close()
+        assert not manager.is_open
+    print("✅ Buffered frames discarded")
+
+
+def test_missing_camera():
+    """acquire() returns None when the device cannot be opened"""
+    print("\nTesting missing camera...")
+    manager = CameraManager(index=os.path.join(tempfile.gettempdir(), "no_such_camera.avi"))
+    assert manager.acquire() is None
+    assert not manager.is_open
+    print("✅ Missing camera handled")
+
+
+def main():
+    """Run all camera manager tests"""
+    tests = [test_camera_stays_warm_between_takes, test_flush_discards_buffered_frames,
+             test_missing_camera]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All camera manager tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
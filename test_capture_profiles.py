@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for named audio capture profiles.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from capture_profiles import PROFILES, CaptureProfile, ProfileError, get_profile, load_profiles
+from recorder import RecorderConfig
+
+
+def test_builtin_profiles():
+    """The built-in profiles cover speech, music and array microphones"""
+    print("Testing built-in profiles...")
+    speech = PROFILES["speech"]
+    assert (speech.sample_rate, speech.channels) == (16000, 1)
+    assert abs(speech.block_duration - 0.02) < 1e-9
+    assert PROFILES["array8"].channels == 8
+    # Speech at 16 kHz stores under half as much as the 44.1 kHz default
+    assert speech.bytes_per_second() * 2 < PROFILES["default"].bytes_per_second()
+    print("✅ Built-in profiles defined")
+
+
+def test_custom_profiles_from_json():
+    """Profiles can be added and overridden from a JSON file"""
+    print("\nTesting custom profiles...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profiles.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"booth": {"sample_rate": 32000, "channels": 2, "latency": "low"},
+                       "speech": {"sample_rate": 8000}}, f)
+        profiles = load_profiles(path)
+        assert profiles["booth"] == CaptureProfile("booth", 32000, 2, latency="low")
+        assert get_profile("speech", path).sample_rate == 8000
+        assert get_profile("music", path).channels == 2
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"bad": {"sample_rate": 8000, "bits": 12}}, f)
+        try:
+            load_profiles(path)
+            assert False, "unknown setting accepted"
+        except ProfileError:
+            pass
+
+        assert load_profiles(os.path.join(tmp, "missing.json")) == {}
+    print("✅ Custom profiles loaded")
+
+
+def test_invalid_profiles_rejected():
+    """Nonsensical settings fail when the profile is created"""
+    print("\nTesting profile validation...")
+    for settings in ({"sample_rate": 0}, {"channels": 0}, {"dtype": "float64"},
+                     {"latency": "medium"}, {"block_size": -1}):
+        try:
+            CaptureProfile("bad", **settings)
+            assert False, f"accepted {settings}"
+        except ProfileError:
+            pass
+    try:
+        get_profile("no-such-profile", path=os.path.join(tempfile.gettempdir(), "missing.json"))
+        assert False, "unknown profile accepted"
+    except ProfileError as e:
+        assert "speech" in str(e)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profiles.json")
+        for data in ([{"sample_rate": 16000}], "speech", {"mine": [16000]}):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            try:
+                load_profiles(path)
+                assert False, f"accepted {data!r}"
+            except ProfileError as e:
+                assert "profiles.json" in str(e)
+    print("✅ Invalid profiles rejected")
+
+
+def test_recorder_config_from_profile():
+    """A RecorderConfig takes its stream settings from the profile"""
+    print("\nTesting RecorderConfig.from_profile...")
+    config = RecorderConfig.from_profile(PROFILES["speech"], channels=2, duration=10)
+    assert (config.profile, config.sample_rate, config.channels) == ("speech", 16000, 2)
+    assert (config.block_size, config.latency, config.duration) == (320, "low", 10)
+    assert config.capture_profile() == CaptureProfile("speech", 16000, 2, block_size=320,
+                                                      latency="low")
+    print("✅ Config built from profile with overrides")
+
+
+def main():
+    """Run all capture profile tests"""
+    tests = [test_builtin_profiles, test_custom_profiles_from_json,
+             test_invalid_profiles_rejected, test_recorder_config_from_profile]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All capture profile tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
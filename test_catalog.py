@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite recordings catalog.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from catalog import CATALOG_NAME, RecordingCatalog, file_checksum, main as catalog_main
+from fake_backends import ToneSource, fake_audio
+from recorder import Recorder, RecorderConfig
+
+
+def test_find_uses_indexes():
+    """Takes are found by name and time through the indexes"""
+    print("Testing catalog queries...")
+    with tempfile.TemporaryDirectory() as tmp:
+        start = datetime(2024, 5, 1, 9, 0)
+        with RecordingCatalog(os.path.join(tmp, CATALOG_NAME)) as catalog:
+            for i in range(50):
+                name = "Zoë O'Neil" if i % 2 else "bob"
+                catalog.add_take({"take": f"{name}_{i}", "name": name,
+                                  "started_at": start + timedelta(hours=i),
+                                  "duration": 2.0, "sample_rate": 48000})
+            assert catalog.count() == 50
+            takes = catalog.find(name="bob", since=start + timedelta(hours=10), limit=3)
+            assert [t["take"] for t in takes] == ["bob_48", "bob_46", "bob_44"]
+            assert len(catalog.find(until=start + timedelta(hours=5))) == 5
+            assert catalog.names() == [("Zoë O'Neil", 25), ("bob", 25)]
+
+            for sql in ("SELECT * FROM takes WHERE name = 'bob' ORDER BY started_at",
+                        "SELECT * FROM takes WHERE started_at >= '2024' ORDER BY started_at"):
+                plan = " ".join(row[-1] for row in catalog.db.execute("EXPLAIN QUERY PLAN " + sql))
+                assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, plan
+
+            # Replacing a take keeps one row
+            catalog.add_take({"take": "bob_0", "name": "bob", "started_at": start})
+            assert catalog.count() == 50 and catalog.get("bob_0")["duration"] is None
+            assert catalog.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    print("✅ Name and time lookups use the indexes")
+
+
+def test_recorder_catalogs_takes():
+    """Saved takes are catalogued with their files and checksums"""
+    print("\nTesting cataloguing of recorded takes...")
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=10):
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=0.5)
+        recorder = Recorder(config)
+        first = recorder.record("Ana/María")
+        # Catalogued when record() returns; the checksums follow on the queue
+        assert recorder.open_catalog().get(first.basename) is not None
+        second = recorder.record("Ana/María", background=True)
+        recorder.close()
+
+        with RecordingCatalog(os.path.join(tmp, CATALOG_NAME)) as catalog:
+            takes = catalog.find(name="Ana/María", newest_first=False)
+            assert [t["take"] for t in takes] == [first.basename, second.basename]
+            row = takes[0]
+            assert row["safe_name"] == "Ana_María" and row["audio_frames"] == 8000
+            assert row["duration"] == 0.5 and row["audio_device"] == "Synthetic input"
+            paths = {entry["path"]: entry for entry in row["files"]}
+            audio = paths[os.path.basename(first.audio_path)]
+            assert audio["bytes"] == os.path.getsize(first.audio_path)
+            assert audio["sha256"] == file_checksum(first.audio_path)
+            assert os.path.basename(first.sync_path) in paths
+            assert catalog.find(name="Ana_María", limit=1)[0]["take"] == second.basename
+            assert catalog.verify() == []
+
+            with open(first.audio_path, 'r+b') as f:
+                f.seek(100)
+                f.write(b"\x7f")
+            assert catalog.verify() == [(audio["path"], "checksum mismatch")]
+        assert catalog_main(["--output-dir", tmp, "--verify"]) == 1
+    print("✅ Takes catalogued and verified")
+
+
+def test_catalog_errors_do_not_fail_takes():
+    """A catalog that cannot be written only produces a warning"""
+    print("\nTesting catalog write failures...")
+    events = []
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=10):
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=0.5)
+        recorder = Recorder(config, listener=lambda event, data: events.append((event, data)))
+
+        def locked(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        recorder.open_catalog().add_take = locked
+        take = recorder.record("frank")
+        recorder.close()
+        assert take.save_error is None and os.path.exists(take.audio_path)
+        warnings = [data["text"] for event, data in events if event == "warning"]
+        assert any("database is locked" in text for text in warnings), warnings
+        assert "saved" in [event for event, _ in events]
+    print("✅ Take saved despite the catalog error")
+
+
+def test_failed_capture_is_not_catalogued():
+    """A take whose capture raised is closed but left out of the catalog"""
+    print("\nTesting failed captures...")
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=10):
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=0.2)
+        recorder = Recorder(config)
+        record_audio = recorder._record_audio_only
+
+        def crash(take, duration):
+            record_audio(take, duration)
+            raise RuntimeError("input device unplugged")
+
+        recorder._record_audio_only = crash
+        try:
+            recorder.record("hank")
+            assert False, "capture error swallowed"
+        except RuntimeError:
+            pass
+        recorder._record_audio_only = record_audio
+        take = recorder.record("hank")
+        recorder.close()
+        with RecordingCatalog(os.path.join(tmp, CATALOG_NAME)) as catalog:
+            assert [t["take"] for t in catalog.find(name="hank")] == [take.basename]
+    print("✅ Only the complete take catalogued")
+
+
+def test_reindex_existing_recordings():
+    """Takes recorded before the catalog are added from their sidecars"""
+    print("\nTesting reindexing...")
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=10):
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=0.5, catalog_file=None)
+        recorder = Recorder(config)
+        takes = [recorder.record("carol") for _ in range(2)]
+        recorder.close()
+        assert not os.path.exists(os.path.join(tmp, CATALOG_NAME))
+
+        with RecordingCatalog(os.path.join(tmp, CATALOG_NAME)) as catalog:
+            assert catalog.reindex() == 2
+            assert catalog.reindex() == 0
+            rows = catalog.find(name="carol", newest_first=False)
+            assert [r["take"] for r in rows] == [t.basename for t in takes]
+            assert rows[1]["duration"] == 0.5 and rows[1]["name"] == "carol"
+            files = [entry["path"] for entry in rows[0]["files"]]
+            assert files == sorted(os.path.basename(p) for p in takes[0].output_files), files
+    print("✅ Existing takes reindexed")
+
+
+def main():
+    """Run all catalog tests"""
+    tests = [test_find_uses_indexes, test_recorder_catalogs_takes,
+             test_catalog_errors_do_not_fail_takes, test_failed_capture_is_not_catalogued,
+             test_reindex_existing_recordings]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All catalog tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
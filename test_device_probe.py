@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk device probe cache.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from device_probe import DeviceProbeCache, DeviceProber, camera_identity
+
+
+def test_cache_roundtrip():
+    """Probe results survive a reload of the cache file"""
+    print("Testing device cache persistence...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache", "devices.json")
+        cache = DeviceProbeCache(path)
+        assert cache.get("cam") is None
+        cache.put("cam", {"available": True, "error": None, "width": 640, "height": 480})
+
+        reloaded = DeviceProbeCache(path)
+        entry = reloaded.get("cam")
+        assert entry["available"] is True
+        assert entry["width"] == 640
+    print("✅ Cache persisted to disk")
+
+
+def test_cache_expiry():
+    """Stale entries are ignored so the device is probed again"""
+    print("\nTesting device cache expiry...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DeviceProbeCache(os.path.join(tmp, "devices.json"), max_age=60)
+        cache.put("cam", {"available": True, "error": None})
+        cache.entries["cam"]["probed_at"] = time.time() - 120
+        assert cache.get("cam") is None
+    print("✅ Stale entries expire")
+
+
+def test_prober_uses_cache():
+    """A cached webcam result is returned without opening the camera"""
+    print("\nTesting cached probe...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DeviceProbeCache(os.path.join(tmp, "devices.json"))
+        cache.put(camera_identity(7), {"available": True, "error": None})
+        prober = DeviceProber(camera_index=7, cache=cache)
+        assert prober.cached_webcam()["available"] is True
+
+        prober.invalidate_webcam()
+        assert prober.cached_webcam() is None
+    print("✅ Prober reads and invalidates the cache")
+
+
+def main():
+    """Run all device probe tests"""
+    tests = [test_cache_roundtrip, test_cache_expiry, test_prober_uses_cache]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All device probe tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for background finalizing: the bounded job queue and takes saved
+after record(background=True) has returned.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_backends import ToneSource, fake_audio
+from finalize_queue import FinalizeQueue
+from recorder import Recorder, RecorderConfig
+
+
+def test_queue_is_bounded():
+    """reserve() waits while max_pending jobs are in flight"""
+    print("Testing finalize queue bound...")
+    queue = FinalizeQueue(max_pending=2)
+    release = threading.Event()
+    done = []
+
+    def job(number):
+        release.wait(5)
+        done.append(number)
+        return number
+
+    assert queue.reserve(timeout=0)
+    first = queue.submit(job, 1)
+    assert queue.reserve(timeout=0)
+    second = queue.submit(job, 2)
+    assert queue.pending == 2
+    assert not queue.reserve(timeout=0.05)
+
+    release.set()
+    assert first.result(timeout=5) == 1 and second.result(timeout=5) == 2
+    assert queue.reserve(timeout=1)
+    queue.cancel()
+    queue.close()
+    assert done == [1, 2] and queue.pending == 0
+    print("✅ Third take waited for a free slot")
+
+
+def test_background_take_is_saved():
+    """A background take is finalized after record() returns"""
+    print("\nTesting background save...")
+    events = []
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=10):
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=1.0)
+        recorder = Recorder(config, listener=lambda event, data: events.append(event))
+        takes = [recorder.record("kiosk", background=True) for _ in range(3)]
+        recorder.close()  # Waits for the queued saves
+        for take in takes:
+            assert take.wait_saved(timeout=0) and take.save_error is None
+            assert os.path.exists(take.audio_path)
+            assert take.audio_frames == 16000
+            assert take.metrics["audio_finalize_seconds"]["count"] == 1
+    assert events.count("saved") == 3 and "save_failed" not in events
+    print("✅ 3 back-to-back takes saved in the background")
+
+
+def main():
+    """Run all finalize queue tests"""
+    tests = [test_queue_is_bounded, test_background_take_is_saved]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All finalize queue tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
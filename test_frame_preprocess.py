@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the crop/scale/grayscale stage that runs before video encoding.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from frame_preprocess import FramePreprocessor, crop_region, parse_crop, parse_size
+from video_pipeline import FramePipeline
+
+
+def _frame(seed=0, size=(640, 480)):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+
+
+def _address(array):
+    return array.__array_interface__["data"][0]
+
+
+def test_crop_regions():
+    """Center crops keep the output aspect ratio, ROIs are clamped"""
+    print("Testing crop regions...")
+    assert crop_region((640, 480), None) == (0, 0, 640, 480)
+    assert crop_region((640, 480), "center", (200, 200)) == (80, 0, 480, 480)
+    assert crop_region((640, 480), "center", (320, 90)) == (0, 150, 640, 180)
+    assert crop_region((640, 480), (600, 400, 100, 100)) == (600, 400, 40, 80)
+    try:
+        crop_region((640, 480), (700, 0, 10, 10))
+        assert False, "crop outside the frame accepted"
+    except ValueError:
+        pass
+    assert parse_size("320X240") == (320, 240)
+    assert parse_crop("10,20,30,40") == (10, 20, 30, 40)
+    print("✅ Crop regions computed")
+
+
+def test_output_matches_reference():
+    """Preprocessed frames equal the same operations done with fresh arrays"""
+    print("\nTesting preprocessing output...")
+    frame = _frame()
+    preprocessor = FramePreprocessor((640, 480), size=(160, 160), crop="center", grayscale=True)
+    reference = cv2.cvtColor(cv2.resize(frame[:, 80:560], (160, 160),
+                                        interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    assert np.array_equal(preprocessor(frame), reference)
+
+    preprocessor = FramePreprocessor((640, 480), crop=(100, 50, 64, 32))
+    result = preprocessor(frame)
+    assert result.flags["C_CONTIGUOUS"]
+    assert np.array_equal(result, frame[50:82, 100:164])
+    # Full-width crops need no copy
+    for crop in ((0, 0, 640, 480), (0, 40, 640, 400)):
+        result = FramePreprocessor((640, 480), crop=crop)(frame)
+        assert result.flags["C_CONTIGUOUS"] and np.shares_memory(result, frame), crop
+        assert np.array_equal(result, frame[crop[1]:crop[1] + crop[3]])
+    assert not FramePreprocessor((640, 480)).active
+    print("✅ Output matches cv2 reference")
+
+
+def test_buffers_are_reused():
+    """Every frame is written into the same preallocated buffer"""
+    print("\nTesting buffer reuse...")
+    for options in ({"size": (320, 240)}, {"size": (320, 240), "grayscale": True},
+                    {"crop": (0, 0, 100, 100), "size": (400, 400), "grayscale": True}):
+        preprocessor = FramePreprocessor((640, 480), **options)
+        first = _address(preprocessor(_frame(1)))
+        for seed in range(2, 6):
+            assert _address(preprocessor(_frame(seed))) == first, options
+    print("✅ No per-frame allocations")
+
+
+class FileCamera:
+    """Deliver the same frame at camera speed"""
+
+    def __init__(self, frame, fps=60):
+        self.frame = frame
+        self.interval = 1.0 / fps
+
+    def grab(self):
+        time.sleep(self.interval)
+        return True
+
+    def retrieve(self):
+        return True, self.frame.copy()
+
+
+def test_pipeline_encodes_smaller_video():
+    """A face-sized grayscale crop encodes to a fraction of the full frame"""
+    print("\nTesting preprocessing in the pipeline...")
+    frame = _frame(7)
+    sizes = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, preprocessor in (("full", None),
+                                    ("face", FramePreprocessor((640, 480), size=(160, 160),
+                                                               crop="center", grayscale=True))):
+            path = os.path.join(tmp, label + ".mp4")
+            size = preprocessor.output_size if preprocessor else (640, 480)
+            is_color = preprocessor.is_color if preprocessor else True
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, size, is_color)
+            pipeline = FramePipeline(FileCamera(frame), writer, fps=30, max_frames=10,
+                                     preprocess=preprocessor)
+            pipeline.start()
+            assert pipeline.wait(timeout=5)
+            pipeline.stop()
+            writer.release()
+            assert pipeline.frames_written == 10 and pipeline.error is None
+            sizes[label] = os.path.getsize(path)
+
+        capture = cv2.VideoCapture(os.path.join(tmp, "face.mp4"))
+        ok, decoded = capture.read()
+        capture.release()
+        assert ok and decoded.shape[:2] == (160, 160)
+    assert sizes["face"] * 4 < sizes["full"]
+    print(f"✅ {sizes['full']} bytes full frame, {sizes['face']} bytes preprocessed")
+
+
+def main():
+    """Run all frame preprocessing tests"""
+    tests = [test_crop_regions, test_output_matches_reference, test_buffers_are_reused,
+             test_pipeline_encodes_smaller_video]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All frame preprocessing tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
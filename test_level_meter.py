@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for audio level metering and clipping detection.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_meter import run_benchmark
+from level_meter import LevelMeter, MeteredSink
+
+
+def _sine(frames, amplitude, channels=1):
+    t = np.arange(frames) / 48000
+    tone = (amplitude * np.sin(2 * np.pi * 1000 * t)).astype(np.float32)
+    return np.repeat(tone.reshape(-1, 1), channels, axis=1)
+
+
+def test_take_statistics():
+    """Peak and RMS match the signal, per channel and overall"""
+    print("Testing level statistics...")
+    meter = LevelMeter(channels=2)
+    block = _sine(4800, 0.5, channels=2)
+    block[:, 1] *= 0.1
+    for start in range(0, 4800, 480):
+        meter.update(block[start:start + 480])
+    stats = meter.stats()
+    assert abs(stats["channel_peak_db"][0] - -6.02) < 0.05
+    assert abs(stats["channel_peak_db"][1] - -26.02) < 0.05
+    assert abs(stats["channel_rms_db"][0] - -9.03) < 0.05
+    assert stats["peak_db"] == stats["channel_peak_db"][0]
+    assert stats["clipped_samples"] == 0 and stats["frames"] == 4800
+    assert not meter.problems()
+    print(f"✅ Peak {stats['peak_db']} dBFS, RMS {stats['rms_db']} dBFS")
+
+
+def test_clipping_and_silence_detection():
+    """Clipped samples are counted; near-silent takes are flagged"""
+    print("\nTesting clipping detection...")
+    meter = LevelMeter()
+    hot = np.clip(_sine(4800, 1.5), -1.0, 1.0)
+    meter.update(hot)
+    expected = int(np.count_nonzero(np.abs(hot) >= 0.999))
+    assert meter.clipped == expected > 0
+    assert "clipped" in meter.problems()[0]
+
+    quiet = LevelMeter()
+    quiet.update(_sine(4800, 0.001))
+    assert "silent" in quiet.problems()[0]
+
+    ints = LevelMeter()
+    ints.update((hot * 32767).astype(np.int16))
+    assert ints.clipped == expected
+    print(f"✅ {meter.clipped} clipped samples counted")
+
+
+def test_window_reads_reset():
+    """The live window covers the blocks since the previous read"""
+    print("\nTesting live level window...")
+    meter = LevelMeter()
+    assert meter.read_window() is None
+    meter.update(_sine(480, 0.5))
+    meter.update(_sine(480, 0.05))
+    peak_db, rms_db = meter.read_window()
+    assert abs(peak_db - -6.02) < 0.1 and rms_db < peak_db
+    meter.update(_sine(480, 0.05))
+    peak_db, _ = meter.read_window()
+    assert abs(peak_db - -26.02) < 0.1
+    assert meter.stats()["frames"] == 1440  # Reads do not reset the totals
+    print("✅ Window reset after each read")
+
+
+def test_metered_sink():
+    """MeteredSink passes blocks through unchanged"""
+    print("\nTesting metered sink...")
+    received = []
+
+    class Sink:
+        frames_written = 0
+
+        def __call__(self, block):
+            received.append(block)
+
+        def close(self):
+            received.append(None)
+
+    sink = MeteredSink(Sink())
+    block = _sine(480, 0.25)
+    sink(block)
+    sink.close()
+    assert received[0] is block and received[1] is None
+    assert sink.meter.frames == 480
+    print("✅ Blocks metered and forwarded")
+
+
+def test_callback_overhead_is_negligible():
+    """Metering uses a tiny fraction of the callback's real-time budget"""
+    print("\nTesting metering cost...")
+    result = run_benchmark(block_size=1024, sample_rate=44100, channels=2, repeats=500)
+    assert result["budget_fraction"] < 0.02, result
+    print(f"✅ Meter costs {result['meter_us']:.1f} us per block "
+          f"({result['budget_fraction']:.2%} of the budget)")
+
+
+def main():
+    """Run all level meter tests"""
+    tests = [test_take_statistics, test_clipping_and_silence_detection,
+             test_window_reads_reset, test_metered_sink, test_callback_overhead_is_negligible]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All level meter tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
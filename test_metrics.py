@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the stage timing histograms and their export.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import urllib.request
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from audio_capture import AudioCaptureEngine
+from metrics import (Histogram, JsonLinesMetricsSink, MetricsRegistry, PrometheusEndpoint,
+                     format_summary)
+
+
+def test_histogram_percentiles():
+    """Percentiles are interpolated within buckets and capped at the max"""
+    print("Testing histogram percentiles...")
+    histogram = Histogram("t", buckets=(0.001, 0.002, 0.004, 0.008))
+    for value in np.linspace(0.0001, 0.001, 90):
+        histogram.observe(float(value))
+    for _ in range(10):
+        histogram.observe(0.006)
+    stats = histogram.summary()
+    assert stats["count"] == 100
+    assert stats["p50"] <= 0.001
+    assert 0.004 < stats["p95"] <= 0.006, stats
+    assert stats["max"] == 0.006 and stats["p99"] <= 0.006
+    histogram.observe(1.0)  # Beyond the last bucket
+    assert histogram.summary()["max"] == 1.0
+    print(f"✅ p50 {stats['p50'] * 1000:.2f} ms, p95 {stats['p95'] * 1000:.2f} ms")
+
+
+def test_take_summary_covers_one_take():
+    """take_summary() only reports what happened since begin_take()"""
+    print("\nTesting per-take summaries...")
+    registry = MetricsRegistry()
+    registry.observe("video_encode_seconds", 0.5)
+    registry.counter("audio_ring_overruns").inc()
+    registry.begin_take()
+    for _ in range(4):
+        registry.observe("video_encode_seconds", 0.002)
+    summary = registry.take_summary()
+    assert summary["video_encode_seconds"]["count"] == 4
+    assert summary["video_encode_seconds"]["max"] == 0.002
+    assert summary["audio_ring_overruns"] == 0
+    assert "camera_grab_seconds" not in summary
+    assert "encode p95" in format_summary(summary)
+    print(f"✅ {format_summary(summary)}")
+
+
+def test_engine_records_overflows():
+    """The audio callback counts overflows and times itself"""
+    print("\nTesting audio callback instrumentation...")
+    registry = MetricsRegistry()
+    engine = AudioCaptureEngine(sample_rate=16000, blocksize=160, buffer_seconds=0.01,
+                                metrics=registry)
+    engine._sd = SimpleNamespace(CallbackStop=Exception)
+    block = np.zeros((160, 1), dtype=np.float32)
+    time_info = SimpleNamespace(inputBufferAdcTime=0.0, currentTime=0.0)
+    engine._callback(block, 160, time_info, SimpleNamespace(input_overflow=True))
+    engine._callback(block, 160, time_info, 1)
+    for _ in range(engine.ring.capacity):
+        engine._callback(block, 160, time_info, None)
+    summary = registry.take_summary()
+    assert summary["audio_input_overflows"] == 2
+    assert summary["audio_ring_overruns"] == 2 == engine.overruns
+    assert summary["audio_callback_seconds"]["count"] == engine.ring.capacity + 2
+    print("✅ Overflows and overruns counted")
+
+
+def test_exports():
+    """JSON lines and Prometheus text carry the histograms"""
+    print("\nTesting metrics export...")
+    registry = MetricsRegistry()
+    registry.observe("camera_grab_seconds", 0.03)
+    registry.observe("camera_grab_seconds", 0.04)
+    text = registry.render_prometheus()
+    assert '# TYPE whoop_camera_grab_seconds histogram' in text
+    assert 'whoop_camera_grab_seconds_bucket{le="+Inf"} 2' in text
+    assert 'whoop_camera_grab_seconds_count 2' in text
+    assert 'whoop_audio_ring_overruns_total 0' in text
+
+    endpoint = PrometheusEndpoint(registry, port=0)
+    try:
+        url = f"http://127.0.0.1:{endpoint.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.read().decode() == registry.render_prometheus()
+    finally:
+        endpoint.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = JsonLinesMetricsSink(os.path.join(tmp, "metrics.jsonl"))
+        sink.write_take("take1", registry.take_summary())
+        sink.close()
+        with open(sink.filepath, encoding='utf-8') as f:
+            record = json.loads(f.readline())
+    assert record["take"] == "take1"
+    assert record["metrics"]["camera_grab_seconds"]["count"] == 2
+    print("✅ Metrics served and written")
+
+
+def test_concurrent_take_summaries():
+    """Summaries written from several threads stay whole lines"""
+    print("\nTesting concurrent metrics writes...")
+    registry = MetricsRegistry()
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = JsonLinesMetricsSink(os.path.join(tmp, "metrics.jsonl"))
+
+        def save_takes(worker):
+            for i in range(100):
+                registry.observe("take_save_seconds", 0.01)
+                sink.write_take(f"take{worker}_{i}", {"padding": "x" * 5000})
+
+        threads = [threading.Thread(target=save_takes, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sink.close()
+        with open(sink.filepath, encoding='utf-8') as f:
+            takes = {json.loads(line)["take"] for line in f}
+    assert len(takes) == 400
+    assert registry.histogram("take_save_seconds").count == 400
+    print("✅ 400 summaries written from 4 threads")
+
+
+def main():
+    """Run all metrics tests"""
+    tests = [test_histogram_percentiles, test_take_summary_covers_one_take,
+             test_engine_records_overflows, test_exports, test_concurrent_take_summaries]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All metrics tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for MJPEG passthrough recording. An MJPG video file stands in for the
+webcam; OpenCV's FFmpeg backend hands out its undecoded JPEG frames just
+like a camera in passthrough mode.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from av_sync import MonotonicClock
+from camera_manager import CameraManager, is_jpeg_frame
+from fake_backends import SyntheticCamera
+from mjpeg_archive import (INDEX_SUFFIX, MjpegFrameArchive, build_transcode_command,
+                           indexed_frames, load_archive_index, read_frame, transcode_archive)
+from muxer import find_ffmpeg
+from video_pipeline import FramePipeline
+
+
+def _make_video(path, frames=30, fourcc='MJPG'):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), 30, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i * 8 % 256, dtype=np.uint8))
+    writer.release()
+
+
+class PacedCapture:
+    """Deliver a video file's frames at camera speed instead of at once"""
+
+    def __init__(self, cap, fps=30):
+        self.cap = cap
+        self.interval = 1.0 / fps
+        self.next_frame = time.perf_counter()
+
+    def grab(self):
+        delay = self.next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame += self.interval
+        return self.cap.grab()
+
+    def retrieve(self):
+        return self.cap.retrieve()
+
+
+def test_passthrough_delivers_jpeg_frames():
+    """The camera manager switches the capture to raw JPEG frames"""
+    print("Testing passthrough capture...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "camera.avi")
+        _make_video(path)
+        manager = CameraManager(index=path, idle_timeout=0)
+        cap = manager.acquire()
+        assert manager.set_passthrough(True)
+        ok, frame = cap.read()
+        assert ok and is_jpeg_frame(frame)
+        image = cv2.imdecode(frame.reshape(-1), cv2.IMREAD_COLOR)
+        assert image.shape == (48, 64, 3)
+        manager.close()
+    print(f"✅ Camera delivers {frame.size}-byte JPEG frames")
+
+
+def test_archive_stores_frames_once_with_index():
+    """Duplicated frames reference the stored bytes instead of repeating them"""
+    print("\nTesting frame archive...")
+    with tempfile.TemporaryDirectory() as tmp:
+        clock = MonotonicClock()
+        path = os.path.join(tmp, "take.mjpeg")
+        ok, jpeg_a = cv2.imencode(".jpg", np.zeros((48, 64, 3), dtype=np.uint8))
+        ok, jpeg_b = cv2.imencode(".jpg", np.full((48, 64, 3), 255, dtype=np.uint8))
+
+        archive = MjpegFrameArchive(path, 30, (64, 48), clock=clock)
+        archive.write_timed(jpeg_a, clock.origin + 0.0, clock.origin + 0.0)
+        archive.write_timed(jpeg_a, clock.origin + 0.0, clock.origin + 1 / 30)
+        archive.write_timed(jpeg_b, clock.origin + 0.07, clock.origin + 2 / 30)
+        archive.release()
+
+        header, frames = load_archive_index(os.path.join(tmp, "take" + INDEX_SUFFIX))
+        assert header["fps"] == 30 and (header["width"], header["height"]) == (64, 48)
+        assert [f["frame"] for f in frames] == [0, 1, 2]
+        assert frames[0]["offset"] == frames[1]["offset"]
+        assert frames[2]["t"] == 0.07
+        assert os.path.getsize(path) == jpeg_a.size + jpeg_b.size
+        assert read_frame(path, frames[2]) == jpeg_b.tobytes()
+    print("✅ Repeated frames stored once and indexed")
+
+
+def test_pipeline_records_passthrough_take():
+    """A paced passthrough take is archived without decoding any frame"""
+    print("\nTesting passthrough pipeline...")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "camera.avi")
+        _make_video(source, frames=60)
+        manager = CameraManager(index=source, idle_timeout=0)
+        cap = manager.acquire()
+        assert manager.set_passthrough(True)
+
+        path = os.path.join(tmp, "take.mjpeg")
+        archive = MjpegFrameArchive(path, 30, (64, 48), clock=MonotonicClock())
+        pipeline = FramePipeline(PacedCapture(cap), archive, fps=30, max_frames=15)
+        pipeline.start()
+        assert pipeline.wait(timeout=5)
+        pipeline.stop()
+        archive.release()
+        manager.close()
+
+        _, frames = load_archive_index(os.path.join(tmp, "take" + INDEX_SUFFIX))
+        assert len(frames) == pipeline.frames_written == 15
+        assert all("t" in f and "deadline" in f for f in frames)
+        for entry in frames:
+            image = cv2.imdecode(np.frombuffer(read_frame(path, entry), dtype=np.uint8),
+                                 cv2.IMREAD_COLOR)
+            assert image is not None and image.shape == (48, 64, 3)
+    print(f"✅ {len(frames)} frames archived, {archive.frames_stored} stored")
+
+
+def test_transcode_command():
+    """Archives are remuxed without re-encoding by default"""
+    print("\nTesting transcode command...")
+    command = build_transcode_command("t.mjpeg", "t.avi", 30)
+    assert command[command.index("-i") - 4:command.index("-i")] == ["-f", "mjpeg", "-framerate", "30"]
+    assert command[-3:] == ["-c:v", "copy", "t.avi"]
+
+    command = build_transcode_command("t.mjpeg", "t.mp4", 25, codec="h264",
+                                      audio_path="t.flac", av_offset=0.05)
+    assert command[command.index("t.mjpeg") - 7:command.index("t.mjpeg") - 5] == \
+        ["-itsoffset", "0.050000"]
+    assert "libx264" in command and ["-map", "1:a:0"] == command[command.index("1:a:0") - 1:
+                                                                  command.index("1:a:0") + 1]
+    print("✅ Transcode commands built")
+
+
+def test_transcode_keeps_repeated_frames():
+    """A slow camera's archive transcodes to the take's full duration"""
+    print("\nTesting transcoding of repeated frames...")
+    with tempfile.TemporaryDirectory() as tmp:
+        camera = SyntheticCamera(64, 48, fps=15)
+        camera.set(cv2.CAP_PROP_FORMAT, -1)
+        path = os.path.join(tmp, "take.mjpeg")
+        archive = MjpegFrameArchive(path, 30, (64, 48), clock=MonotonicClock())
+        pipeline = FramePipeline(camera, archive, fps=30, max_frames=60)
+        pipeline.start()
+        assert pipeline.wait(timeout=10)
+        pipeline.stop()
+        archive.release()
+
+        header, frames = load_archive_index(os.path.join(tmp, "take" + INDEX_SUFFIX))
+        assert len(frames) == 60 and archive.frames_stored < 45, archive.frames_stored
+        # The stream piped to ffmpeg has a frame per index entry: 2 s at 30 fps
+        stream = list(indexed_frames(path, frames))
+        assert len(stream) == 60 and len(stream) / header["fps"] == 2.0
+        assert stream == [read_frame(path, entry) for entry in frames]
+
+        if find_ffmpeg() is None:
+            print(f"✅ {len(stream)} frames from {archive.frames_stored} stored "
+                  "(ffmpeg not found, transcode skipped)")
+            return
+        output = transcode_archive(path)
+        video = cv2.VideoCapture(output)
+        count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = video.get(cv2.CAP_PROP_FPS)
+        video.release()
+        assert count == 60 and abs(count / fps - 2.0) < 0.05, (count, fps)
+    print(f"✅ {count} frames transcoded from {archive.frames_stored} stored")
+
+
+def main():
+    """Run all MJPEG archive tests"""
+    tests = [test_passthrough_delivers_jpeg_frames, test_archive_stores_frames_once_with_index,
+             test_pipeline_records_passthrough_take, test_transcode_command,
+             test_transcode_keeps_repeated_frames]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All MJPEG archive tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
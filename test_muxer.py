@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the ffmpeg mux command used for single-file A/V output.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from muxer import build_mux_command
+
+
+def test_mux_command_delays_late_video():
+    """Video that started after the audio is shifted by the sync offset"""
+    print("Testing mux command for late video...")
+    command = build_mux_command("take.video.mp4", "take.wav", "take.mp4", av_offset=0.0425)
+    video_at = command.index("take.video.mp4")
+    assert command[video_at - 3:video_at - 1] == ["-itsoffset", "0.042500"]
+    assert command.count("-itsoffset") == 1
+    assert command[-3:] == ["-f", "mp4", "take.mp4"]
+    assert "+faststart" in command
+    print("✅ Video delayed by the A/V offset")
+
+
+def test_mux_command_delays_late_audio():
+    """Audio that started after the video is shifted instead"""
+    print("\nTesting mux command for late audio...")
+    command = build_mux_command("v.mp4", "a.wav", "out.mkv", av_offset=-0.1)
+    audio_at = command.index("a.wav")
+    assert command[audio_at - 3:audio_at - 1] == ["-itsoffset", "0.100000"]
+    assert command[-3:] == ["-f", "matroska", "out.mkv"]
+    assert "+faststart" not in command
+    print("✅ Audio delayed by the A/V offset")
+
+
+def main():
+    """Run all muxer tests"""
+    tests = [test_mux_command_delays_late_video, test_mux_command_delays_late_audio]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All muxer tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for float to PCM conversion.
+"""
+
+import os
+import struct
+import sys
+import tempfile
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pcm import WAVE_FORMAT_IEEE_FLOAT, PCMConverter
+from wav_writer import WavStreamWriter
+
+
+def test_int16_clips_instead_of_wrapping():
+    """Out-of-range samples saturate at full scale"""
+    print("Testing int16 clipping...")
+    block = np.array([[0.0], [0.5], [1.0], [1.5], [-1.0], [-1.5]], dtype=np.float32)
+    pcm = np.frombuffer(PCMConverter("int16").convert(block), dtype='<i2')
+    assert pcm.tolist() == [0, 16384, 32767, 32767, -32767, -32768]
+    print("✅ Hot samples clipped to full scale")
+
+
+def test_int24_packing():
+    """24-bit samples are packed as three little-endian bytes"""
+    print("\nTesting int24 packing...")
+    block = np.array([0.0, 1.0, -1.0, 2.0, -2.0, 0.25], dtype=np.float32)
+    raw = bytes(PCMConverter("int24").convert(block))
+    assert len(raw) == 18
+    values = [int.from_bytes(raw[i:i + 3], "little", signed=True) for i in range(0, 18, 3)]
+    assert values == [0, 8388607, -8388607, 8388607, -8388608, 2097152]
+    print("✅ 24-bit samples packed correctly")
+
+
+def test_float32_passthrough():
+    """Float output keeps the samples unscaled"""
+    print("\nTesting float32 output...")
+    block = np.array([[0.1, -0.2], [1.25, -1.0]], dtype=np.float32)
+    out = np.frombuffer(PCMConverter("float32").convert(block), dtype='<f4')
+    assert np.array_equal(out, block.reshape(-1))
+    print("✅ Float samples written unchanged")
+
+
+def test_integer_capture_input():
+    """int16 captures are written bit-exact and widened without loss"""
+    print("\nTesting integer input...")
+    block = np.array([-32768, -1, 0, 1, 32767], dtype=np.int16)
+    pcm = np.frombuffer(PCMConverter("int16").convert(block), dtype='<i2')
+    assert np.array_equal(pcm, block)
+    raw = bytes(PCMConverter("int24").convert(block))
+    values = [int.from_bytes(raw[i:i + 3], "little", signed=True) for i in range(0, 15, 3)]
+    assert values == [v * 256 for v in block.tolist()]
+    print("✅ Integer samples rescaled exactly")
+
+
+def test_tpdf_dither_bounds():
+    """Dither changes samples by at most one LSB and does not add a DC offset"""
+    print("\nTesting TPDF dither...")
+    block = np.full(100000, 100.3 / 32767, dtype=np.float32)
+    pcm = np.frombuffer(PCMConverter("int16", dither=True, seed=1).convert(block), dtype='<i2')
+    assert set(np.unique(pcm)) <= {99, 100, 101, 102}
+    assert abs(pcm.mean() - 100.3) < 0.02
+    print(f"✅ Dithered mean {pcm.mean():.3f} for a constant 100.3 LSB input")
+
+
+def test_buffers_are_reused():
+    """Converting same-sized blocks does not allocate new buffers"""
+    print("\nTesting buffer reuse...")
+    converter = PCMConverter("int16")
+    block = np.zeros((1024, 1), dtype=np.float32)
+    first = converter.convert(block)
+    second = converter.convert(block)
+    assert np.shares_memory(np.frombuffer(first, dtype=np.uint8),
+                            np.frombuffer(second, dtype=np.uint8))
+    print("✅ Output buffer reused between blocks")
+
+
+def test_wav_sample_formats():
+    """WavStreamWriter writes readable 24-bit and tagged float files"""
+    print("\nTesting WAV sample formats...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "take24.wav")
+        with WavStreamWriter(path, 8000, sample_format="int24") as writer:
+            writer(np.full((100, 1), 0.5, dtype=np.float32))
+        with wave.open(path, 'rb') as wf:
+            assert wf.getsampwidth() == 3
+            assert wf.getnframes() == 100
+
+        path = os.path.join(tmp, "takef.wav")
+        with WavStreamWriter(path, 8000, channels=2, sample_format="float32") as writer:
+            writer(np.zeros((50, 2), dtype=np.float32))
+        with open(path, 'rb') as f:
+            header = f.read(44)
+        format_tag, channels = struct.unpack('<HH', header[20:24])
+        bits = struct.unpack('<H', header[34:36])[0]
+        data_bytes = struct.unpack('<I', header[40:44])[0]
+        assert (format_tag, channels, bits, data_bytes) == (WAVE_FORMAT_IEEE_FLOAT, 2, 32, 400)
+    print("✅ 24-bit and float WAV files written")
+
+
+def main():
+    """Run all PCM conversion tests"""
+    tests = [test_int16_clips_instead_of_wrapping, test_int24_packing,
+             test_float32_passthrough, test_integer_capture_input, test_tpdf_dither_bounds,
+             test_buffers_are_reused, test_wav_sample_formats]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All PCM conversion tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the audio pre-roll. Blocks are fed to the pre-roll the way the
+capture engine's drain thread does, so no microphone is required.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from av_sync import MonotonicClock, SyncIndex, load_sync_index
+from fake_backends import fake_audio
+from preroll import PreRollCapture
+from recorder import Recorder, RecorderConfig
+
+
+class ListSink:
+    """Sink that stores the first sample of every block it receives"""
+
+    def __init__(self):
+        self.blocks = []
+        self.frames_written = 0
+
+    def __call__(self, block):
+        self.blocks.append((int(block[0, 0]), len(block)))
+        self.frames_written += len(block)
+
+
+def _feed(preroll, first, count, blocksize=100, start_time=0.0, sample_rate=1000):
+    for i in range(first, first + count):
+        block = np.full((blocksize, 1), i, dtype=np.float32)
+        preroll._on_block(block, start_time + i * blocksize / sample_rate)
+
+
+def test_history_keeps_latest_seconds():
+    """Only the most recent pre-roll seconds are remembered"""
+    print("Testing pre-roll history...")
+    preroll = PreRollCapture(0.5, sample_rate=1000, blocksize=100)
+    _feed(preroll, 0, 12)
+    assert preroll.buffered_seconds == 0.5
+    assert preroll.engine.overruns == 0
+
+    sink = ListSink()
+    assert preroll.attach(sink) == 500
+    assert [b[0] for b in sink.blocks] == [7, 8, 9, 10, 11]
+    preroll.stop()
+    print("✅ Last 0.5 s kept")
+
+
+def test_take_starts_before_trigger():
+    """A take gets the pre-roll, then exactly max_frames of live audio"""
+    print("\nTesting take with pre-roll...")
+    with tempfile.TemporaryDirectory() as tmp:
+        clock = MonotonicClock()
+        clock.origin = 10.0
+        sync_index = SyncIndex(os.path.join(tmp, "take.sync.jsonl"), clock)
+        preroll = PreRollCapture(0.3, sample_rate=1000, blocksize=100)
+        _feed(preroll, 0, 10)
+
+        sink = ListSink()
+        preroll.attach(sink, sync_index, max_frames=250)
+        assert not preroll.wait(timeout=0)
+        _feed(preroll, 10, 5)
+        assert preroll.wait(timeout=0)
+        sync_index.close()
+
+        # 3 pre-roll blocks, 2 full live blocks and half of the third
+        assert sink.blocks == [(7, 100), (8, 100), (9, 100), (10, 100), (11, 100), (12, 50)]
+        assert sink.frames_written == 550 and preroll.preroll_frames == 300
+
+        # Pre-roll blocks keep their capture times, before the trigger
+        _, audio, _, _ = load_sync_index(sync_index.filepath)
+        assert [block["frame"] for block in audio][:4] == [0, 100, 200, 300]
+        assert audio[0]["t"] == -9.3
+
+        # Later blocks refill the pre-roll for the next take
+        _feed(preroll, 15, 2)
+        assert len(sink.blocks) == 6
+        assert preroll.buffered_seconds == 0.3
+        assert int(preroll.history.peek(timeout=0)[0, 0]) == 14
+    print("✅ Take starts 0.3 s before the trigger")
+
+
+def test_stop_ends_take_early():
+    """stop() detaches the take at once"""
+    print("\nTesting early stop...")
+    preroll = PreRollCapture(1.0, sample_rate=1000, blocksize=100)
+    sink = ListSink()
+    assert preroll.attach(sink, max_frames=10000) == 0
+    _feed(preroll, 0, 3)
+    preroll.stop()
+    assert preroll.wait(timeout=0)
+    _feed(preroll, 3, 2)
+    assert sink.frames_written == 300
+    print("✅ Take ended by stop()")
+
+
+def test_concurrent_arm_opens_one_stream():
+    """Threads arming the recorder at once share one pre-roll stream"""
+    print("\nTesting concurrent arming...")
+    with tempfile.TemporaryDirectory() as tmp, fake_audio() as device:
+        opened = []
+        open_stream = device.InputStream
+
+        def slow_open(**kwargs):
+            time.sleep(0.05)  # Widen the window between check and open
+            opened.append(kwargs)
+            return open_stream(**kwargs)
+
+        device.InputStream = slow_open
+        recorder = Recorder(RecorderConfig(output_dir=tmp, enable_video=False,
+                                           sample_rate=16000, preroll_seconds=0.5))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(recorder.arm()))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        recorder.close()
+        assert results == [True] * 4 and len(opened) == 1, (results, len(opened))
+    print("✅ One pre-roll stream for four callers")
+
+
+def main():
+    """Run all pre-roll tests"""
+    tests = [test_history_keeps_latest_seconds, test_take_starts_before_trigger,
+             test_stop_ends_take_early, test_concurrent_arm_opens_one_stream]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All pre-roll tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the UI-independent recording engine.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_startup import HEAVY_MODULES, measure_import
+from recorder import Recorder, RecorderConfig, sanitize_filename
+
+
+def test_sanitize_filename():
+    """Names are made safe for every platform's filesystem"""
+    print("Testing filename sanitization...")
+    assert sanitize_filename('a<b>:c"d|e?f*g\\h/i') == "a_b__c_d_e_f_g_h_i"
+    assert sanitize_filename(" .name. ") == "name"
+    assert sanitize_filename("...") == "recording"
+    assert sanitize_filename("con") == "user_con"
+    print("✅ Filenames sanitized")
+
+
+def test_prepare_take_unique_names():
+    """Takes started within the same second get distinct filenames"""
+    print("\nTesting take naming...")
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = Recorder(RecorderConfig(output_dir=tmp, enable_video=False,
+                                           audio_codec="wav"))
+        first = recorder.prepare_take("alice")
+        second = recorder.prepare_take("alice")
+        try:
+            assert first.basename.startswith("alice_")
+            assert second.basename != first.basename
+            assert os.path.exists(first.sync_path)
+            assert os.path.exists(second.sync_path)
+            assert first.audio_path == os.path.join(tmp, first.basename + ".wav")
+            assert first.audio_codec == "wav"
+        finally:
+            first.sync_index.close()
+            second.sync_index.close()
+    print(f"✅ Second take named {second.basename}")
+
+
+def test_headless_import_skips_gui():
+    """The CLI entry point must not load tkinter or any media backend"""
+    print("\nTesting headless imports...")
+    timings = measure_import("recorder")
+    loaded = [name for name in timings if name.split(".")[0] in ("tkinter",) + HEAVY_MODULES]
+    assert not loaded, f"unexpected imports: {loaded}"
+    print("✅ recorder imports without tkinter or media backends")
+
+
+def main():
+    """Run all recorder tests"""
+    tests = [test_sanitize_filename, test_prepare_take_unique_names,
+             test_headless_import_skips_gui]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All recorder tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for segmented recording: gapless audio and video rotation and the
+segment manifest.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from segments import (SegmentManifest, SegmentedSink, SegmentedVideoWriter, load_manifest,
+                      segment_suffix)
+from wav_writer import WavStreamWriter
+
+RATE = 8000
+
+
+def _ramp(frames, start=0):
+    return ((np.arange(start, start + frames) % 30000) / 32768).astype(np.float32).reshape(-1, 1)
+
+
+def _open_wav(tmp):
+    def open_segment(index):
+        return WavStreamWriter(os.path.join(tmp, "take" + segment_suffix(index, ".wav")),
+                               RATE, channels=1)
+    return open_segment
+
+
+def _read_wav(path):
+    with open(path, 'rb') as f:
+        return np.frombuffer(f.read()[44:], dtype=np.int16)
+
+
+def test_time_segments_are_gapless():
+    """Blocks are split at the exact boundary; concatenation is the take"""
+    print("Testing time-based rotation...")
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = SegmentManifest(os.path.join(tmp, "take.segments.jsonl"), datetime.now())
+        sink = SegmentedSink(_open_wav(tmp), RATE, manifest, segment_seconds=1.0)
+        total = int(3.5 * RATE)
+        for start in range(0, total, 700):  # Blocks straddle the boundaries
+            sink(_ramp(min(700, total - start), start))
+        sink.close()
+        manifest.close()
+
+        assert sink.frames_written == total
+        paths = [os.path.join(tmp, "take" + segment_suffix(i, ".wav")) for i in range(1, 5)]
+        lengths = [len(_read_wav(p)) for p in paths]
+        assert lengths == [RATE, RATE, RATE, RATE // 2], lengths
+        joined = np.concatenate([_read_wav(p) for p in paths])
+        expected = np.round(_ramp(total)[:, 0] * 32767).astype(np.int16)
+        assert np.abs(joined.astype(int) - expected).max() <= 1
+
+        _, segments = load_manifest(manifest.filepath)
+        assert [s["start"] for s in segments] == [0.0, 1.0, 2.0, 3.0]
+        assert [s["frames"] for s in segments] == lengths
+        assert segments[3]["file"] == "take_part004.wav"
+    print(f"✅ {total / RATE} s split into {len(lengths)} gapless segments")
+
+
+def test_size_limit_rotates():
+    """Files rotate once they reach the size limit"""
+    print("\nTesting size-based rotation...")
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = SegmentManifest(os.path.join(tmp, "take.segments.jsonl"), datetime.now())
+        sink = SegmentedSink(_open_wav(tmp), RATE, manifest, segment_bytes=4000)
+        for start in range(0, 10000, 500):
+            sink(_ramp(500, start))
+        sink.close()
+        manifest.close()
+
+        _, segments = load_manifest(manifest.filepath)
+        assert all(s["bytes"] <= 4000 + 44 for s in segments), segments
+        assert sum(s["frames"] for s in segments) == 10000
+        assert segments[1]["start_frame"] == segments[0]["frames"]
+    print(f"✅ {len(segments)} segments of at most 4000 bytes of audio")
+
+
+def test_video_segments_follow_frame_grid():
+    """Video rotates every segment_seconds * fps frames"""
+    print("\nTesting video rotation...")
+
+    class Writer:
+        def __init__(self):
+            self.frames = []
+            self.released = False
+
+        def write(self, frame):
+            self.frames.append(frame)
+
+        def release(self):
+            self.released = True
+
+    writers = []
+
+    def open_segment(index):
+        writers.append(Writer())
+        return writers[-1], f"take{segment_suffix(index, '.mp4')}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = SegmentManifest(os.path.join(tmp, "take.segments.jsonl"), datetime.now())
+        video = SegmentedVideoWriter(open_segment, 10, manifest, segment_seconds=2.0)
+        for frame in range(45):
+            video.write_timed(frame, timestamp=None, deadline=None)
+        video.release()
+        manifest.close()
+        _, segments = load_manifest(manifest.filepath)
+
+    assert [len(w.frames) for w in writers] == [20, 20, 5]
+    assert all(w.released for w in writers)
+    assert writers[1].frames[0] == 20
+    assert [s["start"] for s in segments] == [0.0, 2.0, 4.0]
+    print("✅ Video segments aligned with audio segments")
+
+
+def test_rotation_does_not_wait_for_close():
+    """A slow encoder flush runs in the background, not on the writer's thread"""
+    print("\nTesting background segment close...")
+
+    class SlowCloseSink(WavStreamWriter):
+        def close(self):
+            time.sleep(0.3)  # An encoder flushing its last frames
+            super().close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def open_segment(index):
+            return SlowCloseSink(os.path.join(tmp, "take" + segment_suffix(index, ".wav")),
+                                 RATE, channels=1)
+
+        manifest = SegmentManifest(os.path.join(tmp, "take.segments.jsonl"), datetime.now())
+        sink = SegmentedSink(open_segment, RATE, manifest, segment_seconds=0.5)
+        start = time.perf_counter()
+        for block in range(8):
+            sink(_ramp(RATE // 4, block * RATE // 4))  # Three rotations
+        blocked = time.perf_counter() - start
+        sink.close()
+        manifest.close()
+
+        assert blocked < 0.3, f"writer blocked for {blocked:.2f} s"
+        _, segments = load_manifest(manifest.filepath)
+        assert [s.get("frames") for s in segments] == [RATE // 2] * 4
+        assert all(len(_read_wav(os.path.join(tmp, s["file"]))) == RATE // 2 for s in segments)
+    print(f"✅ Three rotations took {blocked * 1000:.0f} ms on the writer's thread")
+
+
+def main():
+    """Run all segmenting tests"""
+    tests = [test_time_segments_are_gapless, test_size_limit_rotates,
+             test_video_segments_follow_frame_grid, test_rotation_does_not_wait_for_close]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All segmenting tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Guard against heavy media backends being imported at startup.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_startup import HEAVY_MODULES, run_benchmark
+
+
+def test_no_heavy_imports_at_startup():
+    """Importing the app must not load any heavy media backend"""
+    print("Testing startup imports...")
+    median_ms, heavy = run_benchmark("audio_recorder", runs=1)
+    assert not heavy, f"heavy backends imported at startup: {heavy}"
+    print(f"✅ audio_recorder imports in {median_ms:.1f} ms without {', '.join(HEAVY_MODULES)}")
+
+
+def main():
+    """Run the startup import test"""
+    try:
+        test_no_heavy_imports_at_startup()
+    except AssertionError as e:
+        print(f"❌ test_no_heavy_imports_at_startup failed: {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
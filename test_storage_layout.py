@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the sharded storage layouts and the resharding tool.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from catalog import CATALOG_NAME, RecordingCatalog
+from fake_backends import ToneSource, fake_audio
+from recorder import Recorder, RecorderConfig
+from storage_layout import migrate, shard_dir, split_basename, take_files
+
+
+def test_shard_dirs():
+    """Every layout maps a base filename to one directory"""
+    print("Testing shard directories...")
+    basename = "alice_20240501_093000_2"
+    safe_name, started = split_basename(basename)
+    assert safe_name == "alice" and started.hour == 9
+    assert split_basename("no_time_here") == ("no_time_here", None)
+    assert shard_dir("flat", basename) == ""
+    assert shard_dir("date", basename) == os.path.join("2024", "05", "01")
+    assert shard_dir("date", "odd") == "undated"
+    hashed = shard_dir("hash", basename)
+    assert hashed == shard_dir("hash", basename) and len(hashed) == 5
+    assert take_files(["a_1.wav", "a_1.sync.jsonl", "a_1_part002.flac", "a_1_2.wav"],
+                      "a_1") == ["a_1.wav", "a_1.sync.jsonl", "a_1_part002.flac"]
+    try:
+        shard_dir("weekly", basename)
+        assert False, "unknown layout accepted"
+    except ValueError:
+        pass
+    print(f"✅ {basename} -> {hashed}")
+
+
+def test_recorder_writes_into_shards():
+    """All files of a take land in its shard, and the catalog knows where"""
+    print("\nTesting sharded recording...")
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=10):
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=0.5, storage_layout="date")
+        recorder = Recorder(config)
+        take = recorder.record("erin")
+        recorder.close()
+        expected = os.path.join(tmp, shard_dir("date", take.basename))
+        assert take.directory == expected
+        assert all(os.path.dirname(p) == expected for p in take.output_files)
+        with RecordingCatalog(os.path.join(tmp, CATALOG_NAME)) as catalog:
+            paths = [entry["path"] for entry in catalog.get(take.basename)["files"]]
+            assert all(p.startswith(shard_dir("date", take.basename).replace(os.sep, "/"))
+                       for p in paths), paths
+            assert catalog.verify() == []
+    print(f"✅ Take written to {os.path.relpath(expected, tmp)}")
+
+
+def test_crashed_take_in_another_shard_is_recovered():
+    """Partial files in any shard are recovered when the next session starts"""
+    print("\nTesting recovery across shards...")
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=10):
+        crashed = "ghost_20240101_120000"
+        shard = os.path.join(tmp, shard_dir("date", crashed))
+        os.makedirs(shard)
+        with open(os.path.join(shard, crashed + ".flac.part"), 'wb') as f:
+            f.write(b"fLaC")
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=0.2, storage_layout="date")
+        recorder = Recorder(config)
+        take = recorder.record("gina")
+        recorder.close()
+        assert take.directory != shard
+        assert os.path.exists(os.path.join(shard, crashed + ".flac"))
+        assert not os.path.exists(os.path.join(shard, crashed + ".flac.part"))
+    print("✅ Crashed take in an older shard recovered")
+
+
+def test_migrate_reshards_in_parallel():
+    """A flat directory is resharded and back, keeping the catalog right"""
+    print("\nTesting migration...")
+    with tempfile.TemporaryDirectory() as tmp, fake_audio(ToneSource(), speed=20):
+        config = RecorderConfig(output_dir=tmp, enable_video=False, audio_codec="wav",
+                                sample_rate=16000, duration=0.2)
+        recorder = Recorder(config)
+        takes = [recorder.record(f"p{i % 3}") for i in range(6)]
+        recorder.close()
+        files = sum(len(take.output_files) for take in takes)
+        # A take still being written is left alone
+        with open(os.path.join(tmp, "busy_20240101_000000.wav.part"), 'wb'):
+            pass
+        open(os.path.join(tmp, "busy_20240101_000000.sync.jsonl"), 'w').close()
+
+        assert len(migrate(tmp, "hash", dry_run=True).moved) == 6
+        assert len(os.listdir(tmp)) == files + 3  # Nothing moved yet, plus catalog
+
+        with RecordingCatalog(os.path.join(tmp, CATALOG_NAME)) as catalog:
+            result = migrate(tmp, "hash", workers=4, catalog=catalog)
+            assert len(result.moved) == 6 and result.files == files, str(result)
+            assert result.skipped == [("busy_20240101_000000", "unfinished .part files")]
+            for take in takes:
+                shard = os.path.join(tmp, shard_dir("hash", take.basename))
+                assert os.path.exists(os.path.join(shard, os.path.basename(take.audio_path)))
+            assert catalog.verify() == []
+            assert migrate(tmp, "hash", catalog=catalog).in_place == 6
+
+            result = migrate(tmp, "flat", workers=4, catalog=catalog)
+            assert len(result.moved) == 6 and catalog.verify() == []
+            # Shard directories emptied by the move are removed
+            assert not any(os.path.isdir(os.path.join(tmp, name)) for name in os.listdir(tmp))
+    print(f"✅ {files} files resharded and restored")
+
+
+def main():
+    """Run all storage layout tests"""
+    tests = [test_shard_dirs, test_recorder_writes_into_shards,
+             test_crashed_take_in_another_shard_is_recovered, test_migrate_reshards_in_parallel]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All storage layout tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
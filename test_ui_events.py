@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the worker-to-Tk UI event channel.
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from ui_events import TkEventPump, UIEventChannel
+
+
+class ManualRoot:
+    """Minimal stand-in for tk.Tk that runs after() callbacks on demand"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.scheduled[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def run_pending(self):
+        pending, self.scheduled = self.scheduled, {}
+        for callback in pending.values():
+            callback()
+
+
+def test_state_updates_are_coalesced():
+    """Only the newest status/progress survives, other events keep their order"""
+    print("Testing coalescing...")
+    channel = UIEventChannel()
+    channel.post("status", text="one")
+    for i in range(100):
+        channel.post("progress", elapsed=i / 10, duration=10)
+    channel.post("saved", take="take")
+    channel.post("status", text="two")
+    channel.post("finished")
+
+    events = channel.drain()
+    assert [e for e, _ in events] == ["progress", "saved", "status", "finished"]
+    assert events[0][1]["elapsed"] == 9.9
+    assert events[2][1]["text"] == "two"
+    assert channel.drain() == []
+    print(f"✅ {channel.posted} posted updates delivered as {channel.delivered}")
+
+
+def test_concurrent_posts_are_not_lost():
+    """Posting from several threads while draining loses nothing"""
+    print("\nTesting concurrent posting...")
+    channel = UIEventChannel(coalesced=())
+    per_thread = 5000
+
+    def worker(n):
+        for i in range(per_thread):
+            channel.post("tick", worker=n, i=i)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    received = []
+    while any(thread.is_alive() for thread in threads) or len(channel):
+        received.extend(channel.drain())
+    for thread in threads:
+        thread.join()
+    received.extend(channel.drain())
+
+    assert len(received) == 4 * per_thread
+    for n in range(4):
+        order = [d["i"] for e, d in received if d["worker"] == n]
+        assert order == list(range(per_thread))
+    print(f"✅ {len(received)} events received in per-thread order")
+
+
+def test_pump_applies_events_on_schedule():
+    """The pump drains the channel on each tick and keeps rescheduling"""
+    print("\nTesting Tk event pump...")
+    root = ManualRoot()
+    channel = UIEventChannel()
+    applied = []
+
+    def handler(event, data):
+        if event == "bad":
+            raise ValueError("boom")
+        applied.append((event, data))
+
+    pump = TkEventPump(root, channel, handler, refresh_ms=10)
+    pump.start()
+    channel.post("status", text="a")
+    channel.post("bad")
+    channel.post("status", text="b")
+    root.run_pending()
+    assert applied == [("status", {"text": "b"})]
+    assert len(root.scheduled) == 1
+
+    pump.stop()
+    assert not root.scheduled
+    print("✅ Events applied on the Tk thread tick")
+
+
+def main():
+    """Run all UI event tests"""
+    tests = [test_state_updates_are_coalesced, test_concurrent_posts_are_not_lost,
+             test_pump_applies_events_on_schedule]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All UI event tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
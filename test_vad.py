@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for voice activity detection and silence trimming on synthetic
+audio: tone bursts stand in for voiced speech.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from av_sync import MonotonicClock, SyncIndex, load_sync_index
+from vad import EnergyVAD, SilenceTrimmer, SpeechOnsetDetector
+
+RATE = 16000
+BLOCK = 320
+
+
+def _speech(seconds, level=0.3):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (level * np.sin(2 * np.pi * 200 * t)).astype(np.float32).reshape(-1, 1)
+
+
+def _noise(seconds, level=0.001, seed=0):
+    rng = np.random.default_rng(seed)
+    return (level * rng.standard_normal((int(seconds * RATE), 1))).astype(np.float32)
+
+
+def _blocks(audio):
+    for start in range(0, len(audio), BLOCK):
+        yield audio[start:start + BLOCK]
+
+
+class ListSink:
+    """Sink that keeps everything it receives"""
+
+    def __init__(self):
+        self.blocks = []
+        self.frames_written = 0
+        self.closed = False
+
+    def __call__(self, block):
+        self.blocks.append(block.copy())
+        self.frames_written += len(block)
+
+    def close(self):
+        self.closed = True
+
+
+def test_vad_classifies_blocks():
+    """Tones are speech; quiet noise and hiss at the threshold are not"""
+    print("Testing VAD classification...")
+    vad = EnergyVAD(threshold_db=-45.0)
+    assert vad.is_speech(_speech(0.02))
+    assert vad.zcr < 0.05
+    assert not vad.is_speech(_noise(0.02))
+    # White noise 5 dB over the threshold has a high ZCR: not speech
+    assert not vad.is_speech(_noise(0.02, level=10 ** (-40 / 20)))
+    assert vad.zcr > 0.25
+    assert not vad.is_speech(np.zeros((BLOCK, 1), dtype=np.float32))
+    assert vad.is_speech((_speech(0.02) * 32767).astype(np.int16))
+    print("✅ Speech and noise told apart")
+
+
+def test_noise_floor_adapts():
+    """A steady noise source is eventually treated as silence"""
+    print("\nTesting noise floor tracking...")
+    vad = EnergyVAD(threshold_db=-45.0)
+    hum = _speech(30, level=0.02)  # -37 dBFS, loud enough to count at first
+    decisions = [vad.is_speech(block) for block in _blocks(hum)]
+    assert decisions[0] and not decisions[-1]
+    assert vad.is_speech(_speech(0.02, level=0.3))
+    print(f"✅ Noise floor settled at {vad.noise_floor_db:.1f} dBFS")
+
+
+def test_trimmer_drops_silence_around_speech():
+    """Only padding is kept before and after the speech; pauses stay"""
+    print("\nTesting silence trimming...")
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_index = SyncIndex(os.path.join(tmp, "take.sync.jsonl"), MonotonicClock())
+        sync_index.add_audio_block(0, BLOCK, sync_index.clock.origin)
+        stopped = []
+        sink = ListSink()
+        trimmer = SilenceTrimmer(sink, EnergyVAD(), RATE, BLOCK, padding=0.1,
+                                 stop_after=0.5, on_silence=lambda: stopped.append(True),
+                                 sync_index=sync_index)
+        audio = np.concatenate([_noise(1.0), _speech(0.5), _noise(0.3, seed=1),
+                                _speech(0.5), _noise(0.4, seed=2)])
+        for block in _blocks(audio):
+            trimmer(block)
+        assert not stopped
+        for block in _blocks(_noise(0.2, seed=3)):
+            trimmer(block)
+        assert stopped == [True]
+        trimmer.close()
+        sync_index.close()
+
+        written = np.concatenate(sink.blocks)
+        assert sink.closed
+        assert len(written) == int(1.5 * RATE)  # padding + speech + pause + speech + padding
+        assert trimmer.leading_frames == int(0.9 * RATE)
+        assert trimmer.trailing_frames == int(0.5 * RATE)
+        assert np.array_equal(written[int(0.1 * RATE):int(0.6 * RATE)], _speech(0.5))
+
+        _, _, _, summary = load_sync_index(sync_index.filepath)
+        assert summary["audio_start"] == 0.9
+    print(f"✅ {len(audio) / RATE + 0.2:.1f} s take trimmed to {len(written) / RATE:.1f} s")
+
+
+def test_trimmer_keeps_nothing_without_speech():
+    """A take without speech produces an empty file"""
+    print("\nTesting silent take...")
+    sink = ListSink()
+    trimmer = SilenceTrimmer(sink, EnergyVAD(), RATE, BLOCK, padding=0.1)
+    for block in _blocks(_noise(2.0)):
+        trimmer(block)
+    trimmer.close()
+    assert sink.frames_written == 0 and not trimmer.heard_speech
+    assert trimmer.leading_frames == 2 * RATE
+    print("✅ Silent take left empty")
+
+
+def test_onset_ignores_clicks():
+    """A single loud block does not start a take, sustained speech does"""
+    print("\nTesting speech onset...")
+    detector = SpeechOnsetDetector(EnergyVAD(), RATE, min_speech=0.1)
+    detector(_speech(0.02))
+    for block in _blocks(_noise(0.2)):
+        detector(block)
+    assert not detector.detected.is_set()
+    for block in _blocks(_speech(0.1)):
+        detector(block)
+    assert detector.detected.is_set()
+    print("✅ Onset detected after 0.1 s of speech")
+
+
+def main():
+    """Run all VAD tests"""
+    tests = [test_vad_classifies_blocks, test_noise_floor_adapts,
+             test_trimmer_drops_silence_around_speech, test_trimmer_keeps_nothing_without_speech,
+             test_onset_ignores_clicks]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All VAD tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for the webcam capture/encode pipeline using an in-memory camera
+and writer, so no webcam is required.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from video_pipeline import FramePacer, FramePipeline
+
+
+class CountingCamera:
+    """Minimal stand-in for cv2.VideoCapture producing numbered frames"""
+
+    def __init__(self, fail_after=None, interval=0.0):
+        self.count = 0
+        self.fail_after = fail_after
+        self.interval = interval
+
+    def grab(self):
+        if self.fail_after is not None and self.count >= self.fail_after:
+            return False
+        time.sleep(self.interval)
+        self.count += 1
+        return True
+
+    def retrieve(self):
+        return True, np.full((4, 4, 3), self.count % 256, dtype=np.uint8)
+
+
+class ListWriter:
+    """Minimal stand-in for cv2.VideoWriter that stores frames"""
+
+    def __init__(self, delay=0.0):
+        self.frames = []
+        self.delay = delay
+
+    def write(self, frame):
+        time.sleep(self.delay)
+        self.frames.append(int(frame[0, 0, 0]))
+
+
+def test_pacer_deadlines():
+    """The pacer owes one frame per elapsed slot"""
+    print("Testing frame pacer deadlines...")
+    pacer = FramePacer(fps=10)
+    pacer.start(start_time=100.0)
+
+    assert pacer.owed(99.0) == 0
+    assert pacer.owed(100.0) == 1
+    pacer.advance()
+    assert pacer.owed(100.05) == 0   # Slot 0 already filled: skip
+    assert pacer.owed(100.35) == 3   # Slots 1-3 due: two of them are gaps
+    pacer.advance(3)
+    assert pacer.owed(100.39) == 0
+    assert abs(pacer.deadline(4) - 100.4) < 1e-9
+    print("✅ Pacer deadlines are correct")
+
+
+def test_pipeline_writes_all_frames():
+    """The pipeline writes exactly max_frames frames in capture order"""
+    print("\nTesting frame pipeline ordering...")
+    writer = ListWriter()
+    pipeline = FramePipeline(CountingCamera(interval=0.002), writer, fps=100, max_frames=20)
+    pipeline.start()
+    assert pipeline.wait(timeout=5)
+    pipeline.stop()
+
+    assert pipeline.frames_written == 20
+    assert pipeline.dropped_frames == 0
+    assert writer.frames == sorted(writer.frames)
+    assert pipeline.capture_fps > 100
+    print(f"✅ Frames encoded in order (camera at {pipeline.capture_fps:.0f} fps)")
+
+
+def test_pipeline_duplicates_slow_camera():
+    """A camera slower than the target rate is padded to constant fps"""
+    print("\nTesting slow camera padding...")
+    writer = ListWriter()
+    pipeline = FramePipeline(CountingCamera(interval=0.03), writer, fps=100, max_frames=30)
+    start = time.perf_counter()
+    pipeline.start()
+    assert pipeline.wait(timeout=5)
+    pipeline.stop()
+    elapsed = time.perf_counter() - start
+
+    assert pipeline.frames_written == 30
+    assert pipeline.duplicated_frames > 0
+    # 30 frames at 100 fps take 0.3 s of wall-clock time, not 30 camera reads
+    assert elapsed < 0.6
+    print(f"✅ {pipeline.duplicated_frames} frames duplicated to hold the frame rate")
+
+
+def test_pipeline_counts_dropped_frames():
+    """A slow encoder causes drops instead of delaying capture, and the
+    dropped slots are filled with repeats to keep the frame rate"""
+    print("\nTesting dropped frame accounting...")
+    writer = ListWriter(delay=0.02)
+    pipeline = FramePipeline(CountingCamera(interval=0.001), writer, fps=500,
+                             queue_size=2, max_frames=30)
+    pipeline.start()
+    assert pipeline.wait(timeout=5)
+    pipeline.stop()
+
+    assert pipeline.dropped_frames > 0
+    assert pipeline.frames_written == len(writer.frames) == 30
+    assert pipeline.duplicated_frames >= pipeline.dropped_frames
+    assert writer.frames == sorted(writer.frames)
+    print(f"✅ {pipeline.dropped_frames} dropped frames counted and repeated")
+
+
+def test_pipeline_reports_encoder_error():
+    """An encoder failure is kept on the pipeline without blocking capture"""
+    print("\nTesting encoder failure...")
+
+    class FailingWriter(ListWriter):
+        def write(self, frame):
+            if len(self.frames) == 3:
+                raise OSError("disk full")
+            super().write(frame)
+
+    pipeline = FramePipeline(CountingCamera(interval=0.001), FailingWriter(), fps=200,
+                             queue_size=2, max_frames=20)
+    pipeline.start()
+    assert pipeline.wait(timeout=5)
+    pipeline.stop()
+
+    assert isinstance(pipeline.error, OSError)
+    assert pipeline.frames_written == 3
+    print("✅ Encoder error reported")
+
+
+def test_pipeline_stops_on_read_failure():
+    """A camera read failure ends the capture thread cleanly"""
+    print("\nTesting read failure handling...")
+    pipeline = FramePipeline(CountingCamera(fail_after=5, interval=0.01), ListWriter(), fps=100)
+    pipeline.start()
+    assert pipeline.wait(timeout=5)
+    pipeline.stop()
+
+    assert pipeline.read_failures == 1
+    assert pipeline.frames_captured == 5
+    print("✅ Read failure handled")
+
+
+def main():
+    """Run all video pipeline tests"""
+    tests = [test_pacer_deadlines, test_pipeline_writes_all_frames,
+             test_pipeline_duplicates_slow_camera, test_pipeline_counts_dropped_frames,
+             test_pipeline_reports_encoder_error, test_pipeline_stops_on_read_failure]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"⚠️  {failed} test(s) failed.")
+    else:
+        print("✅ All video pipeline tests passed!")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
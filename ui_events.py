@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Event channel from recording threads to the Tk main loop.
+
+Tk is not thread-safe, so worker threads never touch widgets. They post
+(event, data) pairs onto a UIEventChannel, which is a plain deque: append()
+and popleft() are atomic, so posting never takes a lock or waits on the UI.
+The main loop drains the channel at a fixed refresh rate with root.after and
+applies the events. Events that only describe current state (status text,
+countdown, progress, input level) are coalesced so only the newest of each
+kind reaches Tk; all other events are delivered in order.
+"""
+
+from collections import deque
+
+# Events where only the most recent value matters
+COALESCED_EVENTS = ("status", "countdown", "progress", "level")
+
+# Default refresh rate of the UI drain loop
+DEFAULT_REFRESH_MS = 50
+
+
+class UIEventChannel:
+    """Lock-free queue of UI updates posted from any thread"""
+
+    def __init__(self, coalesced=COALESCED_EVENTS):
+        self.coalesced = frozenset(coalesced)
+        self._events = deque()
+        self.posted = 0
+        self.delivered = 0
+
+    def post(self, event, **data):
+        """Queue an update; safe to call from any thread"""
+        self._events.append((event, data))
+        self.posted += 1
+
+    def __call__(self, event, data):
+        """Listener signature used by recorder.Recorder"""
+        self.post(event, **data)
+
+    def __len__(self):
+        return len(self._events)
+
+    def drain(self):
+        """Take every queued event, dropping superseded state updates.
+
+        Returns a list of (event, data) in posting order, where each
+        coalesced event kind appears at most once, at the position of its
+        newest update.
+        """
+        pending = []
+        while True:
+            try:
+                pending.append(self._events.popleft())
+            except IndexError:
+                break
+
+        latest = {}
+        for i, (event, _) in enumerate(pending):
+            if event in self.coalesced:
+                latest[event] = i
+        events = [item for i, item in enumerate(pending)
+                  if item[0] not in self.coalesced or latest[item[0]] == i]
+        self.delivered += len(events)
+        return events
+
+
+class TkEventPump:
+    """Apply UIEventChannel events on the Tk thread at a fixed rate"""
+
+    def __init__(self, root, channel, handler, refresh_ms=DEFAULT_REFRESH_MS):
+        self.root = root
+        self.channel = channel
+        self.handler = handler
+        self.refresh_ms = refresh_ms
+        self._after_id = None
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.refresh_ms, self._pump)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _pump(self):
+        try:
+            for event, data in self.channel.drain():
+                try:
+                    self.handler(event, data)
+                except Exception as e:
+                    print(f"Warning: UI update {event!r} failed: {e}")
+        finally:
+            self._after_id = self.root.after(self.refresh_ms, self._pump)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Voice activity detection and silence trimming.
+
+EnergyVAD classifies each streaming audio block as speech or silence from
+two cheap NumPy features:
+
+    level  RMS level in dBFS
+    ZCR    zero-crossing rate (crossings per sample) of the first channel
+
+A block is speech if its level is above the threshold, which is the larger
+of threshold_db and the tracked noise floor plus margin_db. Blocks with a
+high ZCR (hiss, fans, broadband noise) must be margin_db louder still to
+count, so noise hovering at the threshold does not trigger a take while
+loud fricatives do. The noise floor follows quiet blocks quickly and loud
+ones slowly, so a noise source that stays on is eventually treated as
+silence.
+
+SpeechOnsetDetector watches blocks until speech starts, to trigger takes.
+SilenceTrimmer is a capture sink wrapper that uses the VAD to drop leading
+and trailing silence before it reaches the file (keeping ``padding``
+seconds around the speech) and to end a take after ``stop_after`` seconds
+of silence.
+"""
+
+import threading
+
+import numpy as np
+
+from audio_capture import BlockRingBuffer
+
+# Noise floor smoothing per block: falling levels are followed quickly,
+# rising levels slowly (about 10 s to adapt with 1024-frame blocks)
+_FLOOR_FALL = 0.5
+_FLOOR_RISE = 0.002
+_SILENCE_DB = -120.0
+
+
+class EnergyVAD:
+    """Classify audio blocks as speech or silence"""
+
+    def __init__(self, threshold_db=-45.0, margin_db=10.0, max_zcr=0.25):
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.max_zcr = max_zcr
+        self.noise_floor_db = threshold_db - margin_db
+        # Features of the last block, for meters and logs
+        self.level_db = _SILENCE_DB
+        self.zcr = 0.0
+        self._signs = np.empty(0, dtype=bool)
+        self._crossings = np.empty(0, dtype=bool)
+        self._scales = {}
+
+    @property
+    def current_threshold_db(self):
+        return max(self.threshold_db, self.noise_floor_db + self.margin_db)
+
+    def _features(self, block):
+        """Set level_db and zcr for a (frames, channels) block"""
+        frames = len(block)
+        if frames < 2:
+            return
+        flat = block.reshape(-1)
+        scale = self._scales.get(flat.dtype)
+        if scale is None:
+            # Integer capture dtypes are measured against their full scale
+            scale = self._scales[flat.dtype] = \
+                float(2 ** (8 * flat.dtype.itemsize - 1)) if flat.dtype.kind == 'i' else 1.0
+        if flat.dtype.kind == 'f':
+            power = float(np.dot(flat, flat)) / flat.size
+        else:
+            power = float(np.dot(flat, flat.astype(np.float64))) / flat.size / scale ** 2
+        self.level_db = 10.0 * np.log10(power) if power > 0 else _SILENCE_DB
+
+        if self._signs.size < frames:
+            self._signs = np.empty(frames, dtype=bool)
+            self._crossings = np.empty(frames, dtype=bool)
+        signs = self._signs[:frames]
+        crossings = self._crossings[:frames - 1]
+        np.signbit(block[:, 0], out=signs)
+        np.not_equal(signs[1:], signs[:-1], out=crossings)
+        self.zcr = np.count_nonzero(crossings) / (frames - 1)
+
+    def is_speech(self, block):
+        """Classify a block and update the noise floor"""
+        self._features(block)
+        threshold = self.current_threshold_db
+        if self.zcr > self.max_zcr:
+            threshold += self.margin_db
+        speech = self.level_db >= threshold
+
+        rate = _FLOOR_FALL if self.level_db < self.noise_floor_db else _FLOOR_RISE
+        self.noise_floor_db += rate * (self.level_db - self.noise_floor_db)
+        return speech
+
+
+class SilenceTrimmer:
+    """Sink wrapper that drops silence before and after the speech.
+
+    Silent blocks are held back in a preallocated ring until it is known
+    whether speech follows. Leading silence older than padding is dropped;
+    pauses between words are written once speech resumes (or once the
+    hold ring is full, for very long pauses); on close() trailing silence
+    beyond padding is dropped. If sync_index is given, the trimmed frames
+    are recorded there so the A/V offset refers to the file's first sample.
+
+    on_silence, if given, is called once from the capture thread when
+    stop_after seconds of silence follow the speech.
+    """
+
+    def __init__(self, sink, vad, sample_rate, blocksize, channels=1, dtype='float32',
+                 padding=0.3, stop_after=None, hold_seconds=10.0, on_silence=None,
+                 sync_index=None):
+        self.sink = sink
+        self.filepath = getattr(sink, "filepath", None)
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.padding_frames = int(padding * sample_rate)
+        self.stop_after_frames = None if stop_after is None else int(stop_after * sample_rate)
+        self.on_silence = on_silence
+        self.sync_index = sync_index
+
+        hold = max(hold_seconds, padding, stop_after or 0.0)
+        capacity = max(1, int(np.ceil(hold * sample_rate / blocksize)))
+        self.held = BlockRingBuffer(capacity, blocksize, channels, dtype=np.dtype(dtype))
+        self.held_frames = 0
+        self.heard_speech = False
+        self.speech_frames = 0
+        self.silence_frames = 0  # current run of silence
+        self.leading_frames = 0
+        self.trailing_frames = 0
+        self._notified = False
+        self._closed = False
+
+    @property
+    def frames_written(self):
+        return self.sink.frames_written
+
+    def _hold(self, block):
+        if len(self.held) >= self.held.capacity:
+            self._pop_oldest(write=self.heard_speech)
+        self.held.push(block)
+        self.held_frames += len(block)
+
+    def _pop_oldest(self, write):
+        block = self.held.peek(timeout=0)
+        if write:
+            self.sink(block)
+        else:
+            self.leading_frames += len(block)
+        self.held_frames -= len(block)
+        self.held.release()
+
+    def __call__(self, block):
+        if self.vad.is_speech(block):
+            if not self.heard_speech:
+                # Keep only padding's worth of the silence before speech
+                while len(self.held) and self.held_frames - \
+                        len(self.held.peek(timeout=0)) >= self.padding_frames:
+                    self._pop_oldest(write=False)
+            while len(self.held):
+                self._pop_oldest(write=True)
+            self.sink(block)
+            self.heard_speech = True
+            self.speech_frames += len(block)
+            self.silence_frames = 0
+            return
+
+        self._hold(block)
+        self.silence_frames += len(block)
+        if not self.heard_speech:
+            return
+        if self.stop_after_frames is not None and not self._notified and \
+                self.silence_frames >= self.stop_after_frames:
+            self._notified = True
+            if self.on_silence is not None:
+                self.on_silence()
+
+    write = __call__
+
+    def close(self):
+        """Drop trailing silence beyond padding and close the sink"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            held_frames = self.held_frames
+            kept = 0
+            while len(self.held):
+                block = self.held.peek(timeout=0)
+                if self.heard_speech and kept < self.padding_frames:
+                    block = block[:self.padding_frames - kept]
+                    self.sink(block)
+                    kept += len(block)
+                self.held.release()
+            self.held_frames = 0
+            if self.heard_speech:
+                self.trailing_frames = held_frames - kept
+            else:
+                # Nothing but silence: keep none of it
+                self.leading_frames += held_frames
+            if self.sync_index is not None and (self.leading_frames or self.trailing_frames):
+                self.sync_index.trim_audio(self.leading_frames, self.trailing_frames,
+                                           self.sample_rate)
+        finally:
+            self.sink.close()
+
+
+class SpeechOnsetDetector:
+    """Block listener that detects the start of speech.
+
+    detected is set once min_speech seconds of consecutive speech blocks
+    were seen, so single clicks and bumps do not count.
+    """
+
+    def __init__(self, vad, sample_rate, min_speech=0.1):
+        self.vad = vad
+        self.min_frames = int(min_speech * sample_rate)
+        self.speech_frames = 0
+        self.detected = threading.Event()
+
+    def __call__(self, block, timestamp=None):
+        if self.vad.is_speech(block):
+            self.speech_frames += len(block)
+            if self.speech_frames >= self.min_frames:
+                self.detected.set()
+        else:
+            self.speech_frames = 0
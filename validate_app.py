@@ -24,7 +24,7 @@ def validate_audio_recorder():
         tree = ast.parse(content)
         
         # Check for required imports
-        required_imports = ['tkinter', 'threading', 'time', 'wave', 'sounddevice', 'numpy', 'os', 'datetime']
+        required_imports = ['tkinter', 'threading', 'time', 'recorder', 'device_probe', 'os']
         found_imports = []
         
         for node in ast.walk(tree):
@@ -64,15 +64,20 @@ def validate_audio_recorder():
         else:
             print("✅ All required methods found")
             
+        # Capture and saving live in the UI-independent recorder engine
+        if os.path.exists("recorder.py"):
+            with open("recorder.py", 'r') as f:
+                content += f.read()
+            
         # Check for key features in content
         required_features = [
             'countdown',
-            'recording_data',
+            'Recorder(',
             'sample_rate',
             'duration = 5',
             'threading.Thread',
-            'sd.rec',
-            'wave.open',
+            'AudioCaptureEngine',
+            'open_audio_sink',
             'messagebox'
         ]
         
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Producer/consumer pipeline for webcam recording.
+
+A capture thread grabs frames from the camera into a bounded queue together
+with their capture timestamps, and a separate encoder thread drains the queue
+into a cv2.VideoWriter. A slow encode therefore never delays the capture of
+the next frame; if the encoder falls far enough behind that the queue fills
+up, new frames are dropped and counted instead of stalling the camera. The
+encoder fills each dropped slot by repeating the frame it wrote last, so
+the file keeps its frame rate and stays in sync with the audio.
+
+Frame pacing is deadline based: output frame ``i`` is due at
+``start + i / fps`` on the time.perf_counter() clock. Camera frames that
+arrive while their slot is already filled are skipped without being decoded,
+and slots the camera missed are filled by repeating the previous frame, so the
+written file really has a constant frame rate matching its fps tag.
+
+If a preprocess callable is given (frame_preprocess.FramePreprocessor), the
+encoder thread passes every frame through it right before writing, so
+cropping and scaling never delay the camera.
+
+Capture timestamps share the perf_counter() clock with the audio engine; if a
+sync_index is given, every written frame is recorded there with its capture
+time and pacing deadline.
+
+If metrics (metrics.MetricsRegistry) are given, grab, decode and encode
+times and the queue depth are recorded for every frame.
+"""
+
+import queue
+import threading
+import time
+
+
+class FramePacer:
+    """Map camera frames onto a constant-rate output timeline"""
+
+    def __init__(self, fps):
+        self.fps = fps
+        self.start_time = None
+        self.emitted = 0
+
+    def start(self, start_time=None):
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.emitted = 0
+
+    def deadline(self, index):
+        """Absolute perf_counter() time at which output frame index is due"""
+        return self.start_time + index / self.fps
+
+    def owed(self, now):
+        """Number of output frames that should have been emitted by now,
+        counting the slot that contains now, minus those already emitted"""
+        if now < self.start_time:
+            return 0
+        slot = int((now - self.start_time) * self.fps)
+        return slot + 1 - self.emitted
+
+    def advance(self, count=1):
+        self.emitted += count
+
+
+class FramePipeline:
+    """Capture frames on one thread and encode them on another"""
+
+    def __init__(self, capture, writer, fps=30, queue_size=32, max_frames=None,
+                 sync_index=None, preprocess=None, metrics=None):
+        self.capture = capture
+        self.writer = writer
+        # Writers that keep their own timestamp index (MjpegFrameArchive)
+        # receive each frame's capture time and deadline
+        self._write_timed = getattr(writer, "write_timed", None)
+        self.sync_index = sync_index
+        self.preprocess = preprocess
+        self.metrics = metrics
+        self.fps = fps
+        self.max_frames = max_frames
+        self.frames = queue.Queue(maxsize=queue_size)
+
+        self.pacer = FramePacer(fps)
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.dropped_frames = 0
+        self.duplicated_frames = 0
+        self.skipped_frames = 0
+        self.read_failures = 0
+        # Slots dropped since the last queued frame, written by the encoder
+        # as repeats of its previous frame
+        self._gap = 0
+        self.error = None
+        self.first_capture_time = None
+        self.last_capture_time = None
+
+        self._stop_event = threading.Event()
+        self._capture_thread = None
+        self._encoder_thread = None
+
+    def start(self):
+        """Start the capture and encoder threads"""
+        self._stop_event.clear()
+        self._encoder_thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._encoder_thread.start()
+        self._capture_thread.start()
+
+    @property
+    def capturing(self):
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+
+    @property
+    def capture_fps(self):
+        """Rate at which the camera actually delivered frames"""
+        if self.frames_captured < 2:
+            return 0.0
+        elapsed = self.last_capture_time - self.first_capture_time
+        return (self.frames_captured - 1) / elapsed if elapsed > 0 else 0.0
+
+    def _remaining(self, count):
+        """Clamp count to the frames still allowed by max_frames"""
+        if self.max_frames is None:
+            return count
+        return max(0, min(count, self.max_frames - self.pacer.emitted))
+
+    def _emit(self, timestamp, frame):
+        """Queue one output frame for the encoder"""
+        deadline = self.pacer.deadline(self.pacer.emitted)
+        self.pacer.advance()
+        try:
+            self.frames.put_nowait((timestamp, deadline, frame, self._gap))
+            self._gap = 0
+        except queue.Full:
+            # Encoder is behind - drop rather than block the camera; the
+            # slot is filled with a repeat once the encoder catches up
+            self.dropped_frames += 1
+            self._gap += 1
+
+    def _capture_loop(self):
+        """Producer: grab camera frames and emit them on the pacing deadlines"""
+        last = None
+        metrics = self.metrics
+        try:
+            self.pacer.start()
+            while not self._stop_event.is_set():
+                if self.max_frames is not None and self.pacer.emitted >= self.max_frames:
+                    break
+
+                # grab() only fetches the frame; decoding is deferred to
+                # retrieve() so frames that are skipped cost almost nothing
+                grab_start = time.perf_counter()
+                if not self.capture.grab():
+                    self.read_failures += 1
+                    print("Warning: Failed to read frame from webcam")
+                    break
+                timestamp = time.perf_counter()
+                if metrics is not None:
+                    metrics.observe("camera_grab_seconds", timestamp - grab_start)
+                self.frames_captured += 1
+                if self.first_capture_time is None:
+                    self.first_capture_time = timestamp
+                self.last_capture_time = timestamp
+
+                owed = self._remaining(self.pacer.owed(timestamp))
+                if owed <= 0:
+                    # Camera is faster than the target rate
+                    self.skipped_frames += 1
+                    continue
+
+                ret, frame = self.capture.retrieve()
+                if metrics is not None:
+                    metrics.observe("camera_decode_seconds", time.perf_counter() - timestamp)
+                if not ret:
+                    self.read_failures += 1
+                    print("Warning: Failed to decode frame from webcam")
+                    break
+
+                # Fill slots the camera missed with the previous frame
+                fill = last if last is not None else (timestamp, frame)
+                for _ in range(owed - 1):
+                    self.duplicated_frames += 1
+                    self._emit(*fill)
+
+                last = (timestamp, frame)
+                self._emit(timestamp, frame)
+
+            # Pad up to the stop time so video length matches wall-clock time
+            if last is not None:
+                for _ in range(self._remaining(self.pacer.owed(time.perf_counter()) - 1)):
+                    self.duplicated_frames += 1
+                    self._emit(*last)
+        except Exception as e:
+            self.error = e
+            print(f"Error while capturing video frames: {e}")
+        finally:
+            # Sentinel tells the encoder no more frames are coming
+            self.frames.put(None)
+
+    def _encode_loop(self):
+        """Consumer: write queued frames to the video writer"""
+        metrics = self.metrics
+        last = None  # (timestamp, deadline, frame) written last, preprocessed
+        while True:
+            item = self.frames.get()
+            if item is None:
+                # Slots dropped after the last queued frame; the capture
+                # thread has finished, so its count is final
+                if last is not None and self.error is None:
+                    self._repeat(last, self._gap, 1)
+                break
+            if self.error is not None:
+                continue  # Keep draining so the producer never blocks
+            timestamp, deadline, frame, gap = item
+            if metrics is not None:
+                metrics.observe("video_queue_depth", self.frames.qsize())
+                encode_start = time.perf_counter()
+            try:
+                if gap:
+                    # The first frame always finds the queue empty, so
+                    # there is a previous frame to repeat
+                    self._repeat(last, gap, 1)
+                frame = self._prepare(frame)
+                self._write(timestamp, deadline, frame)
+                last = (timestamp, deadline, frame)
+                if metrics is not None:
+                    metrics.observe("video_encode_seconds", time.perf_counter() - encode_start)
+            except Exception as e:
+                self.error = e
+                print(f"Error while encoding video frames: {e}")
+
+    def _prepare(self, frame):
+        """Preprocessed copy of a captured frame"""
+        return self.preprocess(frame) if self.preprocess is not None else frame
+
+    def _write(self, timestamp, deadline, frame):
+        """Write one output frame and index it"""
+        if self._write_timed is not None:
+            self._write_timed(frame, timestamp, deadline)
+        else:
+            self.writer.write(frame)
+        if self.sync_index is not None:
+            self.sync_index.add_video_frame(self.frames_written, timestamp, deadline)
+        self.frames_written += 1
+
+    def _repeat(self, last, count, first_slot):
+        """Fill count dropped slots after last with copies of its frame"""
+        timestamp, deadline, frame = last
+        for i in range(first_slot, first_slot + count):
+            self._write(timestamp, deadline + i / self.fps, frame)
+            self.duplicated_frames += 1
+
+    def stop(self):
+        """Stop capturing and wait for the encoder to drain the queue"""
+        self._stop_event.set()
+        if self._capture_thread is not None:
+            self._capture_thread.join()
+        if self._encoder_thread is not None:
+            self._encoder_thread.join()
+
+    def wait(self, timeout=None):
+        """Wait for the capture thread to end on its own (max_frames or a
+        read failure). Returns False if the timeout expired first."""
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout)
+        return not self.capturing
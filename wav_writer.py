@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Incremental WAV writer.
+
+WavStreamWriter is used as a sink of the audio capture engine: every block is
+converted to PCM and appended to the file while the take is still running, so
+there is no conversion spike at the end of a take. The file is written as
+``<name>.wav.part`` with placeholder sizes in the header; close() patches the
+RIFF and data chunk sizes and renames it to its final name. If the process
+dies mid-take, recover_wav() rebuilds the header from the file size.
+"""
+
+import os
+import struct
+import sys
+
+from pcm import WAVE_FORMAT_PCM, PCMConverter
+
+PART_SUFFIX = ".part"
+
+# Offsets inside the canonical 44-byte header written by WavStreamWriter
+_RIFF_SIZE_OFFSET = 4
+_DATA_SIZE_OFFSET = 40
+_HEADER_SIZE = 44
+
+
+def _build_header(sample_rate, channels, sample_width, data_bytes=0,
+                  format_tag=WAVE_FORMAT_PCM):
+    """Build a canonical 44-byte WAV header"""
+    block_align = channels * sample_width
+    return struct.pack('<4sI4s4sIHHIIHH4sI',
+                       b'RIFF', _HEADER_SIZE - 8 + data_bytes, b'WAVE',
+                       b'fmt ', 16, format_tag, channels, sample_rate,
+                       sample_rate * block_align, block_align, sample_width * 8,
+                       b'data', data_bytes)
+
+
+class WavStreamWriter:
+    """Append audio blocks to a WAV file as they arrive.
+
+    Instances are callable so they can be registered directly as a sink
+    on an AudioCaptureEngine. sample_format is one of pcm.SAMPLE_FORMATS
+    ("int16", "int24" or "float32"); dither adds TPDF dither to the integer
+    formats.
+    """
+
+    def __init__(self, filepath, sample_rate, channels=1, sample_format="int16",
+                 dither=False):
+        self.converter = PCMConverter(sample_format, dither=dither)
+        self.filepath = filepath
+        self.part_path = filepath + PART_SUFFIX
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.sample_width = self.converter.sample_width
+        self.frames_written = 0
+
+        # Explicit binary mode for Windows compatibility
+        self.file = open(self.part_path, 'wb')
+        self.file.write(_build_header(sample_rate, channels, self.sample_width,
+                                      format_tag=self.converter.format_tag))
+
+    def write(self, block):
+        """Convert a float32 block to PCM and append it to the file"""
+        self.file.write(self.converter.convert(block))
+        self.frames_written += len(block)
+
+    __call__ = write
+
+    @property
+    def data_bytes(self):
+        return self.frames_written * self.channels * self.sample_width
+
+    def close(self):
+        """Patch the header sizes and move the file to its final name"""
+        if self.file is None:
+            return
+        try:
+            data_bytes = self.data_bytes
+            self.file.seek(_RIFF_SIZE_OFFSET)
+            self.file.write(struct.pack('<I', _HEADER_SIZE - 8 + data_bytes))
+            self.file.seek(_DATA_SIZE_OFFSET)
+            self.file.write(struct.pack('<I', data_bytes))
+        finally:
+            self.file.close()
+            self.file = None
+        os.replace(self.part_path, self.filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def recover_wav(part_path, filepath=None):
+    """Repair the header of a WAV file left behind by an interrupted take.
+
+    The RIFF and data chunk sizes are recomputed from the file size (any
+    trailing partial frame is cut off) and the file is renamed to filepath,
+    which defaults to part_path without the ``.part`` suffix. Returns the
+    number of recovered frames.
+    """
+    if filepath is None:
+        if not part_path.endswith(PART_SUFFIX):
+            raise ValueError(f"Not a partial recording: {part_path}")
+        filepath = part_path[:-len(PART_SUFFIX)]
+
+    with open(part_path, 'r+b') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"Not a WAV file: {part_path}")
+
+        # Walk the chunks to find the format and the start of the data
+        block_align = None
+        data_size_offset = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                block_align = struct.unpack('<H', fmt[12:14])[0]
+                continue
+            if chunk_id == b'data':
+                data_size_offset = f.tell() - 4
+                break
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+        if block_align is None or data_size_offset is None:
+            raise ValueError(f"WAV header is incomplete: {part_path}")
+
+        file_size = f.seek(0, os.SEEK_END)
+        data_start = data_size_offset + 4
+        data_bytes = max(0, file_size - data_start)
+        data_bytes -= data_bytes % block_align
+        f.truncate(data_start + data_bytes)
+
+        f.seek(_RIFF_SIZE_OFFSET)
+        f.write(struct.pack('<I', data_start - 8 + data_bytes))
+        f.seek(data_size_offset)
+        f.write(struct.pack('<I', data_bytes))
+
+    os.replace(part_path, filepath)
+    return data_bytes // block_align
+
+
+def recover_partial_recordings(directory):
+    """Recover every ``*.wav.part`` file found in directory.
+
+    Returns the list of recovered file paths.
+    """
+    recovered = []
+    if not os.path.isdir(directory):
+        return recovered
+
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".wav" + PART_SUFFIX):
+            continue
+        try:
+            frames = recover_wav(entry.path)
+            recovered.append(entry.path[:-len(PART_SUFFIX)])
+            print(f"Recovered {frames} frames from interrupted take: {entry.name}")
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Warning: Could not recover {entry.name}: {e}")
+    return recovered
+
+
+if __name__ == "__main__":
+    # Usage: python wav_writer.py [recordings_dir]
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.getcwd(), "recordings")
+    files = recover_partial_recordings(target)
+    print(f"Recovered {len(files)} file(s)")